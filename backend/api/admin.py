@@ -1,16 +1,35 @@
-"""Admin API — database setup, file upload import, status."""
+"""Admin API — database setup, file upload import, status.
 
+Imports run as background jobs: the upload endpoints return a job id at
+once, and progress is polled from /imports/{id} or streamed as
+server-sent events from /imports/{id}/events. They run in-process, one
+tab or file at a time, unless ``IMPORT_API_WORKERS`` allows a process
+pool: forking a threaded server process copies its locks and
+connections, and a pool would take every core from request handling.
+"""
+
+import asyncio
+import json
 import os
 import shutil
 import tempfile
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy import inspect, text
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from backend.core.config import settings
 from backend.core.database import Base, engine
+from backend.core import events, instrumentation, realtime
+from backend.core.outbox import dispatcher
 from backend.core.deps import get_db
+from backend.core.pagination import paginate
+from backend.core.schema import schema_cache
+from backend.importers import background
+from backend.models.extended import SystemEvent
 
 router = APIRouter(prefix="/admin", tags=["Admin & Import"])
 
@@ -18,8 +37,7 @@ router = APIRouter(prefix="/admin", tags=["Admin & Import"])
 @router.post("/setup")
 def setup_database():
     Base.metadata.create_all(bind=engine)
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
+    tables = schema_cache.tables()
     return {"status": "ok", "tables_created": len(tables), "tables": sorted(tables)}
 
 
@@ -32,14 +50,12 @@ def reset_database(confirm: str = ""):
         )
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
-    inspector = inspect(engine)
-    return {"status": "reset complete", "tables": sorted(inspector.get_table_names())}
+    return {"status": "reset complete", "tables": schema_cache.tables()}
 
 
 @router.get("/status")
 def database_status(db: Session = Depends(get_db)):
-    inspector = inspect(engine)
-    tables = sorted(inspector.get_table_names())
+    tables = schema_cache.tables()
     counts = {}
     total = 0
     for t in tables:
@@ -53,6 +69,87 @@ def database_status(db: Session = Depends(get_db)):
     return {"total_rows": total, "tables_with_data": len(counts), "counts": counts}
 
 
+@router.get("/schema")
+def schema_status():
+    """Schema cache diagnostics: generation, age and the cached tables."""
+    return {**schema_cache.as_dict(), "tables": schema_cache.tables()}
+
+
+@router.post("/schema/refresh")
+def refresh_schema():
+    """Re-read the schema, e.g. after DDL run outside create_all."""
+    schema_cache.refresh()
+    return schema_cache.as_dict()
+
+
+@router.get("/instrumentation")
+def instrumentation_stats():
+    """Per-route query counts, DB / serialization / total time histograms."""
+    return instrumentation.snapshot()
+
+
+@router.delete("/instrumentation")
+def reset_instrumentation():
+    instrumentation.reset()
+    return {"status": "reset"}
+
+
+@router.get("/outbox")
+def outbox_stats(db: Session = Depends(get_db)):
+    """System event dispatcher: backlog, lag, throughput, handler timings."""
+    return dispatcher.stats(db)
+
+
+@router.post("/outbox/drain")
+def drain_outbox(db: Session = Depends(get_db)):
+    """Process pending system events now, in this request."""
+    claimed = dispatcher.drain()
+    return {"claimed": claimed, **dispatcher.stats(db)}
+
+
+@router.get("/realtime")
+def realtime_stats():
+    """Notification streams: broker, open connections, deliveries, counters."""
+    return realtime.stats()
+
+
+@router.get("/events")
+def list_events(
+    event_type: Optional[str] = Query(None, description="exact, or a prefix ending in * (document.*)"),
+    source_type: Optional[str] = None,
+    source_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    processed: Optional[bool] = None,
+    sync_name: Optional[str] = None,
+    payload: List[str] = Query([], description="key=value; value parsed as JSON when it is"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(50, ge=1, le=200),
+    exact_total: bool = False,
+    db: Session = Depends(get_db),
+):
+    """System events, newest first."""
+    match = {"sync_name": sync_name} if sync_name else {}
+    for pair in payload:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise HTTPException(422, f"payload filter {pair!r} is not key=value")
+        try:
+            match[key] = json.loads(value)
+        except ValueError:
+            match[key] = value
+    try:
+        q = events.query(db, event_type=event_type, source_type=source_type, source_id=source_id,
+                         since=since, until=until, processed=processed, payload=match)
+        # ids follow insertion order, so this is newest first
+        result = paginate(q, SystemEvent.id, SystemEvent.id, descending=True,
+                          cursor=cursor, page=page, per_page=per_page, exact_total=exact_total)
+    except ValueError as exc:   # payload key that isn't a plain identifier
+        raise HTTPException(422, str(exc))
+    return result.response([events.as_dict(e) for e in result.items])
+
+
 def _save_upload(upload, suffix=""):
     tmp = tempfile.mkdtemp(prefix="secg_import_")
     ext = os.path.splitext(upload.filename or "file")[1] or suffix
@@ -62,48 +159,28 @@ def _save_upload(upload, suffix=""):
     return path
 
 
-def _safe_result(result):
-    d = {}
-    d["created"] = getattr(result, "created", 0)
-    d["updated"] = getattr(result, "updated", 0)
-    d["skipped"] = getattr(result, "skipped", 0)
-    errs = getattr(result, "errors", None)
-    if errs:
-        d["errors"] = list(errs[:20])
-    else:
-        d["errors"] = []
-    return d
+def _start(source, make_importer, path_or_dir, filename=None):
+    cleanup = path_or_dir if os.path.isdir(path_or_dir) else os.path.dirname(path_or_dir)
+    job = background.submit(source, make_importer, filename=filename, cleanup_dir=cleanup)
+    return job.as_dict()
 
 
-@router.post("/import/masterfile")
-def import_masterfile(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
+@router.post("/import/masterfile", status_code=202)
+def import_masterfile(file: UploadFile = File(...),
+                      x_tenant_id: Optional[int] = Header(default=None)):
     if not file.filename or not file.filename.endswith((".xlsx", ".xlsm")):
         raise HTTPException(status_code=400, detail="File must be .xlsx or .xlsm")
     Base.metadata.create_all(bind=engine)
     path = _save_upload(file, ".xlsx")
-    try:
-        from backend.importers.masterfile import MasterfileImporter
-        importer = MasterfileImporter(db, path)
-        result = importer.run()
-        out = _safe_result(result)
-        out["status"] = "complete"
-        out["file"] = file.filename
-        return out
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Import failed: " + str(e))
-    finally:
-        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    from backend.importers.masterfile import MasterfileImporter
+    return _start("masterfile",
+                  lambda db: MasterfileImporter(db, path, workers=settings.import_api_workers,
+                                                tenant_id=x_tenant_id),
+                  path, file.filename)
 
 
-@router.post("/import/budgets")
-def import_budgets(
-    files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db),
-):
+@router.post("/import/budgets", status_code=202)
+def import_budgets(files: List[UploadFile] = File(...)):
     Base.metadata.create_all(bind=engine)
     tmp_dir = tempfile.mkdtemp(prefix="secg_budgets_")
     try:
@@ -113,78 +190,80 @@ def import_budgets(
             dest = os.path.join(tmp_dir, f.filename)
             with open(dest, "wb") as out:
                 shutil.copyfileobj(f.file, out)
-        from backend.importers.budgets import BudgetCSVBatchImporter
-        importer = BudgetCSVBatchImporter(db, tmp_dir)
-        result = importer.run()
-        out = _safe_result(result)
-        out["status"] = "complete"
-        out["files_uploaded"] = len(files)
-        return out
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Import failed: " + str(e))
-    finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail="Upload failed: " + str(e))
+    from backend.importers.budgets import BudgetCSVBatchImporter
+    out = _start("budgets", lambda db: BudgetCSVBatchImporter(
+        db, tmp_dir, workers=settings.import_api_workers), tmp_dir)
+    out["files_uploaded"] = len(files)
+    return out
 
 
-@router.post("/import/leads")
-def import_leads(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
+@router.post("/import/leads", status_code=202)
+def import_leads(file: UploadFile = File(...)):
     Base.metadata.create_all(bind=engine)
     path = _save_upload(file, ".xlsx")
-    try:
-        from backend.importers.leads import LeadsImporter
-        importer = LeadsImporter(db, path)
-        result = importer.run()
-        out = _safe_result(result)
-        out["status"] = "complete"
-        return out
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Import failed: " + str(e))
-    finally:
-        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    from backend.importers.leads import LeadsImporter
+    return _start("leads", lambda db: LeadsImporter(db, path), path, file.filename)
 
 
-@router.post("/import/proposals")
-def import_proposals(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
+@router.post("/import/proposals", status_code=202)
+def import_proposals(file: UploadFile = File(...)):
     Base.metadata.create_all(bind=engine)
     path = _save_upload(file, ".xlsx")
-    try:
-        from backend.importers.leads import ProposalsImporter
-        importer = ProposalsImporter(db, path)
-        result = importer.run()
-        out = _safe_result(result)
-        out["status"] = "complete"
-        return out
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Import failed: " + str(e))
-    finally:
-        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    from backend.importers.leads import ProposalsImporter
+    return _start("proposals", lambda db: ProposalsImporter(db, path), path, file.filename)
 
 
-@router.post("/import/jobs")
-def import_jobs(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
+@router.post("/import/jobs", status_code=202)
+def import_jobs(file: UploadFile = File(...)):
     Base.metadata.create_all(bind=engine)
     path = _save_upload(file, ".xlsx")
-    try:
-        from backend.importers.jobs import OpenJobsImporter
-        importer = OpenJobsImporter(db, path)
-        result = importer.run()
-        out = _safe_result(result)
-        out["status"] = "complete"
-        return out
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail="Import failed: " + str(e))
-    finally:
-        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    from backend.importers.jobs import OpenJobsImporter
+    return _start("jobs", lambda db: OpenJobsImporter(db, path), path, file.filename)
+
+
+# ── Import jobs ──────────────────────────────────────────────────────────
+
+def _get_job(job_id):
+    job = background.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.get("/imports")
+def list_import_jobs():
+    return [job.as_dict() for job in background.list_jobs()]
+
+
+@router.get("/imports/{job_id}")
+def get_import_job(job_id: str):
+    return _get_job(job_id).as_dict()
+
+
+@router.get("/imports/{job_id}/events")
+async def stream_import_job(job_id: str, interval: float = 1.0):
+    """Server-sent events: one ``progress`` event per interval, then ``done``."""
+    job = _get_job(job_id)
+    interval = min(max(interval, 0.2), 10.0)
+
+    async def events():
+        while not job.done:
+            yield f"event: progress\ndata: {json.dumps(job.as_dict())}\n\n"
+            await asyncio.sleep(interval)
+        yield f"event: done\ndata: {json.dumps(job.as_dict())}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/imports/{job_id}/cancel")
+def cancel_import_job(job_id: str):
+    """Stop a job at its next chunk boundary; the in-flight tab is rolled back."""
+    job = _get_job(job_id)
+    if job.done:
+        raise HTTPException(status_code=409, detail=f"Import job already {job.status}")
+    background.cancel(job_id)
+    return job.as_dict()
@@ -1,9 +1,11 @@
 """Calendar API — events, attendees, crew board data."""
 
-from datetime import datetime, date
+from collections import defaultdict
+from datetime import datetime, date, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from backend.core.deps import get_db
@@ -133,54 +135,64 @@ def delete_event(event_id: int, db: Session = Depends(get_db)):
 @router.get("/crew-board", response_model=list)
 def crew_board(
     week: Optional[str] = Query(None, description="ISO date for week start (Monday)"),
+    weeks: int = Query(1, ge=1, le=12, description="Number of weeks to return"),
     db: Session = Depends(get_db),
 ):
-    """Get crew board data — who's where each day of the week."""
+    """Get crew board data — who's where each day of the week(s).
+
+    Events and their attendees come from one outer-joined query, indexed by
+    employee and day in a single pass.
+    """
     if week:
         week_start = date.fromisoformat(week)
     else:
         today = date.today()
-        week_start = today - __import__("datetime").timedelta(days=today.weekday())
-
-    week_end = week_start + __import__("datetime").timedelta(days=6)
+        week_start = today - timedelta(days=today.weekday())
+    days = [week_start + timedelta(days=i) for i in range(7 * weeks)]
 
     employees = db.query(Employee).filter(Employee.is_active == True).order_by(Employee.first_name).all()
-    events = (
-        db.query(CalendarEvent)
-        .filter(
-            CalendarEvent.start_datetime >= datetime.combine(week_start, datetime.min.time()),
-            CalendarEvent.start_datetime <= datetime.combine(week_end, datetime.max.time()),
+    rows = db.execute(
+        select(
+            CalendarEvent.id, CalendarEvent.title, CalendarEvent.event_type,
+            CalendarEvent.project_id, CalendarEvent.color,
+            CalendarEvent.start_datetime, CalendarEvent.created_by,
+            CalendarAttendee.employee_id,
         )
-        .all()
-    )
-
-    result = []
-    for emp in employees:
-        days = {}
-        for i in range(7):
-            day = week_start + __import__("datetime").timedelta(days=i)
-            day_events = [
-                {
-                    "id": e.id,
-                    "title": e.title,
-                    "event_type": e.event_type,
-                    "project_id": e.project_id,
-                    "color": e.color,
-                }
-                for e in events
-                if e.start_datetime.date() == day
-                and (
-                    e.created_by == emp.id
-                    or any(a.employee_id == emp.id for a in e.attendees)
-                )
-            ]
-            days[day.isoformat()] = day_events
-
-        result.append({
+        .outerjoin(CalendarAttendee, CalendarAttendee.event_id == CalendarEvent.id)
+        .where(
+            CalendarEvent.start_datetime >= datetime.combine(days[0], datetime.min.time()),
+            CalendarEvent.start_datetime <= datetime.combine(days[-1], datetime.max.time()),
+        )
+        .order_by(CalendarEvent.start_datetime, CalendarEvent.id)
+    ).all()
+
+    # employee id → ISO day → events, each event listed once per person
+    board: dict[int, dict[str, list]] = defaultdict(lambda: defaultdict(list))
+    payloads: dict[int, dict] = {}
+    placed: set[tuple[int, int]] = set()
+    for r in rows:
+        payload = payloads.get(r.id)
+        if payload is None:
+            payload = payloads[r.id] = {
+                "id": r.id,
+                "title": r.title,
+                "event_type": r.event_type,
+                "project_id": r.project_id,
+                "color": r.color,
+            }
+        day = r.start_datetime.date().isoformat()
+        for person in (r.created_by, r.employee_id):
+            if person is not None and (person, r.id) not in placed:
+                placed.add((person, r.id))
+                board[person][day].append(payload)
+
+    day_keys = [d.isoformat() for d in days]
+    return [
+        {
             "employee_id": emp.id,
             "name": f"{emp.first_name} {emp.last_name}",
             "role": emp.role,
-            "days": days,
-        })
-
-    return result
+            "days": {d: board.get(emp.id, {}).get(d, []) for d in day_keys},
+        }
+        for emp in employees
+    ]
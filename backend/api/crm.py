@@ -9,11 +9,13 @@ GET  /api/crm/pipeline/summary → pipeline funnel summary
 from decimal import Decimal
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy import func, case
 from sqlalchemy.orm import Session
 
+from backend.core import rollups
 from backend.core.deps import get_db
+from backend.core.pagination import paginate
 from backend.models.extended import BidPipeline, BidStatus, Lead, LeadProposal
 from backend.schemas import (
     BidPipelineOut, LeadOut, LeadProposalOut, PaginatedResponse,
@@ -26,12 +28,14 @@ router = APIRouter(prefix="/crm", tags=["CRM & Pipeline"])
 def list_leads(
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    exact_total: bool = False,
     status: Optional[str] = None,
     salesperson: Optional[str] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    """CRM leads from BuilderTrend."""
+    """CRM leads from BuilderTrend, newest first."""
     q = db.query(Lead)
     if status:
         q = q.filter(Lead.lead_status == status)
@@ -40,15 +44,10 @@ def list_leads(
     if search:
         q = q.filter(Lead.opportunity_title.ilike(f"%{search}%"))
 
-    total = q.count()
-    items = q.order_by(Lead.id.desc()).offset(
-        (page - 1) * per_page).limit(per_page).all()
-
-    return PaginatedResponse(
-        total=total, page=page, per_page=per_page,
-        pages=(total + per_page - 1) // per_page,
-        items=[LeadOut.model_validate(l) for l in items],
-    )
+    result = paginate(q, Lead.id, Lead.id, descending=True, cursor=cursor, page=page,
+                      per_page=per_page, exact_total=exact_total)
+    return PaginatedResponse(**result.response(
+        [LeadOut.model_validate(l) for l in result.items]))
 
 
 @router.get("/proposals", response_model=List[LeadProposalOut])
@@ -94,29 +93,30 @@ def list_pipeline(
 
 
 @router.get("/pipeline/summary")
-def pipeline_summary(db: Session = Depends(get_db)):
-    """Pipeline funnel summary by status — for charts."""
-    rows = db.query(
-        BidPipeline.status,
-        func.count(BidPipeline.id),
-        func.coalesce(func.sum(BidPipeline.estimated_value), 0),
-    ).group_by(BidPipeline.status).all()
+def pipeline_summary(
+    db: Session = Depends(get_db),
+    x_tenant_id: int | None = Header(default=None),
+):
+    """Pipeline funnel summary by status — for charts (from the KPI rollups)."""
+    rows = rollups.read(db, "pipeline", x_tenant_id or rollups.DEFAULT_TENANT)
 
     total_val = Decimal("0")
     weighted = Decimal("0")
     stages = []
-    for status, count, value in rows:
+    for status, (count, value, _, _) in rows.items():
+        if status == rollups.TOTAL or not count:
+            continue
         prob_map = {
-            BidStatus.identified: 10, BidStatus.pursuing: 25,
-            BidStatus.bid_submitted: 50, BidStatus.won: 100,
-            BidStatus.lost: 0,
+            BidStatus.identified.value: 10, BidStatus.pursuing.value: 25,
+            BidStatus.bid_submitted.value: 50, BidStatus.won.value: 100,
+            BidStatus.lost.value: 0,
         }
         prob = prob_map.get(status, 20)
         w = value * Decimal(str(prob)) / 100
         total_val += value
         weighted += w
         stages.append({
-            "status": status.value if status else "unknown",
+            "status": status or "unknown",
             "count": count,
             "value": float(value),
             "weighted": float(w),
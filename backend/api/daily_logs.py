@@ -1,11 +1,11 @@
 """Daily Field Log API — CRUD, submit, review, feed."""
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, load_only
 
 from backend.core.deps import get_db
 from backend.models.daily_log import DailyLog, DailyLogCrewEntry, DailyLogPhoto
@@ -17,12 +17,26 @@ from backend.schemas.daily_log import (
 router = APIRouter(prefix="/daily-logs", tags=["Daily Logs"])
 
 
-def _build_list_item(log: DailyLog) -> dict:
+# Columns list views read; the counts come from _count() subqueries
+_LIST_FIELDS = [f for f in DailyLogListOut.model_fields if f not in ("photo_count", "crew_count")]
+
+
+def _count(model, label: str):
+    """Correlated COUNT of ``model`` rows for each selected DailyLog."""
+    return (
+        select(func.count(model.id))
+        .where(model.daily_log_id == DailyLog.id)
+        .scalar_subquery()
+        .label(label)
+    )
+
+
+def _build_list_item(log: DailyLog, photo_count: int, crew_count: int) -> dict:
     """Build a DailyLogListOut dict with computed counts."""
     return {
-        **{c.key: getattr(log, c.key) for c in log.__table__.columns},
-        "photo_count": len(log.photos) if log.photos else 0,
-        "crew_count": len(log.crew_entries) if log.crew_entries else 0,
+        **{f: getattr(log, f) for f in _LIST_FIELDS},
+        "photo_count": photo_count,
+        "crew_count": crew_count,
     }
 
 
@@ -32,15 +46,19 @@ def daily_log_feed(
     db: Session = Depends(get_db),
 ):
     """Recent logs across all projects — for Matt's dashboard overview."""
-    cutoff = date.today() - __import__("datetime").timedelta(days=days)
-    logs = (
-        db.query(DailyLog)
-        .options(joinedload(DailyLog.photos))
+    cutoff = date.today() - timedelta(days=days)
+    rows = (
+        db.query(DailyLog, _count(DailyLogPhoto, "photo_count"))
+        .options(load_only(
+            DailyLog.id, DailyLog.project_id, DailyLog.log_date, DailyLog.author_id,
+            DailyLog.work_performed, DailyLog.status, DailyLog.submitted_at,
+        ))
         .filter(DailyLog.log_date >= cutoff)
         .order_by(DailyLog.log_date.desc(), DailyLog.created_at.desc())
         .limit(50)
         .all()
     )
+    logs = [log for log, _ in rows]
 
     # Batch load project and employee names
     project_ids = {l.project_id for l in logs}
@@ -49,7 +67,7 @@ def daily_log_feed(
     employees = {e.id: e for e in db.query(Employee).filter(Employee.id.in_(author_ids)).all()} if author_ids else {}
 
     result = []
-    for log in logs:
+    for log, photo_count in rows:
         proj = projects.get(log.project_id)
         author = employees.get(log.author_id)
         result.append(DailyLogFeedItem(
@@ -63,7 +81,7 @@ def daily_log_feed(
             work_performed=log.work_performed,
             status=log.status or "draft",
             submitted_at=log.submitted_at,
-            photo_count=len(log.photos) if log.photos else 0,
+            photo_count=photo_count,
         ))
     return result
 
@@ -82,13 +100,18 @@ def today_status(db: Session = Depends(get_db)):
     )
 
     # Get today's logs
-    todays_logs = (
-        db.query(DailyLog)
-        .options(joinedload(DailyLog.photos))
+    rows = (
+        db.query(DailyLog, _count(DailyLogPhoto, "photo_count"))
+        .options(load_only(
+            DailyLog.id, DailyLog.project_id, DailyLog.author_id, DailyLog.status,
+            DailyLog.submitted_at, DailyLog.work_performed,
+        ))
         .filter(DailyLog.log_date == today)
         .all()
     )
+    todays_logs = [log for log, _ in rows]
     logs_by_project = {l.project_id: l for l in todays_logs}
+    photo_counts = {log.id: n for log, n in rows}
 
     # Get employee names
     author_ids = {l.author_id for l in todays_logs}
@@ -108,7 +131,7 @@ def today_status(db: Session = Depends(get_db)):
             "author_name": f"{author.first_name} {author.last_name}" if author else None,
             "submitted_at": log.submitted_at.isoformat() if log and log.submitted_at else None,
             "work_performed": log.work_performed if log else None,
-            "photo_count": len(log.photos) if log and log.photos else 0,
+            "photo_count": photo_counts[log.id] if log else 0,
         })
 
     submitted = sum(1 for r in result if r["has_log"])
@@ -129,8 +152,8 @@ def list_project_logs(
 ):
     """List daily logs for a specific project."""
     q = (
-        db.query(DailyLog)
-        .options(joinedload(DailyLog.photos), joinedload(DailyLog.crew_entries))
+        db.query(DailyLog, _count(DailyLogPhoto, "photo_count"), _count(DailyLogCrewEntry, "crew_count"))
+        .options(load_only(*[getattr(DailyLog, f) for f in _LIST_FIELDS]))
         .filter(DailyLog.project_id == project_id)
     )
     if start:
@@ -138,8 +161,8 @@ def list_project_logs(
     if end:
         q = q.filter(DailyLog.log_date <= date.fromisoformat(end))
 
-    logs = q.order_by(DailyLog.log_date.desc()).all()
-    return [DailyLogListOut(**_build_list_item(l)) for l in logs]
+    rows = q.order_by(DailyLog.log_date.desc()).all()
+    return [DailyLogListOut(**_build_list_item(*row)) for row in rows]
 
 
 @router.get("/{log_id}", response_model=DailyLogOut)
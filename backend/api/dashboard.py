@@ -1,24 +1,30 @@
 """Dashboard API — aggregated KPIs, cash position, alerts.
 
-GET /api/dashboard  → full command center summary
+GET /api/dashboard        → full command center summary
+GET /api/dashboard/cache  → hit ratio of the dashboard cache
+
+AR, debt, project, pipeline and cost-code figures come from the materialized
+KPI rollups (backend.core.rollups); the rest from one CTE-based query (one
+aggregate CTE per table). The result is cached per tenant for
+``settings.dashboard_cache_ttl`` seconds, and any commit that writes one of
+the source tables or the rollups clears the cache.
 """
 
 from datetime import date, timedelta
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, case
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy import func, case, select, true
 from sqlalchemy.orm import Session
 
+from backend.core import rollups
+from backend.core.cache import TTLCache, invalidate_on_commit
+from backend.core.config import settings
 from backend.core.deps import get_db
-from backend.models.core import (
-    ChangeOrder, ChangeOrderStatus, Invoice, InvoiceStatus,
-    PayApp, Project, ProjectStatus, Vendor,
-)
+from backend.models.core import Employee, InvoiceStatus, Vendor
 from backend.models.extended import (
-    BidPipeline, BidStatus, CashSnapshot, Debt, DebtType,
-    LienWaiver, PayrollCalendar, PayrollEntry, RecurringExpense,
-    RetainageEntry,
+    BidStatus, CashSnapshot, DebtType, KpiRollup,
+    LienWaiver, PayrollCalendar, RetainageEntry,
 )
 from backend.schemas import (
     AlertOut, CashPositionOut, DashboardOut, DebtSummaryOut,
@@ -27,75 +33,148 @@ from backend.schemas import (
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+_SOURCE_MODELS = (
+    CashSnapshot, Employee, KpiRollup, LienWaiver,
+    PayrollCalendar, RetainageEntry, Vendor,
+)
+
+# Rollup metrics the dashboard reads, all in one query
+_ROLLUP_METRICS = ("ar", "debt", "projects", "pipeline", "cost_overage")
+_CENT = Decimal("0.01")
+
+_cache = TTLCache(ttl=settings.dashboard_cache_ttl)
+invalidate_on_commit(_cache, {m.__tablename__ for m in _SOURCE_MODELS})
+
 
 @router.get("", response_model=DashboardOut)
-def get_dashboard(db: Session = Depends(get_db)):
+def get_dashboard(
+    response: Response,
+    db: Session = Depends(get_db),
+    x_tenant_id: int | None = Header(default=None),
+):
     """Executive command center — all KPIs in one call."""
+    hits = _cache.hits
+    today = date.today()
+    tenant_id = x_tenant_id or rollups.DEFAULT_TENANT
+    dashboard = _cache.get_or_set((tenant_id, today),
+                                  lambda: _build_dashboard(db, today, tenant_id))
+    response.headers["X-Cache"] = "hit" if _cache.hits > hits else "miss"
+    return dashboard
 
-    # ── Cash Position ────────────────────────────────────────────────
-    latest_snap = db.query(CashSnapshot).order_by(
-        CashSnapshot.snapshot_date.desc()).first()
-    cash_on_hand = latest_snap.balance if latest_snap else Decimal("0")
-
-    ar = db.query(func.coalesce(func.sum(Invoice.balance), 0)).filter(
-        Invoice.status.in_([InvoiceStatus.sent, InvoiceStatus.overdue, InvoiceStatus.partial])
-    ).scalar()
-
-    # AP = vendor notes with AP amounts (simplified — real AP would be separate table)
-    ap = db.query(func.coalesce(func.sum(Debt.current_balance), 0)).filter(
-        Debt.is_active == True, Debt.debt_type == DebtType.other
-    ).scalar()
-
-    remaining_draws = db.query(
-        func.coalesce(func.sum(Project.budget_total - Project.contract_amount), 0)
-    ).filter(Project.status == ProjectStatus.active).scalar()
-
-    ret_recv = db.query(func.coalesce(func.sum(RetainageEntry.balance), 0)).filter(
-        RetainageEntry.vendor_id.is_(None)
-    ).scalar()
-    ret_pay = db.query(func.coalesce(func.sum(RetainageEntry.balance), 0)).filter(
-        RetainageEntry.vendor_id.isnot(None)
-    ).scalar()
 
+@router.get("/cache")
+def dashboard_cache_stats():
+    """Dashboard cache hits, misses and hit ratio since process start."""
+    return _cache.stats()
+
+
+def _kpi_query(today: date):
+    """One row with the figures not kept as rollups; each CTE aggregates one table."""
+    zero = lambda expr: func.coalesce(func.sum(expr), 0)  # noqa: E731
+
+    retainage = select(
+        zero(case((RetainageEntry.vendor_id.is_(None), RetainageEntry.balance),
+                  else_=0)).label("receivable"),
+        zero(case((RetainageEntry.vendor_id.isnot(None), RetainageEntry.balance),
+                  else_=0)).label("payable"),
+    ).cte("retainage_kpi")
+
+    employees = select(
+        func.count(Employee.id).label("count"),
+        zero(Employee.salary).label("salary"),
+    ).where(Employee.is_active == True).cte("employees_kpi")  # noqa: E712
+
+    payroll = select(func.min(PayrollCalendar.pay_date).label("next_pay")).where(
+        PayrollCalendar.pay_date >= today).cte("payroll_kpi")
+
+    vendors = select(func.count(Vendor.id).label("expiring")).where(
+        Vendor.insurance_expiry.isnot(None),
+        Vendor.insurance_expiry <= today + timedelta(days=30),
+        Vendor.insurance_expiry >= today,
+    ).cte("vendors_kpi")
+
+    waivers = select(func.count(LienWaiver.id).label("missing")).where(
+        LienWaiver.waiver_type.is_(None)).cte("waivers_kpi")
+
+    cash_on_hand = select(CashSnapshot.balance).order_by(
+        CashSnapshot.snapshot_date.desc()).limit(1).scalar_subquery()
+
+    ctes = (retainage, employees, payroll, vendors, waivers)
+    from_ = ctes[0]
+    for cte in ctes[1:]:
+        from_ = from_.join(cte, true())  # every CTE is a single aggregate row
+
+    return select(
+        cash_on_hand.label("cash_on_hand"),
+        retainage.c.receivable, retainage.c.payable,
+        employees.c.count.label("emp_count"), employees.c.salary,
+        payroll.c.next_pay, vendors.c.expiring, waivers.c.missing,
+    ).select_from(from_)
+
+
+class _Kpis:
+    """The KPI query row plus the rollup figures, read by attribute."""
+
+    def __init__(self, db: Session, today: date, tenant_id: int):
+        self.__dict__.update(db.execute(_kpi_query(today)).one()._asdict())
+        empty = [0, Decimal("0"), Decimal("0"), Decimal("0")]
+        kpis = rollups.read_many(db, _ROLLUP_METRICS, tenant_id)
+
+        ar = kpis["ar"]
+        self.ar = sum((ar.get(s.value, empty)[1] for s in
+                       (InvoiceStatus.sent, InvoiceStatus.overdue, InvoiceStatus.partial)),
+                      Decimal("0"))
+        self.overdue_count, self.overdue_total = ar.get(InvoiceStatus.overdue.value, empty)[:2]
+
+        # AP = vendor notes with AP amounts (simplified — real AP would be separate table)
+        debt = kpis["debt"]
+        self.debt_count, self.debt_total = debt.get(rollups.TOTAL, empty)[:2]
+        self.construction = debt.get(DebtType.construction_loan.value, empty)[1]
+        self.credit_cards = debt.get(DebtType.credit_card.value, empty)[1]
+        self.ap = debt.get(DebtType.other.value, empty)[1]
+
+        projects = kpis["projects"].get("active", empty)
+        self.project_count, self.budget, self.released, self.remaining_draws = projects
+
+        pipeline = kpis["pipeline"]
+        self.pipe_count, self.pipe_value = pipeline.get(rollups.TOTAL, empty)[:2]
+        self.won_count, self.won_value = pipeline.get(BidStatus.won.value, empty)[:2]
+
+        self.over = kpis["cost_overage"].get("over", empty)[0]
+
+
+def _dec(value) -> Decimal:
+    """Money as a two-place Decimal, however the figure was summed."""
+    if value is None:
+        return Decimal("0.00")
+    return (value if isinstance(value, Decimal) else Decimal(str(value))).quantize(_CENT)
+
+
+def _build_dashboard(db: Session, today: date, tenant_id: int) -> DashboardOut:
+    k = _Kpis(db, today, tenant_id)
+
+    # ── Cash Position ────────────────────────────────────────────────
     cash = CashPositionOut(
-        cash_on_hand=cash_on_hand, ar_outstanding=ar or Decimal("0"),
-        ap_outstanding=ap or Decimal("0"),
-        remaining_draws=remaining_draws or Decimal("0"),
-        retainage_receivable=ret_recv or Decimal("0"),
-        retainage_payable=ret_pay or Decimal("0"),
+        cash_on_hand=_dec(k.cash_on_hand), ar_outstanding=_dec(k.ar),
+        ap_outstanding=_dec(k.ap),
+        remaining_draws=_dec(k.remaining_draws),
+        retainage_receivable=_dec(k.receivable),
+        retainage_payable=_dec(k.payable),
     )
 
     # ── Debt Summary ─────────────────────────────────────────────────
-    debt_q = db.query(
-        func.count(Debt.id),
-        func.coalesce(func.sum(Debt.current_balance), 0),
-        func.coalesce(func.sum(case(
-            (Debt.debt_type == DebtType.construction_loan, Debt.current_balance),
-            else_=0
-        )), 0),
-        func.coalesce(func.sum(case(
-            (Debt.debt_type == DebtType.credit_card, Debt.current_balance),
-            else_=0
-        )), 0),
-    ).filter(Debt.is_active == True).first()
-
-    debt_count, total_debt, const_loans, cc_debt = debt_q
+    total_debt, const_loans, cc_debt = _dec(k.debt_total), _dec(k.construction), _dec(k.credit_cards)
     debt = DebtSummaryOut(
         total_debt=total_debt, construction_loans=const_loans,
-        credit_cards=cc_debt, other_debt=total_debt - const_loans - cc_debt,
-        active_count=debt_count,
+        credit_cards=cc_debt, mca_debt=_dec(None),
+        other_debt=total_debt - const_loans - cc_debt,
+        active_count=k.debt_count,
     )
 
     # ── Project Summary ──────────────────────────────────────────────
-    proj_q = db.query(
-        func.count(Project.id),
-        func.coalesce(func.sum(Project.budget_total), 0),
-        func.coalesce(func.sum(Project.contract_amount), 0),
-    ).filter(Project.status == ProjectStatus.active).first()
-
-    active_count, total_budget, total_released = proj_q
+    total_budget, total_released = _dec(k.budget), _dec(k.released)
     projects = ProjectSummaryOut(
-        active_projects=active_count, total_budget=total_budget,
+        active_projects=k.project_count, total_budget=total_budget,
         total_spent=total_released,
         total_remaining=total_budget - total_released,
         avg_percent_complete=Decimal(str(
@@ -104,107 +183,67 @@ def get_dashboard(db: Session = Depends(get_db)):
     )
 
     # ── Pipeline ─────────────────────────────────────────────────────
-    pipe_q = db.query(
-        func.count(BidPipeline.id),
-        func.coalesce(func.sum(BidPipeline.estimated_value), 0),
-        func.coalesce(func.sum(case(
-            (BidPipeline.status == BidStatus.won, BidPipeline.estimated_value),
-            else_=0
-        )), 0),
-        func.count(case((BidPipeline.status == BidStatus.won, 1))),
-    ).first()
-
-    pipe_count, pipe_val, won_val, won_count = pipe_q
     pipeline = PipelineSummaryOut(
-        total_opportunities=pipe_count, total_value=pipe_val,
-        won_count=won_count, won_value=won_val,
+        total_opportunities=k.pipe_count, total_value=_dec(k.pipe_value),
+        won_count=k.won_count, won_value=_dec(k.won_value),
     )
 
     # ── Payroll ──────────────────────────────────────────────────────
-    from backend.models.core import Employee
-    emp_count = db.query(func.count(Employee.id)).filter(Employee.is_active == True).scalar()
-    annual_salary = db.query(func.coalesce(func.sum(Employee.salary), 0)).filter(
-        Employee.is_active == True).scalar()
-
-    next_pay = db.query(PayrollCalendar.pay_date).filter(
-        PayrollCalendar.pay_date >= date.today()
-    ).order_by(PayrollCalendar.pay_date).first()
-
+    annual_salary = _dec(k.salary)
     payroll = PayrollSummaryOut(
-        employee_count=emp_count or 0,
-        biweekly_cost=Decimal(str(round(float(annual_salary or 0) / 26, 2))),
-        annual_cost=annual_salary or Decimal("0"),
-        next_pay_date=next_pay[0] if next_pay else None,
+        employee_count=k.emp_count or 0,
+        biweekly_cost=Decimal(str(round(float(annual_salary) / 26, 2))),
+        annual_cost=annual_salary,
+        next_pay_date=k.next_pay,
     )
 
-    # ── Alerts ───────────────────────────────────────────────────────
-    alerts = _generate_alerts(db)
-
     return DashboardOut(
         cash=cash, debt=debt, projects=projects,
-        pipeline=pipeline, payroll=payroll, alerts=alerts,
+        pipeline=pipeline, payroll=payroll, alerts=_generate_alerts(k, today),
     )
 
 
-def _generate_alerts(db: Session) -> list[AlertOut]:
-    """Generate real-time alerts from current data state."""
+def _generate_alerts(k, today: date) -> list[AlertOut]:
+    """Generate real-time alerts from the KPIs."""
     alerts = []
-    today = date.today()
 
     # Overdue invoices
-    overdue = db.query(func.count(Invoice.id), func.coalesce(func.sum(Invoice.balance), 0)).filter(
-        Invoice.status == InvoiceStatus.overdue).first()
-    if overdue[0] > 0:
+    if k.overdue_count > 0:
         alerts.append(AlertOut(
             level="critical", category="AR",
-            message=f"{overdue[0]} overdue invoices totaling ${overdue[1]:,.0f}",
+            message=f"{k.overdue_count} overdue invoices totaling ${_dec(k.overdue_total):,.0f}",
             link="/financials/ar",
         ))
 
     # Expiring vendor insurance
-    thirty_days = today + timedelta(days=30)
-    exp_vendors = db.query(func.count(Vendor.id)).filter(
-        Vendor.insurance_expiry.isnot(None),
-        Vendor.insurance_expiry <= thirty_days,
-        Vendor.insurance_expiry >= today,
-    ).scalar()
-    if exp_vendors > 0:
+    if k.expiring > 0:
         alerts.append(AlertOut(
             level="warning", category="Compliance",
-            message=f"{exp_vendors} vendor insurance expiring within 30 days",
+            message=f"{k.expiring} vendor insurance expiring within 30 days",
             link="/vendors",
         ))
 
     # Missing lien waivers (high-value vendors without recent waivers)
-    waiver_count = db.query(func.count(LienWaiver.id)).filter(
-        LienWaiver.waiver_type.is_(None)).scalar()
-    if waiver_count > 0:
+    if k.missing > 0:
         alerts.append(AlertOut(
             level="warning", category="Lien Risk",
-            message=f"{waiver_count} vendors missing lien waiver documentation",
+            message=f"{k.missing} vendors missing lien waiver documentation",
             link="/lien-waivers",
         ))
 
     # Upcoming payroll
-    next_pay = db.query(PayrollCalendar).filter(
-        PayrollCalendar.pay_date >= today,
-        PayrollCalendar.pay_date <= today + timedelta(days=7),
-    ).first()
-    if next_pay:
+    if k.next_pay is not None and k.next_pay <= today + timedelta(days=7):
         alerts.append(AlertOut(
             level="info", category="Payroll",
-            message=f"Payroll due {next_pay.pay_date.strftime('%b %d')}",
+            message=f"Payroll due {k.next_pay.strftime('%b %d')}",
             link="/payroll",
         ))
 
     # Budget overages
-    from backend.models.core import CostCode
-    overages = db.query(func.count(CostCode.id)).filter(
-        CostCode.variance < 0).scalar()
-    if overages > 0:
+    if k.over > 0:
         alerts.append(AlertOut(
             level="warning", category="Budget",
-            message=f"{overages} cost codes over budget",
+            message=f"{k.over} cost codes over budget",
             link="/projects",
         ))
 
@@ -14,11 +14,13 @@ from datetime import date
 from decimal import Decimal
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from backend.core import rollups
 from backend.core.deps import get_db
+from backend.core.pagination import paginate
 from backend.models.core import Invoice, InvoiceStatus
 from backend.models.extended import (
     CashForecastLine, CostEvent, Debt, PLEntry, Property,
@@ -69,22 +71,26 @@ def get_pl_summary(
     division: Optional[str] = None,
     year: Optional[int] = Query(default=None),
     db: Session = Depends(get_db),
+    x_tenant_id: int | None = Header(default=None),
 ):
-    """Summarized P&L by month — revenue, expenses, and net for charting."""
-    year = year or date.today().year
-    q = db.query(
-        PLEntry.period_month,
-        PLEntry.account_name,
-        func.sum(PLEntry.amount),
-    ).filter(PLEntry.period_year == year)
-
-    if division:
-        q = q.filter(PLEntry.division == division)
+    """Summarized P&L by month — revenue, expenses, and net for charting.
 
-    rows = q.group_by(PLEntry.period_month, PLEntry.account_name).all()
+    Read from the "pl" KPI rollup, keyed "year|month|division|account".
+    """
+    year = year or date.today().year
+    totals: dict = {}
+    for key, (_, amount, _, _) in rollups.read(
+            db, "pl", x_tenant_id or rollups.DEFAULT_TENANT).items():
+        if key == rollups.TOTAL:
+            continue
+        row_year, month, row_division, acct = key.split("|", 3)
+        if int(row_year) != year or (division and row_division != division):
+            continue
+        group = (int(month), acct)
+        totals[group] = totals.get(group, Decimal("0")) + amount
 
     by_month: dict = {}
-    for month, acct, total in rows:
+    for (month, acct), total in totals.items():
         if month not in by_month:
             by_month[month] = {"month": month, "revenue": Decimal("0"),
                                "expenses": Decimal("0"), "net": Decimal("0")}
@@ -176,30 +182,26 @@ def get_properties(db: Session = Depends(get_db)):
 def list_transactions(
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    exact_total: bool = False,
     source: Optional[str] = None,
     vendor_id: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     db: Session = Depends(get_db),
 ):
-    """Paginated transaction log (all cost events)."""
+    """Paginated transaction log (all cost events), newest first."""
     q = db.query(CostEvent)
     if source:
-        q = q.filter(CostEvent.source == source)
+        q = q.filter(CostEvent.source_type == source)
     if vendor_id:
         q = q.filter(CostEvent.vendor_id == vendor_id)
     if start_date:
-        q = q.filter(CostEvent.date >= start_date)
+        q = q.filter(CostEvent.event_date >= start_date)
     if end_date:
-        q = q.filter(CostEvent.date <= end_date)
-
-    total = q.count()
-    items = q.order_by(CostEvent.date.desc().nullslast()).offset(
-        (page - 1) * per_page
-    ).limit(per_page).all()
-
-    return PaginatedResponse(
-        total=total, page=page, per_page=per_page,
-        pages=(total + per_page - 1) // per_page,
-        items=[CostEventOut.model_validate(e) for e in items],
-    )
+        q = q.filter(CostEvent.event_date <= end_date)
+
+    result = paginate(q, CostEvent.event_date, CostEvent.id, descending=True,
+                      cursor=cursor, page=page, per_page=per_page, exact_total=exact_total)
+    return PaginatedResponse(**result.response(
+        [CostEventOut.model_validate(e) for e in result.items]))
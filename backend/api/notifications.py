@@ -1,8 +1,17 @@
-"""Notifications API — in-app notification feed."""
+"""Notifications API — in-app notification feed.
+
+``GET /notifications/stream`` pushes new notifications and unread-count
+changes as server-sent events (see core/realtime.py), so clients don't
+need to poll the feed or the count.
+"""
 
 from typing import Optional
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.core import realtime
+from backend.core.database import SessionLocal
 from backend.core.deps import get_db
 from backend.models.extended import Notification
 
@@ -11,13 +20,15 @@ router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 @router.get("")
 def list_notifications(
-    user_id: str = Query("mike", description="User ID"),
+    recipient_id: Optional[int] = Query(None, description="Employee ID; all recipients if omitted"),
     unread_only: bool = Query(False),
     limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
     """List notifications for a user."""
-    q = db.query(Notification).filter(Notification.user_id == user_id)
+    q = db.query(Notification)
+    if recipient_id is not None:
+        q = q.filter(Notification.recipient_id == recipient_id)
     if unread_only:
         q = q.filter(Notification.is_read == False)
     notifications = q.order_by(Notification.created_at.desc()).limit(limit).all()
@@ -34,20 +45,33 @@ def list_notifications(
 
 @router.get("/unread-count")
 def unread_count(
-    user_id: str = Query("mike"),
+    recipient_id: Optional[int] = Query(None, description="Employee ID; all recipients if omitted"),
     db: Session = Depends(get_db),
 ):
-    """Get count of unread notifications."""
-    count = db.query(Notification).filter(
-        Notification.user_id == user_id,
-        Notification.is_read == False,
-    ).count()
-    # Demo fallback: 2 if db empty
-    if count == 0:
-        count = db.query(Notification).count()
-        if count == 0:
-            return {"count": 2}
-    return {"count": count}
+    """Get count of unread notifications (kept in memory, see core/realtime.py)."""
+    return {"count": realtime.unread.get(db, recipient_id)}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    recipient_id: Optional[int] = Query(None, description="Employee ID; all recipients if omitted"),
+):
+    """Server-sent events: ``unread`` with the current count on connect,
+    then ``notification``, ``read`` and ``read_all`` as they happen, each
+    carrying the new ``unread_count``. A ``resync`` event means events were
+    dropped; reload the feed and reconnect."""
+
+    def count() -> int:
+        db = SessionLocal()
+        try:
+            return realtime.unread.get(db, recipient_id)
+        finally:
+            db.close()
+
+    initial = await run_in_threadpool(count)
+    return StreamingResponse(realtime.stream(recipient_id, initial, count),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @router.post("/{notification_id}/read")
@@ -56,6 +80,8 @@ def mark_read(notification_id: int, db: Session = Depends(get_db)):
     notif = db.query(Notification).filter(Notification.id == notification_id).first()
     if notif:
         from datetime import datetime
+        if not notif.is_read:
+            realtime.marked_read(db, notif.recipient_id, notif.id)
         notif.is_read = True
         notif.read_at = datetime.now()
         db.commit()
@@ -64,12 +90,16 @@ def mark_read(notification_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/read-all")
-def mark_all_read(user_id: str = Query("mike"), db: Session = Depends(get_db)):
-    """Mark all notifications as read for a user."""
+def mark_all_read(
+    recipient_id: Optional[int] = Query(None, description="Employee ID; all recipients if omitted"),
+    db: Session = Depends(get_db),
+):
+    """Mark all notifications as read for a recipient."""
     from datetime import datetime
-    db.query(Notification).filter(
-        Notification.user_id == user_id,
-        Notification.is_read == False,
-    ).update({"is_read": True, "read_at": datetime.now()})
+    q = db.query(Notification).filter(Notification.is_read == False)
+    if recipient_id is not None:
+        q = q.filter(Notification.recipient_id == recipient_id)
+    count = q.update({"is_read": True, "read_at": datetime.now()})
+    realtime.marked_all_read(db, recipient_id, count)
     db.commit()
     return {"ok": True}
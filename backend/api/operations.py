@@ -44,7 +44,7 @@ def _publish_event(
     event_type: str,
     source_type: str,
     source_id: int,
-    payload: str | None = None,
+    payload: dict | None = None,
 ) -> None:
     db.add(
         SystemEvent(
@@ -18,6 +18,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from backend.core.deps import get_db
+from backend.core.pagination import paginate
 from backend.models.core import (
     ChangeOrder, CostCode, PayApp, Project,
     ProjectStatus, SOVLine,
@@ -36,6 +37,8 @@ router = APIRouter(prefix="/projects", tags=["Projects"])
 def list_projects(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    exact_total: bool = False,
     status: Optional[str] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -52,14 +55,10 @@ def list_projects(
             Project.name.ilike(f"%{search}%") | Project.code.ilike(f"%{search}%")
         )
 
-    total = q.count()
-    items = q.order_by(Project.code).offset((page - 1) * per_page).limit(per_page).all()
-
-    return PaginatedResponse(
-        total=total, page=page, per_page=per_page,
-        pages=(total + per_page - 1) // per_page,
-        items=[ProjectListOut.model_validate(p) for p in items],
-    )
+    result = paginate(q, Project.code, Project.id, cursor=cursor, page=page,
+                      per_page=per_page, exact_total=exact_total)
+    return PaginatedResponse(**result.response(
+        [ProjectListOut.model_validate(p) for p in result.items]))
 
 
 @router.get("/{project_id}", response_model=ProjectDetailOut)
@@ -157,21 +156,17 @@ def get_project_transactions(
     project_id: int,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    exact_total: bool = False,
     db: Session = Depends(get_db),
 ):
-    """Paginated cost events (transactions) for a project."""
+    """Paginated cost events (transactions) for a project, newest first."""
     _ensure_project(project_id, db)
     q = db.query(CostEvent).filter(CostEvent.project_id == project_id)
-    total = q.count()
-    items = q.order_by(CostEvent.date.desc().nullslast()).offset(
-        (page - 1) * per_page
-    ).limit(per_page).all()
-
-    return PaginatedResponse(
-        total=total, page=page, per_page=per_page,
-        pages=(total + per_page - 1) // per_page,
-        items=[CostEventOut.model_validate(e) for e in items],
-    )
+    result = paginate(q, CostEvent.event_date, CostEvent.id, descending=True,
+                      cursor=cursor, page=page, per_page=per_page, exact_total=exact_total)
+    return PaginatedResponse(**result.response(
+        [CostEventOut.model_validate(e) for e in result.items]))
 
 
 def _ensure_project(project_id: int, db: Session):
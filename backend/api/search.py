@@ -2,16 +2,18 @@
 
 GET  /api/search?q={query}  → grouped results from projects, vendors, employees,
                                invoices, and documents
+
+Matches and ranking come from the search index (backend.core.search); the
+matched rows are then loaded by primary key for the per-entity fields. Each
+entity type is searched and loaded concurrently on its own session.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import inspect as sa_inspect
+from fastapi import APIRouter, Query
 from sqlalchemy.orm import Session
 
-from backend.core.deps import get_db
-from backend.core.database import engine
+from backend.core import search as search_index
 from backend.models.core import Employee, Invoice, Project, Vendor
 from backend.models.extended import Document
 from backend.models.document_vault import VaultDocument
@@ -22,144 +24,62 @@ router = APIRouter(prefix="/search", tags=["Search"])
 _PER_ENTITY_LIMIT = 5
 
 
-def _table_exists(table_name: str) -> bool:
-    """Check whether a table exists in the database."""
-    inspector = sa_inspect(engine)
-    return table_name in inspector.get_table_names()
+def _document(r) -> dict:
+    return {"id": r.id, "title": r.title, "doc_type": r.doc_type}
 
 
-def _search_projects(db: Session, term: str) -> List[Dict[str, Any]]:
-    """Search projects by name or code."""
-    if not _table_exists("projects"):
-        return []
-    rows = (
-        db.query(Project)
-        .filter(Project.name.ilike(f"%{term}%") | Project.code.ilike(f"%{term}%"))
-        .order_by(Project.code)
-        .limit(_PER_ENTITY_LIMIT)
-        .all()
-    )
-    return [{"id": r.id, "name": r.name, "code": r.code} for r in rows]
+# Index entity type → (model, response shape)
+_SHAPES: Dict[str, Tuple[Any, Callable[[Any], dict]]] = {
+    "projects": (Project, lambda r: {"id": r.id, "name": r.name, "code": r.code}),
+    "vendors": (Vendor, lambda r: {"id": r.id, "name": r.name, "trade": r.trade}),
+    "employees": (Employee, lambda r: {"id": r.id, "name": f"{r.first_name} {r.last_name}",
+                                       "role": r.role}),
+    "invoices": (Invoice, lambda r: {"id": r.id, "number": r.invoice_number,
+                                     "amount": float(r.amount or 0)}),
+    "vault_documents": (VaultDocument, _document),
+    "documents": (Document, _document),
+}
 
 
-def _search_vendors(db: Session, term: str) -> List[Dict[str, Any]]:
-    """Search vendors by name or trade."""
-    if not _table_exists("vendors"):
+def _load(db: Session, name: str, hits: List[dict]) -> List[dict]:
+    """Shaped rows for ``hits`` in rank order (skipping any deleted since indexing)."""
+    model, shape = _SHAPES[name]
+    ids = [h["id"] for h in hits]
+    if not ids:
         return []
-    rows = (
-        db.query(Vendor)
-        .filter(Vendor.name.ilike(f"%{term}%") | Vendor.trade.ilike(f"%{term}%"))
-        .order_by(Vendor.name)
-        .limit(_PER_ENTITY_LIMIT)
-        .all()
-    )
-    return [{"id": r.id, "name": r.name, "trade": r.trade} for r in rows]
-
-
-def _search_employees(db: Session, term: str) -> List[Dict[str, Any]]:
-    """Search employees by first name, last name, or role."""
-    if not _table_exists("employees"):
-        return []
-    rows = (
-        db.query(Employee)
-        .filter(
-            Employee.first_name.ilike(f"%{term}%")
-            | Employee.last_name.ilike(f"%{term}%")
-            | Employee.role.ilike(f"%{term}%")
-        )
-        .order_by(Employee.last_name, Employee.first_name)
-        .limit(_PER_ENTITY_LIMIT)
-        .all()
-    )
-    return [
-        {
-            "id": r.id,
-            "name": f"{r.first_name} {r.last_name}",
-            "role": r.role,
-        }
-        for r in rows
-    ]
-
-
-def _search_invoices(db: Session, term: str) -> List[Dict[str, Any]]:
-    """Search invoices by invoice number."""
-    if not _table_exists("invoices"):
-        return []
-    rows = (
-        db.query(Invoice)
-        .filter(Invoice.invoice_number.ilike(f"%{term}%"))
-        .order_by(Invoice.invoice_number)
-        .limit(_PER_ENTITY_LIMIT)
-        .all()
-    )
-    return [
-        {"id": r.id, "number": r.invoice_number, "amount": float(r.amount or 0)}
-        for r in rows
-    ]
-
-
-def _search_documents(db: Session, term: str) -> List[Dict[str, Any]]:
-    """Search vault documents by title or doc_type, falling back to the
-    core documents table if the vault table does not exist yet."""
-    if _table_exists("vault_documents"):
-        rows = (
-            db.query(VaultDocument)
-            .filter(
-                VaultDocument.title.ilike(f"%{term}%")
-                | VaultDocument.doc_type.ilike(f"%{term}%")
-            )
-            .order_by(VaultDocument.title)
-            .limit(_PER_ENTITY_LIMIT)
-            .all()
-        )
-        return [{"id": r.id, "title": r.title, "doc_type": r.doc_type} for r in rows]
-
-    if _table_exists("documents"):
-        rows = (
-            db.query(Document)
-            .filter(
-                Document.title.ilike(f"%{term}%")
-                | Document.file_type.ilike(f"%{term}%")
-            )
-            .order_by(Document.title)
-            .limit(_PER_ENTITY_LIMIT)
-            .all()
-        )
-        return [
-            {"id": r.id, "title": r.title, "doc_type": r.file_type} for r in rows
-        ]
-
-    return []
+    by_id = {r.id: r for r in db.query(model).filter(model.id.in_(ids))}
+    return [shape(by_id[i]) for i in ids if i in by_id]
 
 
 @router.get("")
-def global_search(
+async def global_search(
     q: str = Query(..., min_length=2, description="Search term (min 2 characters)"),
-    db: Session = Depends(get_db),
 ):
     """Search across projects, vendors, employees, invoices, and documents.
 
-    Returns grouped results with up to 5 matches per entity type.
+    Returns grouped results with up to 5 matches per entity type, best first.
+    Entity types are searched concurrently; any that exceed the per-entity
+    time budget are listed in ``timed_out``, any whose query fails in
+    ``failed``, and both come back empty (``partial`` is then true).
     """
-    projects = _search_projects(db, q)
-    vendors = _search_vendors(db, q)
-    employees = _search_employees(db, q)
-    invoices = _search_invoices(db, q)
-    documents = _search_documents(db, q)
-
-    total_count = (
-        len(projects) + len(vendors) + len(employees)
-        + len(invoices) + len(documents)
+    found, timed_out, failed = await search_index.search_concurrent(
+        q, _SHAPES, _PER_ENTITY_LIMIT, load=_load,
     )
+    # Vault documents first; the core documents table as a fallback
+    documents = found.get("vault_documents") or found.get("documents", [])
+    results = {
+        "projects": found.get("projects", []),
+        "vendors": found.get("vendors", []),
+        "employees": found.get("employees", []),
+        "invoices": found.get("invoices", []),
+        "documents": documents,
+    }
 
     return {
         "query": q,
-        "results": {
-            "projects": projects,
-            "vendors": vendors,
-            "employees": employees,
-            "invoices": invoices,
-            "documents": documents,
-        },
-        "total_count": total_count,
+        "results": results,
+        "total_count": sum(len(v) for v in results.values()),
+        "timed_out": timed_out,
+        "failed": failed,
+        "partial": bool(timed_out or failed),
     }
@@ -1,89 +1,41 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from backend.core import realtime
+from backend.core import search as search_index
 from backend.core.deps import get_db
-from backend.models.core import Employee, Project, Vendor
-from backend.models.extended import Document, Notification
+from backend.models.extended import Notification
 
 router = APIRouter(tags=["Shell"])
 
 
 @router.get("/search")
-def global_search(
+async def global_search(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=5, ge=1, le=25),
     types: str | None = Query(default=None),
-    db: Session = Depends(get_db),
 ):
     wanted = set((types or "projects,vendors,employees,documents").split(","))
-    query = f"%{q}%"
-    results: dict[str, list[dict]] = {}
-
-    if "projects" in wanted:
-        rows = (
-            db.query(Project)
-            .filter(or_(Project.name.ilike(query), Project.code.ilike(query), Project.address.ilike(query)))
-            .limit(limit)
-            .all()
-        )
-        results["projects"] = [
-            {
-                "id": r.id,
-                "type": "project",
-                "title": r.name,
-                "subtitle": f"{r.code} · {r.status.value if r.status else 'unknown'}",
-                "url": f"/projects/{r.id}",
-            }
-            for r in rows
-        ]
-
-    if "vendors" in wanted:
-        rows = db.query(Vendor).filter(Vendor.name.ilike(query)).limit(limit).all()
-        results["vendors"] = [
-            {
-                "id": r.id,
-                "type": "vendor",
-                "title": r.name,
-                "subtitle": r.trade or "Vendor",
-                "url": f"/vendors?vendor_id={r.id}",
-            }
-            for r in rows
-        ]
-
-    if "employees" in wanted:
-        rows = (
-            db.query(Employee)
-            .filter(or_(Employee.first_name.ilike(query), Employee.last_name.ilike(query), Employee.email.ilike(query)))
-            .limit(limit)
-            .all()
-        )
-        results["employees"] = [
-            {
-                "id": r.id,
-                "type": "employee",
-                "title": f"{r.first_name} {r.last_name}",
-                "subtitle": r.role or "Team",
-                "url": "/team",
-            }
-            for r in rows
-        ]
-
-    if "documents" in wanted:
-        rows = db.query(Document).filter(Document.title.ilike(query)).limit(limit).all()
-        results["documents"] = [
+    hits, timed_out, failed = await search_index.search_concurrent(q, wanted, limit)
+    singular = {name: name[:-1] for name in search_index.ENTITIES}
+    results: dict[str, list[dict]] = {
+        name: [
             {
-                "id": r.id,
-                "type": "document",
-                "title": r.title,
-                "subtitle": r.doc_type,
-                "url": f"/documents?document_id={r.id}",
+                "id": h["id"],
+                "type": singular[name],
+                "title": h["title"],
+                "subtitle": h["subtitle"],
+                "url": h["url"],
+                "score": h["score"],
             }
-            for r in rows
+            for h in hits.get(name, [])
         ]
+        for name in wanted if name in search_index.ENTITIES
+    }
 
     total = sum(len(v) for v in results.values())
-    return {"query": q, "total": total, "results": results}
+    return {"query": q, "total": total, "results": results, "timed_out": timed_out,
+            "failed": failed, "partial": bool(timed_out or failed)}
 
 
 @router.get("/notifications")
@@ -96,7 +48,7 @@ def get_notifications(
     if status == "unread":
         q = q.filter(Notification.is_read.is_(False))
     rows = q.order_by(Notification.created_at.desc()).limit(limit).all()
-    unread_count = db.query(Notification).filter(Notification.is_read.is_(False)).count()
+    unread_count = realtime.unread.get(db, None)
     return {
         "unread_count": unread_count,
         "items": [
@@ -120,6 +72,8 @@ def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
     row = db.query(Notification).filter(Notification.id == notification_id).first()
     if not row:
         return {"ok": False}
+    if not row.is_read:
+        realtime.marked_read(db, row.recipient_id, row.id)
     row.is_read = True
     db.commit()
     return {"ok": True}
@@ -127,6 +81,7 @@ def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
 
 @router.patch("/notifications/read-all")
 def mark_all_read(db: Session = Depends(get_db)):
-    db.query(Notification).filter(Notification.is_read.is_(False)).update({"is_read": True})
+    count = db.query(Notification).filter(Notification.is_read.is_(False)).update({"is_read": True})
+    realtime.marked_all_read(db, None, count)
     db.commit()
     return {"ok": True}
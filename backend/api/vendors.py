@@ -12,6 +12,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from backend.core.deps import get_db
+from backend.core.pagination import paginate
 from backend.models.core import Vendor
 from backend.schemas import PaginatedResponse, VendorDetailOut, VendorListOut
 
@@ -46,6 +47,8 @@ def vendor_scorecard(
 def list_vendors(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    exact_total: bool = False,
     search: Optional[str] = None,
     trade: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -57,14 +60,10 @@ def list_vendors(
     if trade:
         q = q.filter(Vendor.trade.ilike(f"%{trade}%"))
 
-    total = q.count()
-    items = q.order_by(Vendor.name).offset((page - 1) * per_page).limit(per_page).all()
-
-    return PaginatedResponse(
-        total=total, page=page, per_page=per_page,
-        pages=(total + per_page - 1) // per_page,
-        items=[VendorListOut.model_validate(v) for v in items],
-    )
+    result = paginate(q, Vendor.name, Vendor.id, cursor=cursor, page=page,
+                      per_page=per_page, exact_total=exact_total)
+    return PaginatedResponse(**result.response(
+        [VendorListOut.model_validate(v) for v in result.items]))
 
 
 @router.get("/{vendor_id}", response_model=VendorDetailOut)
@@ -0,0 +1,104 @@
+"""In-process TTL cache for expensive read endpoints, invalidated on commit.
+
+``TTLCache`` holds computed values for ``ttl`` seconds. ``invalidate_on_commit``
+hooks SQLAlchemy session events so that any commit writing one of the watched
+tables — via the ORM unit of work or a Core insert/update/delete executed on
+the session — clears the cache.
+
+Entries live in this process only: writes made by another process (a worker
+or a second API instance) are picked up when the TTL expires.
+"""
+
+import time
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TTLCache:
+    """Key → value with a per-entry time-to-live and hit/miss counters."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self.invalidations
+        value = compute()
+        with self._lock:
+            # A commit that landed while computing may not be reflected; don't keep it
+            if generation == self.invalidations:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "invalidations": self.invalidations,
+        }
+
+
+def invalidate_on_commit(cache: TTLCache, tables) -> None:
+    """Clear ``cache`` after any session commit that wrote one of ``tables``.
+
+    ``tables`` are table names. Writes are collected per session on flush and
+    on Core DML, and discarded on rollback.
+    """
+    watched = frozenset(tables)
+    flag = ("cache_dirty", id(cache))
+
+    def _touch(session: Session, names) -> None:
+        if watched.intersection(names):
+            session.info[flag] = True
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session, flush_context):
+        _touch(session, {
+            obj.__table__.name
+            for obj in (*session.new, *session.dirty, *session.deleted)
+            if hasattr(obj, "__table__")
+        })
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _on_execute(state):
+        if state.is_insert or state.is_update or state.is_delete:
+            table = getattr(state.statement, "table", None)
+            if table is not None:
+                _touch(state.session, {table.name})
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        if session.info.pop(flag, False):
+            cache.invalidate()
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop(flag, None)
@@ -15,6 +15,33 @@ class Settings:
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     echo_sql: bool = os.getenv("ECHO_SQL", "false").lower() == "true"
     import_batch_size: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+    # Process pool size of masterfile / budget imports started from the API;
+    # > 1 forks the uvicorn worker (see api/admin.py)
+    import_api_workers: int = int(os.getenv("IMPORT_API_WORKERS", "1"))
+    dashboard_cache_ttl: float = float(os.getenv("DASHBOARD_CACHE_TTL", "60"))
+    count_cache_ttl: float = float(os.getenv("COUNT_CACHE_TTL", "300"))
+    # "GET /api/dashboard=5q,250ms; GET /api/search=100ms" (see core/instrumentation.py)
+    route_budgets: str = os.getenv("ROUTE_BUDGETS", "")
+    search_workers: int = int(os.getenv("SEARCH_WORKERS", "8"))
+    search_entity_timeout: float = float(os.getenv("SEARCH_ENTITY_TIMEOUT", "0.5"))
+    # SystemEvent outbox dispatcher (see core/outbox.py)
+    outbox_enabled: bool = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+    outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    outbox_workers: int = int(os.getenv("OUTBOX_WORKERS", "4"))
+    outbox_poll_interval: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))
+    outbox_max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    # Processed system_events older than this are pruned nightly (core/events.py)
+    event_retention_days: int = int(os.getenv("EVENT_RETENTION_DAYS", "90"))
+    # Days of kpi_rollups history kept by the nightly check (core/rollups.py)
+    kpi_rollup_retention_days: int = int(os.getenv("KPI_ROLLUP_RETENTION_DAYS", "400"))
+    # Notification push (see core/realtime.py): "local" or "redis" (uses REDIS_URL)
+    realtime_broker: str = os.getenv("REALTIME_BROKER", "local")
+    realtime_heartbeat: float = float(os.getenv("REALTIME_HEARTBEAT", "25"))
+    realtime_queue_size: int = int(os.getenv("REALTIME_QUEUE_SIZE", "100"))
+    unread_count_ttl: float = float(os.getenv("UNREAD_COUNT_TTL", "300"))
+    # Sync worker (see sync/worker.py, sync/scheduler.py)
+    scheduler_lease_ttl: float = float(os.getenv("SCHEDULER_LEASE_TTL", "60"))
+    scheduler_misfire_grace: int = int(os.getenv("SCHEDULER_MISFIRE_GRACE", "600"))
 
     # API
     api_title: str = "SECG ERP API"
@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from backend.core.config import settings
+from backend.core.jsontypes import dumps
 
 _url = settings.database_url
 
@@ -19,6 +20,7 @@ engine = create_engine(
     max_overflow=20,
     pool_pre_ping=True,
     connect_args=_connect_args,
+    json_serializer=dumps,
 )
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
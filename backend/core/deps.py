@@ -2,14 +2,21 @@
 
 from typing import Generator
 
+from fastapi import Header
 from sqlalchemy.orm import Session
 
 from backend.core.database import SessionLocal
 
 
-def get_db() -> Generator[Session, None, None]:
-    """Yield a database session per request, auto-closing on completion."""
+def get_db(x_tenant_id: int | None = Header(default=None)) -> Generator[Session, None, None]:
+    """Yield a database session per request, auto-closing on completion.
+
+    The request's ``X-Tenant-Id`` is kept in ``session.info["tenant_id"]``
+    (see core/rollups.py).
+    """
     db = SessionLocal()
+    if x_tenant_id is not None:
+        db.info["tenant_id"] = x_tenant_id
     try:
         yield db
     finally:
@@ -0,0 +1,197 @@
+"""System event storage: payload indexes, querying and retention.
+
+``system_events.payload`` is a JSON object (JSONB on PostgreSQL). On top of
+the model's btree indexes (type, source and creation time):
+
+- PostgreSQL: a GIN ``jsonb_path_ops`` index serves payload containment
+  filters (``{"records_processed": 0}``), and expression indexes serve the
+  keys in ``INDEXED_KEYS`` together with a time range.
+- SQLite: ``json_extract`` expression indexes on ``INDEXED_KEYS``.
+
+``upgrade()`` (run at startup) brings a table created before payloads were
+JSON up to date. It re-wraps text that isn't valid JSON as ``{"raw": ...}``,
+converts the column to JSONB on PostgreSQL, and creates the indexes.
+
+Retention is time based. ``prune()`` deletes processed events older than
+``EVENT_RETENTION_DAYS`` in short batches along the ``created_at`` index.
+The sync worker runs it nightly.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DDL, delete, event, func, inspect, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Query, Session
+
+from backend.core.config import settings
+from backend.core.database import engine
+from backend.core.jsontypes import dumps, json_value
+from backend.models.extended import Notification, SystemEvent
+
+
+logger = logging.getLogger("secg.events")
+
+# Payload keys with their own (key, created_at) expression index
+INDEXED_KEYS = ("sync_name",)
+
+PRUNE_BATCH = 5000
+
+_table = SystemEvent.__table__
+
+_PG_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_system_events_payload_gin "
+    "ON system_events USING gin (payload jsonb_path_ops)",
+] + [
+    f"CREATE INDEX IF NOT EXISTS ix_system_events_{key} "
+    f"ON system_events ((payload ->> '{key}'), created_at)"
+    for key in INDEXED_KEYS
+]
+_SQLITE_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS ix_system_events_{key} "
+    f"ON system_events (json_extract(payload, '$.{key}'), created_at)"
+    for key in INDEXED_KEYS
+]
+
+for _ddl in _PG_INDEXES:
+    event.listen(_table, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+for _ddl in _SQLITE_INDEXES:
+    event.listen(_table, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+
+
+# ── Upgrading existing tables ────────────────────────────────────────────
+
+def _repair(conn, rows) -> int:
+    """Re-wrap payload texts that aren't JSON; returns rows rewritten."""
+    fixes = []
+    for event_id, text in rows:
+        try:
+            json.loads(text)
+        except ValueError:
+            fixes.append({"i": event_id, "p": dumps({"raw": text})})
+    if fixes:
+        conn.exec_driver_sql(
+            "UPDATE system_events SET payload = %(p)s WHERE id = %(i)s"
+            if conn.dialect.paramstyle == "pyformat"
+            else "UPDATE system_events SET payload = :p WHERE id = :i",
+            fixes,
+        )
+    return len(fixes)
+
+
+def upgrade(bind=None) -> list[str]:
+    """Convert legacy text payloads and create the payload indexes."""
+    bind = bind if bind is not None else engine
+    done = []
+    with bind.begin() as conn:
+        columns = {c["name"]: c["type"] for c in inspect(conn).get_columns("system_events")} \
+            if inspect(conn).has_table("system_events") else {}
+        if not columns:
+            return done
+        if conn.dialect.name == "postgresql":
+            if not isinstance(columns["payload"], JSONB):
+                rows = conn.exec_driver_sql(
+                    "SELECT id, payload FROM system_events WHERE payload IS NOT NULL")
+                repaired = _repair(conn, rows.fetchall())
+                conn.exec_driver_sql(
+                    "ALTER TABLE system_events ALTER COLUMN payload TYPE jsonb USING payload::jsonb")
+                done.append(f"system_events.payload -> jsonb ({repaired} rows re-wrapped)")
+            statements = _PG_INDEXES
+        elif conn.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(
+                "SELECT id, payload FROM system_events "
+                "WHERE payload IS NOT NULL AND NOT json_valid(payload)")
+            repaired = _repair(conn, rows.fetchall())
+            if repaired:
+                done.append(f"system_events.payload: {repaired} rows re-wrapped")
+            statements = _SQLITE_INDEXES
+        else:
+            statements = []
+        for ddl in statements:
+            conn.exec_driver_sql(ddl)
+    return done
+
+
+# ── Querying ─────────────────────────────────────────────────────────────
+
+def query(
+    session: Session,
+    *,
+    event_type: Optional[str] = None,
+    source_type: Optional[str] = None,
+    source_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    processed: Optional[bool] = None,
+    payload: Optional[dict] = None,
+) -> Query:
+    """SystemEvents matching every given filter.
+
+    ``event_type`` ending in ``*`` matches a prefix (``document.*``);
+    ``payload`` matches top-level keys by value.
+    """
+    q = session.query(SystemEvent)
+    if event_type:
+        if event_type.endswith("*"):
+            q = q.filter(SystemEvent.event_type.startswith(event_type[:-1], autoescape=True))
+        else:
+            q = q.filter(SystemEvent.event_type == event_type)
+    if source_type:
+        q = q.filter(SystemEvent.source_type == source_type)
+    if source_id is not None:
+        q = q.filter(SystemEvent.source_id == source_id)
+    if since is not None:
+        q = q.filter(SystemEvent.created_at >= since)
+    if until is not None:
+        q = q.filter(SystemEvent.created_at < until)
+    if processed is not None:
+        q = q.filter(SystemEvent.processed == processed)
+    postgres = session.get_bind().dialect.name == "postgresql"
+    for key, value in (payload or {}).items():
+        if postgres and key not in INDEXED_KEYS:
+            q = q.filter(type_coerce(SystemEvent.payload, JSONB).contains({key: value}))
+        else:
+            q = q.filter(json_value(SystemEvent.payload, key) == (str(value) if postgres else value))
+    return q
+
+
+def as_dict(row: SystemEvent) -> dict:
+    return {
+        "id": row.id,
+        "tenant_id": row.tenant_id,
+        "event_type": row.event_type,
+        "source_type": row.source_type,
+        "source_id": row.source_id,
+        "payload": row.payload,
+        "processed": row.processed,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+# ── Retention ────────────────────────────────────────────────────────────
+
+def prune(session: Session, retention_days: Optional[float] = None) -> int:
+    """Delete processed events older than the retention window, in batches
+    of ``PRUNE_BATCH`` (each its own transaction); returns rows deleted."""
+    days = settings.event_retention_days if retention_days is None else retention_days
+    cutoff = session.query(func.now()).scalar() - timedelta(days=days)   # database clock
+    deleted = 0
+    while True:
+        ids = [r[0] for r in (
+            session.query(SystemEvent.id)
+            .filter(SystemEvent.created_at < cutoff, SystemEvent.processed == True)  # noqa: E712
+            .order_by(SystemEvent.created_at)
+            .limit(PRUNE_BATCH)
+        )]
+        if not ids:
+            break
+        session.execute(update(Notification).where(Notification.event_id.in_(ids))
+                        .values(event_id=None))
+        session.execute(delete(SystemEvent).where(SystemEvent.id.in_(ids)))
+        session.commit()
+        deleted += len(ids)
+    if deleted:
+        logger.info("Pruned %d system events created before %s", deleted, cutoff)
+    return deleted
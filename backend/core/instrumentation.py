@@ -0,0 +1,249 @@
+"""Per-request SQL and latency instrumentation.
+
+``InstrumentationMiddleware`` opens a ``RequestStats`` for each HTTP request;
+cursor hooks on the engine add every statement and its DB time to it, and
+``instrument_routes()`` wraps each endpoint so the time spent after it
+returns (response validation and JSON rendering) is measured separately.
+
+Per-route totals and histograms are kept in process and served by
+``GET /api/admin/instrumentation``. With ``DEBUG=true`` each response also
+carries ``X-DB-Queries`` and a ``Server-Timing`` header. Routes over their
+budget (``ROUTE_BUDGETS``) log a warning.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from backend.core.config import settings
+from backend.core.database import engine
+
+log = logging.getLogger(__name__)
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+def parse_budgets(spec: str) -> dict[str, tuple[Optional[int], Optional[float]]]:
+    """``"GET /api/dashboard=5q,250ms; GET /api/search=100ms"`` → budgets.
+
+    Each budget is (max queries, max total ms); either may be None.
+    """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        route, _, limits = item.rpartition("=")
+        queries = ms = None
+        for limit in limits.split(","):
+            limit = limit.strip().lower()
+            if limit.endswith("ms"):
+                ms = float(limit[:-2])
+            elif limit.endswith("q"):
+                queries = int(limit[:-1])
+        budgets[route.strip()] = (queries, ms)
+    return budgets
+
+
+BUDGETS = parse_budgets(settings.route_budgets)
+
+
+# ── Per-request stats ────────────────────────────────────────────────────
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    route: Optional[str] = None            # path template, set by the endpoint wrapper
+    endpoint_done: Optional[float] = None  # perf_counter() when the endpoint returned
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:   # search fans out across threads
+            self.queries += 1
+            self.db_seconds += seconds
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.add_query(time.perf_counter() - starts.pop())
+
+
+# ── Aggregation ──────────────────────────────────────────────────────────
+
+class _Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self, n: int) -> dict:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "mean": round(self.total / n, 2) if n else 0,
+            "max": round(self.max, 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.over_budget = 0
+        self.queries = _Histogram(QUERY_BUCKETS)
+        self.db_ms = _Histogram(MS_BUCKETS)
+        self.serialize_ms = _Histogram(MS_BUCKETS)
+        self.total_ms = _Histogram(MS_BUCKETS)
+
+    def as_dict(self) -> dict:
+        n = self.requests
+        return {
+            "requests": n,
+            "over_budget": self.over_budget,
+            "queries": self.queries.as_dict(n),
+            "db_ms": self.db_ms.as_dict(n),
+            "serialize_ms": self.serialize_ms.as_dict(n),
+            "total_ms": self.total_ms.as_dict(n),
+        }
+
+
+_routes: dict[str, _RouteStats] = {}
+_routes_lock = Lock()
+
+
+def _record(route: str, stats: RequestStats, serialize_ms: float, total_ms: float) -> None:
+    db_ms = stats.db_seconds * 1000
+    budget_queries, budget_ms = BUDGETS.get(route, (None, None))
+    over = ((budget_queries is not None and stats.queries > budget_queries)
+            or (budget_ms is not None and total_ms > budget_ms))
+    if over:
+        log.warning("%s over budget: %d queries (budget %s), %.1f ms (budget %s)",
+                    route, stats.queries, budget_queries, total_ms, budget_ms)
+    with _routes_lock:
+        entry = _routes.get(route)
+        if entry is None:
+            entry = _routes[route] = _RouteStats()
+        entry.requests += 1
+        entry.over_budget += over
+        entry.queries.add(stats.queries)
+        entry.db_ms.add(db_ms)
+        entry.serialize_ms.add(serialize_ms)
+        entry.total_ms.add(total_ms)
+
+
+def snapshot() -> dict:
+    """Per-route aggregates, busiest first, plus the configured budgets."""
+    with _routes_lock:
+        routes = {route: s.as_dict() for route, s in
+                  sorted(_routes.items(), key=lambda kv: -kv[1].requests)}
+    budgets = {route: {"queries": q, "ms": ms} for route, (q, ms) in BUDGETS.items()}
+    return {"routes": routes, "budgets": budgets}
+
+
+def reset() -> None:
+    with _routes_lock:
+        _routes.clear()
+
+
+# ── Wiring ───────────────────────────────────────────────────────────────
+
+def _wrap(call, path: str):
+    def finish():
+        stats = _current.get()
+        if stats is not None:
+            stats.route = path
+            stats.endpoint_done = time.perf_counter()
+
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def endpoint(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                finish()
+    else:
+        @functools.wraps(call)
+        def endpoint(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                finish()
+    return endpoint
+
+
+def instrument_routes(app) -> None:
+    """Wrap every API endpoint to stamp its route and return time."""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "_instrumented", False):
+            route.dependant.call = _wrap(route.dependant.call, route.path)
+            route.dependant.call._instrumented = True
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware that collects RequestStats for each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        responded: dict[str, float] = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                responded["at"] = time.perf_counter()
+                if settings.debug:
+                    db_ms = stats.db_seconds * 1000
+                    serialize_ms = (responded["at"] - stats.endpoint_done) * 1000 \
+                        if stats.endpoint_done else 0.0
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.queries).encode()))
+                    headers.append((b"server-timing", (
+                        f"db;dur={db_ms:.1f}, serialize;dur={serialize_ms:.1f}, "
+                        f"app;dur={(responded['at'] - started) * 1000:.1f}"
+                    ).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if stats.route is not None:
+                end = responded.get("at", time.perf_counter())
+                serialize_ms = (end - stats.endpoint_done) * 1000 if stats.endpoint_done else 0.0
+                _record(f"{scope['method']} {stats.route}", stats, serialize_ms,
+                        (end - started) * 1000)
@@ -0,0 +1,95 @@
+"""JSON columns: JSONB on PostgreSQL, JSON text elsewhere.
+
+``dumps`` is the engine's JSON serializer, using orjson when installed
+(several times faster than the standard library on event payloads).
+``json_value(column, key)`` reads one top-level key as text. It renders as
+``column ->> 'key'`` on PostgreSQL and ``json_extract(column, '$.key')`` on
+SQLite, with the key inlined so expression indexes on it apply.
+"""
+
+import json
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default).decode()
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+def loads(text: str):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+class JSONPayload(TypeDecorator):
+    """A JSON object column. Legacy text that isn't valid JSON reads back
+    as ``{"raw": text}`` instead of failing the whole query."""
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value   # JSONB binds through the engine's json_serializer
+        return dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if not isinstance(value, str):
+            return value   # already decoded by the driver (jsonb), or None
+        try:
+            return loads(value)
+        except ValueError:
+            return {"raw": value}
+
+
+class json_value(FunctionElement):
+    """Top-level ``key`` of a JSON column, as text."""
+
+    type = Text()
+    name = "json_value"
+    inherit_cache = True
+
+
+def _parts(element, compiler, **kw):
+    column, key = list(element.clauses)
+    if not re.fullmatch(r"\w+", key.value):   # inlined into the SQL
+        raise ValueError(f"invalid JSON key {key.value!r}")
+    return compiler.process(column, **kw), key.value
+
+
+@compiles(json_value, "postgresql")
+def _json_value_pg(element, compiler, **kw):
+    column, key = _parts(element, compiler, **kw)
+    return f"({column} ->> '{key}')"
+
+
+@compiles(json_value)
+def _json_value_default(element, compiler, **kw):
+    column, key = _parts(element, compiler, **kw)
+    return f"json_extract({column}, '$.{key}')"
@@ -0,0 +1,509 @@
+"""Outbox dispatcher for ``system_events``.
+
+Routers and sync jobs record what happened as ``SystemEvent`` rows in the
+same transaction as the change (``processed = false``). The dispatcher
+drains them in batches:
+
+1. Claim up to ``OUTBOX_BATCH_SIZE`` unprocessed events, oldest first, with
+   ``SELECT ... FOR NO KEY UPDATE SKIP LOCKED``. Several API instances can run a
+   dispatcher each; a locked row is skipped, never handed out twice.
+2. Route the batch by ``event_type`` to every matching handler and run the
+   handlers in a pool of ``OUTBOX_WORKERS`` threads, each on its own
+   session and transaction, with all of its events at once.
+3. Mark the events whose handlers all succeeded processed with one UPDATE
+   and commit, which releases the claim.
+
+If a handler fails on a batch its events are retried one at a time to
+isolate the bad one; events still failing stay unprocessed and are claimed
+again next round. After ``OUTBOX_MAX_ATTEMPTS`` failures in this process an
+event is marked processed and recorded as an ``ExceptionItem``. Delivery is
+therefore at-least-once: handlers must be idempotent.
+
+Throughput, handler timings and queue lag are served by
+``GET /api/admin/outbox``; ``python -m backend.core.outbox`` drains the
+queue once from the command line.
+"""
+
+import argparse
+import fnmatch
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from backend.core import realtime, rollups, search
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models.core import Employee
+from backend.models.extended import (
+    ExceptionItem, Notification, NotificationRule, SystemEvent,
+)
+
+
+logger = logging.getLogger("secg.outbox")
+
+# Seconds of history behind the reported events/second
+THROUGHPUT_WINDOW = 60.0
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    """A claimed SystemEvent, detached from the claiming session."""
+
+    id: int
+    tenant_id: int
+    event_type: str
+    source_type: str
+    source_id: int
+    payload: dict
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, row: SystemEvent) -> "OutboxEvent":
+        payload = row.payload if row.payload is not None else {}
+        return cls(row.id, row.tenant_id, row.event_type, row.source_type,
+                   row.source_id, payload if isinstance(payload, dict) else {"value": payload},
+                   row.created_at)
+
+
+@dataclass(frozen=True)
+class Handler:
+    """``fn(session, events)`` for events whose type matches a pattern
+    (``fnmatch`` syntax: ``"document.*"``, ``"*"``). The dispatcher commits."""
+
+    name: str
+    patterns: tuple
+    fn: Callable[[Session, list], Any]
+
+    def matches(self, event_type: str) -> bool:
+        return any(fnmatch.fnmatchcase(event_type, p) for p in self.patterns)
+
+
+HANDLERS: dict[str, Handler] = {}
+
+
+def handles(name: str, *patterns: str):
+    """Register the decorated function as the ``name`` handler."""
+    def register(fn):
+        HANDLERS[name] = Handler(name, patterns, fn)
+        return fn
+    return register
+
+
+# ── Handlers ─────────────────────────────────────────────────────────────
+
+def _split(value: Optional[str]) -> list[str]:
+    """A JSON list or comma-separated text column as a list of strings."""
+    if not value:
+        return []
+    try:
+        items = json.loads(value)
+    except ValueError:
+        items = value.split(",")
+    if isinstance(items, str):
+        items = [items]
+    return [str(i).strip() for i in items if str(i).strip()]
+
+
+DEFAULT_TEMPLATE = "{event_type}: {source_type} #{source_id}"
+
+_OPERATORS = {
+    "=": lambda a, b: a == b or str(a) == str(b),
+    "!=": lambda a, b: not (a == b or str(a) == str(b)),
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "in": lambda a, b: any(_OPERATORS["="](a, x) for x in b),
+}
+
+
+def _condition(value: Optional[str]) -> Optional[dict]:
+    """A rule's condition as ``{field: test}``; {} matches everything, None nothing.
+
+    JSON (``{"status": "overdue", "amount": {">=": 10000}}``; a list means
+    any of) or comma-separated ``field=value`` pairs. A test is a value, a
+    list of values, or ``{operator: operand}`` with operators from ``_OPERATORS``.
+    """
+    if not value or not value.strip():
+        return {}
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = dict(pair.split("=", 1) for pair in value.split(",") if "=" in pair)
+        parsed = {k.strip(): v.strip() for k, v in parsed.items()}
+    return parsed if isinstance(parsed, dict) and parsed else None
+
+
+def _matches(condition: dict, fields: dict) -> bool:
+    """Whether every test in ``condition`` holds for the event's fields."""
+    for name, test in condition.items():
+        if name not in fields:
+            return False
+        if not isinstance(test, dict):
+            test = {"in" if isinstance(test, list) else "=": test}
+        for op, operand in test.items():
+            try:
+                if not _OPERATORS[op](fields[name], operand):
+                    return False
+            except (KeyError, TypeError):   # unknown operator, or e.g. None > 5
+                return False
+    return True
+
+
+def _render(template: Optional[str], fields: dict) -> str:
+    """The rule's message, or the default one if its template doesn't fit the event."""
+    try:
+        return (template or DEFAULT_TEMPLATE).format_map(fields)
+    except (KeyError, IndexError, AttributeError, ValueError, TypeError) as exc:
+        logger.warning("Notification template %r failed (%s: %s); using the default",
+                       template, type(exc).__name__, exc)
+        return DEFAULT_TEMPLATE.format_map(fields)
+
+
+@handles("notifications", "*")
+def _notify(session: Session, events: list) -> None:
+    """Fan events out to the recipients of every active rule whose event
+    type and condition match."""
+    tenants = {e.tenant_id for e in events}
+    rules = (
+        session.query(NotificationRule)
+        .filter(NotificationRule.tenant_id.in_(tenants), NotificationRule.is_active == True)  # noqa: E712
+        .all()
+    )
+    if not rules:
+        return
+    roles = {r.lower() for rule in rules for r in _split(rule.recipient_roles)}
+    staff: dict[str, list[int]] = {}
+    if roles:
+        for emp_id, role in (
+            session.query(Employee.id, Employee.role)
+            .filter(Employee.is_active == True, func.lower(Employee.role).in_(roles))  # noqa: E712
+        ):
+            staff.setdefault(role.lower(), []).append(emp_id)
+    sent = {
+        (event_id, recipient, channel)
+        for event_id, recipient, channel in session.query(
+            Notification.event_id, Notification.recipient_id, Notification.channel
+        ).filter(Notification.event_id.in_([e.id for e in events]))
+    }
+
+    conditions = {}
+    for rule in rules:
+        conditions[rule.id] = _condition(rule.condition)
+        if conditions[rule.id] is None:
+            logger.warning("Notification rule %s has an unreadable condition %r; skipped",
+                           rule.id, rule.condition)
+
+    rows = []
+    for e in events:
+        fields = {**e.payload, "event_type": e.event_type, "source_type": e.source_type,
+                  "source_id": e.source_id}
+        for rule in rules:
+            if rule.tenant_id != e.tenant_id or not fnmatch.fnmatchcase(e.event_type, rule.event_type):
+                continue
+            condition = conditions[rule.id]
+            if condition is None or not _matches(condition, fields):
+                continue
+            message = _render(rule.message_template, fields)
+            recipients = {emp for r in _split(rule.recipient_roles) for emp in staff.get(r.lower(), [])}
+            for recipient in sorted(recipients):
+                for channel in _split(rule.channels):
+                    if (e.id, recipient, channel) in sent:
+                        continue
+                    sent.add((e.id, recipient, channel))
+                    rows.append({
+                        "tenant_id": e.tenant_id, "recipient_id": recipient, "event_id": e.id,
+                        "channel": channel, "category": e.event_type.split(".")[0],
+                        "title": message[:300], "body": message,
+                        "priority": rule.priority or "normal",
+                        "source_type": e.source_type, "source_id": e.source_id,
+                    })
+    if rows:
+        inserted = session.execute(
+            Notification.__table__.insert().returning(
+                Notification.id, Notification.created_at, sort_by_parameter_order=True),
+            rows,
+        )
+        realtime.created(session, [
+            {"id": id_, "recipient_id": row["recipient_id"], "title": row["title"],
+             "body": row["body"], "priority": row["priority"], "category": row["category"],
+             "action_url": None, "is_read": False,
+             "created_at": created_at.isoformat() if created_at else None}
+            for row, (id_, created_at) in zip(rows, inserted)
+        ])
+
+
+@handles("search_index", "document.*")
+def _index_documents(session: Session, events: list) -> None:
+    """Re-index the documents the events refer to."""
+    search.reindex(session, "documents", {e.source_id for e in events})
+
+
+@handles("rollups", "integration.sync_succeeded")
+def _after_sync(session: Session, events: list) -> None:
+    """Syncs may write with COPY or Core statements the session hooks never
+    saw; recompute every rollup and search entity type once per batch."""
+    rollups.mark_stale(session, *{m.model.__tablename__ for m in rollups.METRICS.values()})
+    search.mark_stale(session, *{e.model.__tablename__ for e in search.ENTITIES.values()})
+
+
+# ── Dispatcher ───────────────────────────────────────────────────────────
+
+class _HandlerStats:
+    def __init__(self):
+        self.batches = 0
+        self.events = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "events": self.events,
+            "failures": self.failures,
+            "mean_batch_ms": round(self.seconds * 1000 / self.batches, 1) if self.batches else 0,
+        }
+
+
+class Dispatcher:
+    """Claims, routes and completes SystemEvent batches; see module docstring."""
+
+    def __init__(self):
+        self.batches = 0
+        self.processed = 0
+        self.dead_lettered = 0
+        self.last_batch_at: Optional[float] = None   # time.time()
+        self.last_error: Optional[str] = None
+        self._handlers: dict[str, _HandlerStats] = {}
+        self._attempts: dict[int, int] = {}
+        self._recent: deque = deque()   # (monotonic time, events completed)
+        self._lock = Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[Thread] = None
+        self._stop = Event()
+
+    # ── processing ──
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=settings.outbox_workers,
+                                                thread_name_prefix="secg-outbox")
+            return self._pool
+
+    def _call(self, handler: Handler, events: list) -> None:
+        session = SessionLocal()
+        started = time.perf_counter()
+        try:
+            handler.fn(session, events)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            with self._lock:
+                stats = self._handlers.setdefault(handler.name, _HandlerStats())
+                stats.batches += 1
+                stats.events += len(events)
+                stats.seconds += time.perf_counter() - started
+
+    def _run(self, handler: Handler, events: list) -> set[int]:
+        """Ids of the events ``handler`` failed on."""
+        try:
+            self._call(handler, events)
+            return set()
+        except Exception as exc:
+            logger.exception("Outbox handler %s failed on %d events", handler.name, len(events))
+            self._failed(handler, exc)
+            if len(events) == 1:
+                return {events[0].id}
+        failed = set()
+        for e in events:
+            try:
+                self._call(handler, [e])
+            except Exception as exc:
+                logger.exception("Outbox handler %s failed on event %d", handler.name, e.id)
+                self._failed(handler, exc)
+                failed.add(e.id)
+        return failed
+
+    def _failed(self, handler: Handler, exc: Exception) -> None:
+        with self._lock:
+            self._handlers.setdefault(handler.name, _HandlerStats()).failures += 1
+            self.last_error = f"{handler.name}: {exc}"
+
+    def run_batch(self, batch_size: Optional[int] = None) -> int:
+        """Claim and process one batch; returns the number of events claimed."""
+        claim = SessionLocal()
+        try:
+            rows = (
+                claim.query(SystemEvent)
+                .filter(SystemEvent.processed == False)  # noqa: E712
+                .order_by(SystemEvent.id)
+                .limit(batch_size or settings.outbox_batch_size)
+                # NO KEY UPDATE: handlers insert rows referencing these events,
+                # and the FK check's KEY SHARE lock must not wait on the claim
+                .with_for_update(skip_locked=True, key_share=True)
+                .all()
+            )
+            if not rows:
+                claim.rollback()
+                return 0
+            events = [OutboxEvent.from_row(r) for r in rows]
+
+            routed: dict[str, list] = {}
+            for e in events:
+                for handler in HANDLERS.values():
+                    if handler.matches(e.event_type):
+                        routed.setdefault(handler.name, []).append(e)
+            pool = self._executor()
+            futures = [pool.submit(self._run, HANDLERS[name], evs) for name, evs in routed.items()]
+            failed = set().union(*(f.result() for f in futures))
+
+            dead = []
+            with self._lock:
+                for event_id in failed:
+                    self._attempts[event_id] = self._attempts.get(event_id, 0) + 1
+                    if self._attempts[event_id] >= settings.outbox_max_attempts:
+                        dead.append(event_id)
+                        del self._attempts[event_id]
+            for e in events:
+                if e.id in dead:
+                    claim.add(ExceptionItem(
+                        tenant_id=e.tenant_id,
+                        exception_type="event_handler_failure",
+                        severity="critical",
+                        description=(f"{e.event_type} event {e.id} failed "
+                                     f"{settings.outbox_max_attempts} times: {self.last_error}"),
+                        source_type=e.source_type,
+                        source_id=e.source_id,
+                        status="open",
+                    ))
+            done = [e.id for e in events if e.id not in failed or e.id in dead]
+            if done:
+                claim.execute(update(SystemEvent).where(SystemEvent.id.in_(done))
+                              .values(processed=True))
+            claim.commit()
+        except Exception:
+            claim.rollback()
+            raise
+        finally:
+            claim.close()
+
+        now = time.monotonic()
+        with self._lock:
+            self.batches += 1
+            self.processed += len(done)
+            self.dead_lettered += len(dead)
+            self.last_batch_at = time.time()
+            self._recent.append((now, len(done)))
+        if dead:
+            logger.error("Outbox gave up on events %s", sorted(dead))
+        return len(events)
+
+    def drain(self, max_batches: Optional[int] = None) -> int:
+        """Process batches until the queue is empty; returns events claimed."""
+        total = batches = 0
+        while max_batches is None or batches < max_batches:
+            claimed = self.run_batch()
+            total += claimed
+            batches += 1
+            if claimed < settings.outbox_batch_size:
+                break
+        return total
+
+    # ── background thread ──
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_batch()
+            except Exception as exc:
+                logger.exception("Outbox batch failed")
+                with self._lock:
+                    self.last_error = str(exc)
+                claimed = 0
+            if claimed < settings.outbox_batch_size:   # caught up (or failing): back off
+                self._stop.wait(settings.outbox_poll_interval)
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = Thread(target=self._loop, name="secg-outbox-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ── observability ──
+
+    def stats(self, session: Session) -> dict:
+        """Counters, handler timings, throughput and the queue's backlog/lag."""
+        backlog, oldest, now = session.query(
+            func.count(SystemEvent.id), func.min(SystemEvent.created_at), func.now(),
+        ).filter(SystemEvent.processed == False).one()  # noqa: E712
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW
+        with self._lock:
+            while self._recent and self._recent[0][0] < cutoff:
+                self._recent.popleft()
+            recent = sum(n for _, n in self._recent)
+            return {
+                "running": self.running,
+                "batch_size": settings.outbox_batch_size,
+                "workers": settings.outbox_workers,
+                "backlog": backlog,
+                "lag_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+                "events_per_second": round(recent / THROUGHPUT_WINDOW, 2),
+                "batches": self.batches,
+                "processed": self.processed,
+                "retrying": len(self._attempts),
+                "dead_lettered": self.dead_lettered,
+                "last_batch_at": self.last_batch_at,
+                "last_error": self.last_error,
+                "handlers": {
+                    name: {"patterns": list(h.patterns),
+                           **self._handlers.get(name, _HandlerStats()).as_dict()}
+                    for name, h in HANDLERS.items()
+                },
+            }
+
+
+dispatcher = Dispatcher()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Process pending system events once")
+    parser.add_argument("--batches", type=int, help="stop after this many batches")
+    args = parser.parse_args()
+
+    import backend.main  # noqa: F401 — registers every model
+    claimed = dispatcher.drain(args.batches)
+    session = SessionLocal()
+    try:
+        stats = dispatcher.stats(session)
+    finally:
+        session.close()
+    print(f"{claimed} events claimed, {stats['processed']} processed, "
+          f"{stats['dead_lettered']} dead-lettered, {stats['backlog']} pending")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
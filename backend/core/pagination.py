@@ -0,0 +1,174 @@
+"""Keyset (cursor) pagination and cheap totals for list endpoints.
+
+``paginate()`` orders by (sort column, id) and continues from an opaque
+``cursor`` holding the last row's key, so each page is an index range scan
+and page 500 costs the same as page 1. ``page`` (OFFSET) still works for
+existing clients; every response carries the ``next_cursor`` to switch to.
+
+Totals are exact only when asked for. Otherwise an unfiltered PostgreSQL
+table reports ``pg_class.reltuples`` (kept current by autovacuum/ANALYZE),
+and anything else an exact count cached for ``COUNT_CACHE_TTL`` seconds and
+dropped on any commit that writes the table.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Query
+
+from backend.core.cache import TTLCache, invalidate_on_commit
+from backend.core.config import settings
+
+
+@dataclass
+class Page:
+    items: list
+    total: int
+    total_estimated: bool
+    page: int
+    per_page: int
+    next_cursor: Optional[str]
+
+    def response(self, items: list) -> dict:
+        """PaginatedResponse fields, with ``items`` already serialized."""
+        return {
+            "total": self.total,
+            "total_estimated": self.total_estimated,
+            "page": self.page,
+            "per_page": self.per_page,
+            "pages": (self.total + self.per_page - 1) // self.per_page,
+            "next_cursor": self.next_cursor,
+            "items": items,
+        }
+
+
+# ── Cursors ──────────────────────────────────────────────────────────────
+
+def _column(attr):
+    return attr.property.columns[0]
+
+
+def _key_name(attr) -> str:
+    column = _column(attr)
+    return f"{column.table.name}.{column.name}"
+
+
+def _dump(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load(attr, value):
+    python_type = _column(attr).type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort, row) -> str:
+    payload = {"k": _key_name(sort), "v": _dump(getattr(row, sort.key)), "id": row.id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort, cursor: str) -> tuple[Any, int]:
+    """(sort value, id) from ``cursor``; 400 if it is malformed or belongs
+    to a different listing."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["k"] != _key_name(sort):
+            raise ValueError("cursor is for a different sort")
+        return _load(sort, payload["v"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+# ── Counting ─────────────────────────────────────────────────────────────
+
+_count_caches: dict[str, TTLCache] = {}
+_count_lock = Lock()
+
+
+def _count_cache(table_name: str) -> TTLCache:
+    with _count_lock:
+        cache = _count_caches.get(table_name)
+        if cache is None:
+            cache = _count_caches[table_name] = TTLCache(settings.count_cache_ttl)
+            invalidate_on_commit(cache, {table_name})
+        return cache
+
+
+def count(q: Query, exact: bool = False) -> tuple[int, bool]:
+    """(row count of ``q``, whether it is an estimate)."""
+    q = q.order_by(None)
+    if exact:
+        return q.count(), False
+    table = q.column_descriptions[0]["entity"].__table__
+    session = q.session
+    if q.whereclause is None and session.get_bind().dialect.name == "postgresql":
+        estimate = session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+            {"t": table.name},
+        ).scalar()
+        if estimate is not None and estimate >= 0:   # -1: never analyzed
+            return int(estimate), True
+    compiled = q.statement.compile()
+    key = (str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+    return _count_cache(table.name).get_or_set(key, q.count), True
+
+
+# ── Paging ───────────────────────────────────────────────────────────────
+
+def paginate(
+    q: Query,
+    sort,
+    id_column,
+    *,
+    descending: bool = False,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    per_page: int = 50,
+    exact_total: bool = False,
+) -> Page:
+    """One page of ``q`` ordered by (``sort``, ``id_column``).
+
+    ``sort`` must be NOT NULL; pass ``id_column`` as ``sort`` to order by
+    id alone, and a unique ``sort`` needs no tiebreak. With ``cursor`` the
+    page starts after that row; without it, at OFFSET (page - 1) * per_page.
+    """
+    tiebreak = sort is not id_column and not _column(sort).unique
+    columns = (sort, id_column) if tiebreak else (sort,)
+    rows = q.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    if cursor:
+        value, last_id = decode_cursor(sort, cursor)
+        if tiebreak:
+            key, after = tuple_(sort, id_column), tuple_(value, last_id)
+        else:
+            key, after = sort, value
+        rows = rows.filter(key < after if descending else key > after)
+    else:
+        rows = rows.offset((page - 1) * per_page)
+    rows = rows.limit(per_page + 1).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    total, estimated = count(q, exact_total)
+    return Page(
+        items=rows,
+        total=total,
+        total_estimated=estimated,
+        page=page,
+        per_page=per_page,
+        next_cursor=encode_cursor(sort, rows[-1]) if more else None,
+    )
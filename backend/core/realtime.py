@@ -0,0 +1,354 @@
+"""Push notifications: per-user unread counters and live streams.
+
+Writes that create or read notifications call ``created`` / ``marked_read``
+/ ``marked_all_read`` on their session. The messages are held in
+``session.info`` and published through the broker after the commit, and
+dropped on rollback. Each process's ``Hub`` applies the counter delta and
+fans the message out to the streams of that recipient, and of "everyone"
+(recipient None) for the shell bell.
+
+Brokers (``REALTIME_BROKER``):
+
+- ``local``: delivery within this process only. Counters in other
+  processes catch up when their entry expires (``UNREAD_COUNT_TTL``).
+- ``redis``: every process publishes to and subscribes from one Redis
+  channel (``REDIS_URL``), so streams and counters on all API instances
+  see every change, including notifications created by the outbox CLI.
+
+Streams are asyncio queues: an idle connection costs a task and a queue,
+not a thread or a database connection. A client too slow to keep up
+gets a ``resync`` event and is disconnected, and it reloads on reconnect.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.core.config import settings
+from backend.core.jsontypes import dumps, loads
+from backend.models.extended import Notification
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - only needed for REALTIME_BROKER=redis
+    redis = None
+
+
+logger = logging.getLogger("secg.realtime")
+
+_PENDING = "realtime_pending"   # session.info: (recipient_id, event, data, delta) to publish at commit
+CHANNEL = "secg:notifications"
+
+
+# ── Unread counters ──────────────────────────────────────────────────────
+
+class UnreadCounters:
+    """recipient_id (None = all recipients) → unread count.
+
+    Seeded with one COUNT on first use and kept current by deltas after
+    that. Seeded again once ``ttl`` has passed, in case another process
+    changed notifications without publishing to this one.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.loads = 0
+        self._counts: dict[Optional[int], list] = {}   # key → [expires_at, count]
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, recipient_id: Optional[int]) -> int:
+        with self._lock:
+            entry = self._counts.get(recipient_id)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            generation = self._generation
+        q = session.query(Notification).filter(Notification.is_read == False)  # noqa: E712
+        if recipient_id is not None:
+            q = q.filter(Notification.recipient_id == recipient_id)
+        count = q.count()
+        with self._lock:
+            self.loads += 1
+            # A delta that landed while counting may not be reflected; recount next time
+            expires = time.monotonic() + self.ttl if generation == self._generation else 0
+            self._counts[recipient_id] = [expires, count]
+        return count
+
+    def peek(self, recipient_id: Optional[int]) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get(recipient_id)
+            return entry[1] if entry is not None else None
+
+    def expired(self, recipient_id: Optional[int]) -> bool:
+        with self._lock:
+            entry = self._counts.get(recipient_id)
+            return entry is None or entry[0] <= time.monotonic()
+
+    def add(self, recipient_id: Optional[int], delta: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in {recipient_id, None}:
+                entry = self._counts.get(key)
+                if entry is not None:
+                    entry[1] = max(0, entry[1] + delta)
+
+    def zero_all(self) -> None:
+        with self._lock:
+            self._generation += 1
+            for entry in self._counts.values():
+                entry[1] = 0
+
+    def stats(self) -> dict:
+        return {"recipients": len(self._counts), "ttl_seconds": self.ttl, "loads": self.loads}
+
+
+unread = UnreadCounters(settings.unread_count_ttl)
+
+
+# ── Streams ──────────────────────────────────────────────────────────────
+
+@dataclass(eq=False)
+class Subscription:
+    recipient_id: Optional[int]
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(settings.realtime_queue_size))
+    overflowed: bool = False
+
+    def push(self, item: tuple) -> None:
+        """Runs on the subscription's event loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue = asyncio.Queue(1)
+            self.queue.put_nowait(("resync", {}))
+
+
+class Hub:
+    """This process's streams, by recipient."""
+
+    def __init__(self):
+        self.delivered = 0
+        self.dropped = 0
+        self._subs: dict[Optional[int], set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, recipient_id: Optional[int]) -> Subscription:
+        sub = Subscription(recipient_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subs.setdefault(recipient_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.recipient_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.recipient_id]
+        if sub.overflowed:
+            self.dropped += 1
+
+    def deliver(self, recipient_id: Optional[int], name: str, data: dict, delta: int = 0) -> None:
+        """Apply a published change here; safe to call from any thread."""
+        if name == "read_all" and recipient_id is None:
+            unread.zero_all()
+        elif delta:
+            unread.add(recipient_id, delta)
+        with self._lock:
+            if recipient_id is None:
+                targets = [s for subs in self._subs.values() for s in subs]
+            else:
+                targets = [*self._subs.get(recipient_id, ()), *self._subs.get(None, ())]
+        for sub in targets:
+            item = (name, {**data, "unread_count": unread.peek(sub.recipient_id)})
+            try:
+                sub.loop.call_soon_threadsafe(sub.push, item)
+            except RuntimeError:   # loop already closed; the stream is gone
+                continue
+            self.delivered += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            connections = sum(len(subs) for subs in self._subs.values())
+            recipients = len(self._subs)
+        return {"connections": connections, "recipients": recipients,
+                "delivered": self.delivered, "dropped_slow_clients": self.dropped}
+
+
+hub = Hub()
+
+
+# ── Brokers ──────────────────────────────────────────────────────────────
+
+class LocalBroker:
+    name = "local"
+
+    def publish(self, recipient_id: Optional[int], name: str, data: dict, delta: int) -> None:
+        hub.deliver(recipient_id, name, data, delta)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """Publishes to one Redis pub/sub channel; a listener thread feeds
+    every message, this process's own included, to the local hub."""
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str = CHANNEL):
+        if redis is None:
+            raise RuntimeError("REALTIME_BROKER=redis needs the redis package (pip install redis)")
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, recipient_id: Optional[int], name: str, data: dict, delta: int) -> None:
+        self._client.publish(self.channel, dumps(
+            {"recipient_id": recipient_id, "name": name, "data": data, "delta": delta}))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+        self._thread = threading.Thread(target=self._listen, name="realtime-redis", daemon=True)
+        self._thread.start()
+
+    def _listen(self) -> None:
+        for message in self._pubsub.listen():
+            try:
+                hub.deliver(**loads(message["data"]))
+            except Exception:  # noqa: BLE001 - one bad message mustn't stop the listener
+                logger.exception("Bad realtime message %r", message.get("data"))
+
+    def stop(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+        self._thread = None
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = RedisBroker(settings.redis_url) if settings.realtime_broker == "redis" \
+                else LocalBroker()
+        return _broker
+
+
+def start() -> None:
+    broker().start()
+
+
+def stop() -> None:
+    broker().stop()
+
+
+# ── Publishing from write paths ──────────────────────────────────────────
+
+def as_dict(n: Notification) -> dict:
+    return {
+        "id": n.id,
+        "recipient_id": n.recipient_id,
+        "title": n.title,
+        "body": n.body,
+        "priority": n.priority,
+        "category": n.category,
+        "action_url": n.action_url,
+        "is_read": n.is_read,
+        "created_at": n.created_at.isoformat() if n.created_at else None,
+    }
+
+
+def _stage(session: Session, recipient_id: Optional[int], name: str, data: dict, delta: int) -> None:
+    session.info.setdefault(_PENDING, []).append((recipient_id, name, data, delta))
+
+
+def created(session: Session, notifications: Iterable[dict]) -> None:
+    """New unread notifications (``as_dict`` shape) to push after commit."""
+    for n in notifications:
+        _stage(session, n["recipient_id"], "notification", n, 1)
+
+
+def marked_read(session: Session, recipient_id: int, notification_id: int) -> None:
+    _stage(session, recipient_id, "read", {"ids": [notification_id]}, -1)
+
+
+def marked_all_read(session: Session, recipient_id: Optional[int], count: int) -> None:
+    """``recipient_id`` None: every recipient's notifications were read."""
+    if count:
+        _stage(session, recipient_id, "read_all", {}, -count)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    pending = session.info.pop(_PENDING, None)
+    for recipient_id, name, data, delta in pending or ():
+        try:
+            broker().publish(recipient_id, name, data, delta)
+        except Exception:  # noqa: BLE001 - the write is committed; a lost push only delays the bell
+            logger.exception("Publishing %s for recipient %s failed", name, recipient_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_PENDING, None)
+
+
+# ── Server-sent events ───────────────────────────────────────────────────
+
+def _sse(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {dumps(data)}\n\n"
+
+
+async def stream(recipient_id: Optional[int], count: int, recount):
+    """SSE body for one client: the current count, then every change.
+
+    ``recount()`` returns a fresh count and is called from a worker thread
+    at a heartbeat once the counter has expired.
+    """
+    sub = hub.subscribe(recipient_id)
+    try:
+        yield _sse("unread", {"unread_count": count})
+        while True:
+            try:
+                name, data = await asyncio.wait_for(sub.queue.get(), settings.realtime_heartbeat)
+            except asyncio.TimeoutError:
+                if unread.expired(recipient_id):
+                    fresh = await run_in_threadpool(recount)
+                    if fresh != count:
+                        count = fresh
+                        yield _sse("unread", {"unread_count": count})
+                        continue
+                yield ": ping\n\n"
+                continue
+            if data.get("unread_count") is not None:
+                count = data["unread_count"]
+            yield _sse(name, data)
+            if name == "resync":
+                return
+    finally:
+        hub.unsubscribe(sub)
+
+
+def stats() -> dict:
+    return {"broker": broker().name, **hub.stats(), "counters": unread.stats()}
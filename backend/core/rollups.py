@@ -0,0 +1,494 @@
+"""Materialized KPI rollups, maintained incrementally from session writes.
+
+Each ``Metric`` aggregates one source table into (dimension → count, value,
+value_2, value_3) rows of ``kpi_rollups``, one set per tenant and day. Reads
+take the latest day, so a day without writes simply carries the previous
+state forward.
+
+Maintenance happens on the writing session, inside its transaction:
+
+- ORM flushes: after each flush the old and new state of every flushed
+  object of a tracked model is diffed and only the affected dimensions are
+  adjusted (``count = count + 1`` etc.).
+- Core insert/update/delete on a tracked table, and COPY writes reported via
+  ``mark_stale()``: the metric is recomputed from the source table once,
+  just before commit.
+- The first write of a new day seeds that day with a full recompute.
+
+Metrics over a model with a ``tenant_id`` column are kept per tenant: a
+change lands on its row's tenant, else on the session's (``session.info``
+"tenant_id", set per request from ``X-Tenant-Id``), else the default one.
+Metrics over untenanted models total every row, so they are kept once,
+under the default tenant, whatever the writer's or reader's tenant.
+Rewrites are upserts on ``uq_kpi_rollup``, so concurrent writers can't
+collide. Reading never writes: a metric with no stored rollup is computed
+on the fly until the first write, or the nightly ``check()``, seeds it.
+
+``check()`` compares the stored rollups with a full recompute and
+``prune()`` drops days past ``KPI_ROLLUP_RETENTION_DAYS`` (the latest day
+of each metric is always kept); ``python -m backend.core.rollups
+[--repair]`` runs the check.
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import and_, event, func, inspect, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.models.core import CostCode, Invoice, Project
+from backend.models.extended import BidPipeline, Debt, KpiRollup, PLEntry
+
+
+logger = logging.getLogger("secg.rollups")
+
+DEFAULT_TENANT = 1
+TENANT = "tenant_id"   # session.info: tenant of the request that owns the session
+TOTAL = "*"
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+
+
+def _dim(value) -> str:
+    """Dimension string for a grouped column value (enum, None, scalar)."""
+    if value is None:
+        return ""
+    return str(getattr(value, "value", value))
+
+
+def _dec(value) -> Decimal:
+    if value is None:
+        return _ZERO
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+@dataclass(frozen=True)
+class Metric:
+    """One rollup: ``key(obj)`` picks the dimension (None = not counted),
+    ``values(obj)`` the up to three summed amounts. ``sums(model)`` are the
+    SQL equivalents of ``values``; ``group`` the columns ``key`` reads."""
+
+    name: str
+    model: Any
+    group: tuple
+    key: Callable[[Any], Optional[str]]
+    values: Callable[[Any], tuple] = lambda o: ()
+    sums: Callable[[Any], tuple] = lambda m: ()
+    value_fields: tuple = ()
+
+    @property
+    def fields(self) -> tuple:
+        return self.group + self.value_fields
+
+
+def _project_values(p):
+    budget, contract = p.budget_total, p.contract_amount
+    remaining = budget - contract if budget is not None and contract is not None else None
+    return (budget, contract, remaining)
+
+
+METRICS = {m.name: m for m in (
+    # AR by invoice status: count, balance
+    Metric("ar", Invoice, ("status",), key=lambda r: _dim(r.status),
+           values=lambda o: (o.balance,), sums=lambda m: (m.balance,),
+           value_fields=("balance",)),
+    # Active debt by type: count, current balance
+    Metric("debt", Debt, ("is_active", "debt_type"),
+           key=lambda r: _dim(r.debt_type) if r.is_active else None,
+           values=lambda o: (o.current_balance,), sums=lambda m: (m.current_balance,),
+           value_fields=("current_balance",)),
+    # Active projects: count, budget, spent (contract released), remaining draws
+    Metric("projects", Project, ("status",),
+           key=lambda r: "active" if _dim(r.status) == "active" else None,
+           values=_project_values,
+           sums=lambda m: (m.budget_total, m.contract_amount, m.budget_total - m.contract_amount),
+           value_fields=("budget_total", "contract_amount")),
+    # Bid pipeline by status: count, estimated value
+    Metric("pipeline", BidPipeline, ("status",), key=lambda r: _dim(r.status),
+           values=lambda o: (o.estimated_value,), sums=lambda m: (m.estimated_value,),
+           value_fields=("estimated_value",)),
+    # Cost codes over budget: count
+    Metric("cost_overage", CostCode, ("variance",),
+           key=lambda r: "over" if r.variance is not None and r.variance < 0 else None),
+    # P&L by "year|month|division|account": amount
+    Metric("pl", PLEntry, ("period_year", "period_month", "division", "account_name"),
+           key=lambda r: f"{r.period_year}|{r.period_month}|{r.division or ''}|{r.account_name or ''}",
+           values=lambda o: (o.amount,), sums=lambda m: (m.amount,),
+           value_fields=("amount",)),
+)}
+
+_BY_TABLE = {m.model.__tablename__: m for m in METRICS.values()}
+_BY_MODEL = {m.model: m for m in METRICS.values()}
+
+_VALUES = ("count", "value", "value_2", "value_3")
+
+
+def session_tenant(session: Session) -> int:
+    return session.info.get(TENANT) or DEFAULT_TENANT
+
+
+def _tenanted(metric: Metric) -> bool:
+    return hasattr(metric.model, "tenant_id")
+
+
+def _tenant(metric: Metric, tenant_id: int) -> int:
+    """Tenant that ``metric``'s rollup rows are stored under for ``tenant_id``."""
+    return tenant_id if _tenanted(metric) else DEFAULT_TENANT
+
+
+def _row_tenant(session: Session, metric: Metric, obj) -> int:
+    if not _tenanted(metric):
+        return DEFAULT_TENANT
+    return getattr(obj, "tenant_id", None) or session_tenant(session)
+
+
+# ── Computing ────────────────────────────────────────────────────────────
+
+def _add(acc: dict, key: str, sign: int, values) -> None:
+    row = acc.setdefault(key, [0, _ZERO, _ZERO, _ZERO])
+    row[0] += sign
+    for i, v in enumerate(values[:3], start=1):
+        row[i] += sign * _dec(v)
+
+
+def compute(session: Session, metric: Metric,
+            tenant_id: int = DEFAULT_TENANT) -> dict[str, list]:
+    """Full recompute from the source table: dimension → [count, v, v2, v3].
+
+    Tables without a tenant column count every row whatever ``tenant_id``.
+    """
+    model = metric.model
+    group = [getattr(model, f) for f in metric.group]
+    sums = [func.coalesce(func.sum(s), 0) for s in metric.sums(model)]
+    q = session.query(*group, func.count(model.id), *sums).group_by(*group)
+    if _tenanted(metric):
+        q = q.filter(model.tenant_id == tenant_id)
+    acc: dict[str, list] = {TOTAL: [0, _ZERO, _ZERO, _ZERO]}
+    for row in q:
+        key = metric.key(row)
+        if key is None:
+            continue
+        count = row[len(group)]
+        values = [_dec(v) for v in row[len(group) + 1:]]
+        for k in (key, TOTAL):
+            acc_row = acc.setdefault(k, [0, _ZERO, _ZERO, _ZERO])
+            acc_row[0] += count
+            for i, v in enumerate(values, start=1):
+                acc_row[i] += v
+    # Same scale as the stored Numeric(16, 2) values
+    return {k: [c, *(v.quantize(_CENT) for v in vs)] for k, (c, *vs) in acc.items()}
+
+
+def _stored(session: Session, metric: str, tenant_id: int,
+            day: Optional[date] = None) -> tuple[Optional[date], dict[str, KpiRollup]]:
+    """Rows of the latest seeded day (or of ``day``) for ``metric``."""
+    if day is None:
+        day = session.query(func.max(KpiRollup.rollup_date)).filter(
+            KpiRollup.tenant_id == tenant_id, KpiRollup.metric == metric,
+            KpiRollup.dimension == TOTAL,
+        ).scalar()
+        if day is None:
+            return None, {}
+    rows = session.query(KpiRollup).filter(
+        KpiRollup.tenant_id == tenant_id, KpiRollup.metric == metric,
+        KpiRollup.rollup_date == day,
+    ).all()
+    return (day if rows else None), {r.dimension: r for r in rows}
+
+
+def _insert(session: Session):
+    """INSERT with ``on_conflict_do_update`` for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        return pg_insert(KpiRollup.__table__)
+    return sqlite_insert(KpiRollup.__table__)
+
+
+def _upsert(session: Session, rows: list[dict], add: bool) -> None:
+    """Write ``rows`` on ``uq_kpi_rollup``: overwrite existing values, or
+    add to them (deltas) with ``add``."""
+    table = KpiRollup.__table__
+    stmt = _insert(session)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "rollup_date", "metric", "dimension"],
+        set_={**{c: table.c[c] + stmt.excluded[c] if add else stmt.excluded[c] for c in _VALUES},
+              "updated_at": func.now()},
+    )
+    session.execute(stmt, rows)
+
+
+def refresh(session: Session, metric: Metric, tenant_id: int = DEFAULT_TENANT,
+            day: Optional[date] = None) -> dict[str, list]:
+    """Overwrite ``day``'s (default today) rows for ``metric`` with a recompute."""
+    day = day or date.today()
+    tenant_id = _tenant(metric, tenant_id)
+    acc = compute(session, metric, tenant_id)
+    table = KpiRollup.__table__
+    _upsert(session, [
+        {"tenant_id": tenant_id, "rollup_date": day, "metric": metric.name,
+         "dimension": key, "count": c, "value": v, "value_2": v2, "value_3": v3}
+        for key, (c, v, v2, v3) in acc.items()
+    ], add=False)
+    session.execute(table.delete().where(
+        table.c.tenant_id == tenant_id, table.c.metric == metric.name,
+        table.c.rollup_date == day, table.c.dimension.notin_(list(acc)),
+    ))
+    return acc
+
+
+def _as_lists(rows: Iterable[KpiRollup]) -> dict[str, list]:
+    return {r.dimension: [r.count or 0, _dec(r.value), _dec(r.value_2), _dec(r.value_3)]
+            for r in rows}
+
+
+def read(session: Session, metric: str, tenant_id: int = DEFAULT_TENANT) -> dict[str, list]:
+    """Latest rollup of ``metric``: dimension → [count, value, value_2, value_3].
+
+    A metric never rolled up is computed from the source table (not stored).
+    """
+    return read_many(session, (metric,), tenant_id)[metric]
+
+
+def read_many(session: Session, metrics: Iterable[str],
+              tenant_id: int = DEFAULT_TENANT) -> dict[str, dict[str, list]]:
+    """``read()`` for several metrics in one query: metric → dimensions."""
+    metrics = list(metrics)
+    owner = {m: _tenant(METRICS[m], tenant_id) for m in metrics}
+    wanted = or_(*(and_(KpiRollup.tenant_id == t, KpiRollup.metric == m)
+                   for m, t in owner.items()))
+    latest = (
+        session.query(KpiRollup.tenant_id, KpiRollup.metric,
+                      func.max(KpiRollup.rollup_date).label("day"))
+        .filter(wanted, KpiRollup.dimension == TOTAL)
+        .group_by(KpiRollup.tenant_id, KpiRollup.metric)
+        .subquery()
+    )
+    rows = session.query(KpiRollup).join(latest, and_(
+        KpiRollup.tenant_id == latest.c.tenant_id, KpiRollup.metric == latest.c.metric,
+        KpiRollup.rollup_date == latest.c.day,
+    )).all()
+    found: dict[str, list] = {}
+    for r in rows:
+        found.setdefault(r.metric, []).append(r)
+    return {m: _as_lists(found[m]) if m in found else compute(session, METRICS[m], tenant_id)
+            for m in metrics}
+
+
+def prune(session: Session, retention_days: Optional[int] = None) -> int:
+    """Delete rollup days older than the retention window, keeping each
+    metric's latest day (reads fall back to it), and rows of untenanted
+    metrics stored under other tenants; returns rows deleted."""
+    days = settings.kpi_rollup_retention_days if retention_days is None else retention_days
+    cutoff = date.today() - timedelta(days=days)
+    table = KpiRollup.__table__
+    shared = [m.name for m in METRICS.values() if not _tenanted(m)]
+    deleted = session.execute(table.delete().where(
+        table.c.metric.in_(shared), table.c.tenant_id != DEFAULT_TENANT,
+    )).rowcount if shared else 0
+    latest = session.query(KpiRollup.tenant_id, KpiRollup.metric,
+                           func.max(KpiRollup.rollup_date)).filter(
+        KpiRollup.dimension == TOTAL).group_by(KpiRollup.tenant_id, KpiRollup.metric).all()
+    for tenant_id, metric, day in latest:
+        deleted += session.execute(table.delete().where(
+            table.c.tenant_id == tenant_id, table.c.metric == metric,
+            table.c.rollup_date < min(cutoff, day),
+        )).rowcount
+    if deleted:
+        logger.info("Pruned %d KPI rollup rows before %s", deleted, cutoff)
+    return deleted
+
+
+# ── Incremental maintenance ──────────────────────────────────────────────
+
+_STALE = "rollups_stale"     # session.info: metric names to recompute at commit
+_SEEDED = "rollups_seeded"   # session.info: (metric, tenant) pairs known seeded today
+
+
+class _Unknown(Exception):
+    """An old attribute value wasn't loaded, so the delta can't be computed."""
+
+
+class _State:
+    def __init__(self, values: dict):
+        self.__dict__.update(values)
+
+
+def _old_state(obj, metric: Metric) -> _State:
+    attrs = inspect(obj).attrs
+    values = {}
+    for f in metric.fields:
+        hist = attrs[f].history
+        if hist.deleted:
+            values[f] = hist.deleted[0]
+        elif hist.added:
+            raise _Unknown(f)
+        elif f in inspect(obj).dict:
+            values[f] = inspect(obj).dict[f]
+        else:
+            raise _Unknown(f)
+    return _State(values)
+
+
+def _contribute(acc: dict, metric: Metric, state, sign: int) -> None:
+    key = metric.key(state)
+    if key is None:
+        return
+    values = metric.values(state)
+    _add(acc, key, sign, values)
+    _add(acc, TOTAL, sign, values)
+
+
+def mark_stale(session: Session, *tables: str) -> None:
+    """Recompute the metrics over ``tables`` when ``session`` commits.
+
+    For writes that bypass the session (COPY on the raw connection).
+    """
+    stale = session.info.setdefault(_STALE, set())
+    stale.update(_BY_TABLE[t].name for t in tables if t in _BY_TABLE)
+
+
+def _apply(session: Session, metric: Metric, deltas: dict, tenant_id: int) -> None:
+    today = date.today()
+    seeded = session.info.setdefault(_SEEDED, set())
+    if (metric.name, tenant_id) not in seeded:
+        day, rows = _stored(session, metric.name, tenant_id, today)
+        seeded.add((metric.name, tenant_id))
+        if day is None:
+            # First write today: the flush is already visible, so a recompute
+            # includes these changes — don't also apply the deltas.
+            refresh(session, metric, tenant_id, today)
+            return
+    rows = [{"tenant_id": tenant_id, "rollup_date": today, "metric": metric.name,
+             "dimension": key, "count": c, "value": v, "value_2": v2, "value_3": v3}
+            for key, (c, v, v2, v3) in deltas.items()
+            if c or v or v2 or v3]
+    if rows:
+        _upsert(session, rows, add=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    with session.no_autoflush:
+        _collect_and_apply(session)
+
+
+def _collect_and_apply(session: Session) -> None:
+    deltas: dict[tuple, dict] = {}   # (metric name, tenant) → dimension deltas
+    stale = session.info.get(_STALE, set())
+    for objs, old, new in ((session.new, False, True), (session.dirty, True, True),
+                           (session.deleted, True, False)):
+        for obj in objs:
+            metric = _BY_MODEL.get(type(obj))
+            if metric is None or metric.name in stale:
+                continue
+            if old and new and not session.is_modified(obj):
+                continue
+            acc = deltas.setdefault((metric.name, _row_tenant(session, metric, obj)), {})
+            try:
+                if old:
+                    _contribute(acc, metric, _old_state(obj, metric), -1)
+                if new:
+                    _contribute(acc, metric, obj, 1)
+            except _Unknown:
+                mark_stale(session, metric.model.__tablename__)
+                stale = session.info[_STALE]
+    for (name, tenant_id), acc in deltas.items():
+        if name not in stale:
+            _apply(session, METRICS[name], acc, tenant_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None and table.name in _BY_TABLE:
+            mark_stale(state.session, table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    stale = session.info.pop(_STALE, None)
+    if stale:
+        session.flush()  # deltas of still-pending objects must precede the recompute
+        for name in sorted(stale | session.info.pop(_STALE, set())):
+            refresh(session, METRICS[name], session_tenant(session))
+    session.info.pop(_SEEDED, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_STALE, None)
+    session.info.pop(_SEEDED, None)
+
+
+# ── Consistency check ────────────────────────────────────────────────────
+
+def tenants(session: Session) -> list[int]:
+    """Tenants with stored rollups, and the default one."""
+    return sorted({DEFAULT_TENANT, *(t for (t,) in session.query(KpiRollup.tenant_id).distinct())})
+
+
+def check(session: Session, tenant_id: int = DEFAULT_TENANT,
+          repair: bool = False) -> dict[str, list[str]]:
+    """Compare each metric's latest rollup with a full recompute.
+
+    Returns metric → mismatch descriptions (empty lists when consistent).
+    With ``repair`` mismatching (or never seeded) metrics are rewritten
+    for today; the caller commits. Untenanted metrics are checked only for
+    the default tenant, which holds them.
+    """
+    report = {}
+    for metric in METRICS.values():
+        if _tenant(metric, tenant_id) != tenant_id:
+            continue
+        _, rows = _stored(session, metric.name, tenant_id)
+        fresh = compute(session, metric, tenant_id)
+        problems = []
+        for key in sorted(set(fresh) | set(rows)):
+            want = fresh.get(key, [0, _ZERO, _ZERO, _ZERO])
+            r = rows.get(key)
+            have = [r.count or 0, _dec(r.value), _dec(r.value_2), _dec(r.value_3)] if r \
+                else [0, _ZERO, _ZERO, _ZERO]
+            if want[0] != have[0] or any(abs(w - h) >= _CENT for w, h in zip(want[1:], have[1:])):
+                problems.append(f"{key!r}: stored {have[0]}/{have[1]:.2f}, "
+                                f"actual {want[0]}/{want[1]:.2f}")
+        if not rows:
+            problems.insert(0, "no rollup stored")
+        if problems and repair:
+            refresh(session, metric, tenant_id)
+        report[metric.name] = problems
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare stored KPI rollups with a full recompute")
+    parser.add_argument("--repair", action="store_true",
+                        help="Rewrite today's rollups for mismatching metrics")
+    parser.add_argument("--tenant", type=int, default=DEFAULT_TENANT)
+    args = parser.parse_args()
+
+    import backend.main  # noqa: F401 — registers every model
+    from backend.core.database import SessionLocal
+    session = SessionLocal()
+    try:
+        report = check(session, args.tenant, repair=args.repair)
+        for name, problems in report.items():
+            print(f"{name:14s} {'ok' if not problems else f'{len(problems)} mismatches'}")
+            for p in problems[:20]:
+                print(f"    {p}")
+        if args.repair:
+            session.commit()
+        return 1 if any(report.values()) and not args.repair else 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+"""Process-level cache of the live database schema (tables and columns).
+
+Introspecting the catalog costs a round trip per call, so routers ask
+``schema_cache`` instead: ``table_exists()`` and ``columns()`` are dict
+lookups. The cache is filled at startup (``lifespan``) and refreshed
+automatically after ``Base.metadata.create_all``/``drop_all``; call
+``schema_cache.refresh()`` after any other DDL, e.g. a manual migration.
+
+``create_missing_indexes()`` adds indexes declared on models after their
+table was created (``CONCURRENTLY`` on PostgreSQL). It is a deploy step,
+``python -m backend.core.schema``, not part of startup; startup only logs
+what is missing. A unique index whose columns already hold duplicates is
+not created; the duplicates are logged instead.
+"""
+
+import argparse
+import logging
+import time
+import warnings
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import Index, and_, event, exc, func, inspect, select
+from sqlalchemy.schema import CreateIndex
+
+from backend.core.database import Base, engine
+
+
+log = logging.getLogger("secg.schema")
+
+
+class SchemaCache:
+    """Table name → column names, as of the last ``refresh()``."""
+
+    def __init__(self):
+        self.generation = 0
+        self.refreshed_at: Optional[float] = None   # time.time()
+        self._tables: dict[str, tuple[str, ...]] = {}
+        self._lock = Lock()
+
+    def refresh(self, bind=None) -> None:
+        """Re-read every table and its columns from ``bind`` (default: engine)."""
+        inspector = inspect(bind if bind is not None else engine)
+        tables = {
+            name: tuple(c["name"] for c in cols)
+            for (_, name), cols in inspector.get_multi_columns().items()
+        }
+        with self._lock:
+            self._tables = tables
+            self.generation += 1
+            self.refreshed_at = time.time()
+
+    def _ensure(self) -> None:
+        if self.refreshed_at is None:
+            self.refresh()
+
+    def table_exists(self, name: str) -> bool:
+        self._ensure()
+        return name in self._tables
+
+    def columns(self, name: str) -> Optional[tuple[str, ...]]:
+        """Column names of ``name``, or None if the table doesn't exist."""
+        self._ensure()
+        return self._tables.get(name)
+
+    def tables(self) -> list[str]:
+        self._ensure()
+        return sorted(self._tables)
+
+    def as_dict(self) -> dict:
+        return {
+            "generation": self.generation,
+            "refreshed_at": self.refreshed_at,
+            "age_seconds": round(time.time() - self.refreshed_at, 1)
+            if self.refreshed_at is not None else None,
+            "table_count": len(self._tables),
+        }
+
+
+schema_cache = SchemaCache()
+
+
+def _duplicates(bind, index, limit: int = 5) -> list[tuple]:
+    """Up to ``limit`` values of ``index``'s columns held by more than one row
+    (rows with a NULL among them don't conflict)."""
+    columns = list(index.columns)
+    query = (
+        select(*columns, func.count().label("rows"))
+        .where(and_(*(c.isnot(None) for c in columns)))
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .limit(limit)
+    )
+    with bind.connect() as conn:
+        return [tuple(row) for row in conn.execute(query)]
+
+
+def _reflected_indexes(bind) -> set[tuple[str, str]]:
+    """(table, name) of every index and unique constraint in the database."""
+    inspector = inspect(bind)
+    with warnings.catch_warnings():
+        # Expression indexes (core/events.py) aren't model-declared; skipping them is fine
+        warnings.filterwarnings("ignore", "Skipped unsupported reflection", exc.SAWarning)
+        existing = {
+            (name, ix["name"])
+            for (_, name), indexes in inspector.get_multi_indexes().items()
+            for ix in indexes
+        }
+        # Unique constraints of the same name (older schemas) already do the job
+        existing |= {
+            (name, uc["name"])
+            for (_, name), constraints in inspector.get_multi_unique_constraints().items()
+            for uc in constraints
+        }
+    return existing
+
+
+def missing_indexes(bind=None) -> list[Index]:
+    """Model-declared indexes absent from tables that already exist.
+
+    ``create_all`` only builds indexes together with a new table, so these
+    are indexes added to a model later.
+    """
+    bind = bind if bind is not None else engine
+    existing = _reflected_indexes(bind)
+    tables = set(inspect(bind).get_table_names())
+    return [
+        index
+        for table in Base.metadata.sorted_tables if table.name in tables
+        for index in table.indexes
+        if index.name and (table.name, index.name) not in existing
+    ]
+
+
+def _invalid_indexes(conn) -> set[str]:
+    """PostgreSQL indexes left INVALID by an interrupted concurrent build."""
+    return {name for (name,) in conn.exec_driver_sql(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE NOT i.indisvalid")}
+
+
+def create_missing_indexes(bind=None) -> list[str]:
+    """Create ``missing_indexes()``; returns the names created.
+
+    On PostgreSQL each index is built with ``CREATE INDEX CONCURRENTLY IF
+    NOT EXISTS`` outside a transaction, so writes to the table go on while
+    it builds and concurrent runs don't collide. An index left invalid by
+    an interrupted build is dropped and built again. A unique index is
+    only created once its columns hold no duplicates; until then each run
+    logs them.
+
+    Not run at startup: a build on a large table can take minutes. Run
+    ``python -m backend.core.schema`` after deploying new model indexes.
+    """
+    bind = bind if bind is not None else engine
+    created = []
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        postgres = conn.dialect.name == "postgresql"
+        missing = missing_indexes(bind)
+        if postgres:
+            invalid = _invalid_indexes(conn)
+            declared = {ix.name: ix for t in Base.metadata.sorted_tables for ix in t.indexes}
+            for name in sorted(invalid & declared.keys()):
+                log.warning("Index %s is invalid (interrupted build); rebuilding", name)
+                conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+                if declared[name] not in missing:
+                    missing.append(declared[name])
+        for index in missing:
+            if index.unique:
+                dupes = _duplicates(bind, index)
+                if dupes:
+                    log.warning(
+                        "Unique index %s not created: %s has duplicate (%s), e.g. %s; "
+                        "merge or delete them and run this again",
+                        index.name, index.table.name, ", ".join(c.name for c in index.columns),
+                        "; ".join(f"{values[:-1]} x{values[-1]}" for values in dupes))
+                    continue
+            options = index.dialect_options["postgresql"]
+            concurrently = options["concurrently"]
+            options["concurrently"] = postgres
+            try:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            finally:
+                options["concurrently"] = concurrently
+            created.append(index.name)
+    return created
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Create model indexes missing from the database")
+    parser.add_argument("--dry-run", action="store_true", help="only list the missing indexes")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    import backend.main  # noqa: F401 — registers every model
+    if args.dry_run:
+        for index in missing_indexes():
+            print(f"{index.table.name}.{index.name}")
+        return 0
+    for name in create_missing_indexes():
+        print(f"created {name}")
+    return 0
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    schema_cache.refresh(connection)
+
+
+@event.listens_for(Base.metadata, "after_drop")
+def _after_drop(target, connection, **kw):
+    schema_cache.refresh(connection)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
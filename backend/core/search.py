@@ -0,0 +1,534 @@
+"""Global search index: one ``search_entries`` row per searchable record.
+
+Entries are written in the same transaction as the records they describe:
+after each flush, new and edited projects, vendors, employees, invoices and
+documents are re-indexed and deleted ones dropped. Core insert/update/delete
+on a source table (bulk imports) and COPY writes reported via
+``mark_stale()`` instead rebuild that entity type once, just before commit.
+
+Queries match every word of the term, as a substring or (for words shorter
+than three characters) as a word prefix, so type-ahead works from the first
+keystroke:
+
+- PostgreSQL: ``pg_trgm`` and ``tsvector`` GIN indexes on ``content``,
+  ranked by ``ts_rank`` plus trigram similarity to the title.
+- Elsewhere (SQLite in development): an in-process trigram + sorted-token
+  index over ``search_entries``, rebuilt when a local commit changes it or
+  after ``LOCAL_INDEX_TTL`` seconds (to pick up other processes' writes).
+
+``search_concurrent()`` is the async path used by the search endpoints: one
+query per entity type, each on its own session in a bounded thread pool, with
+a per-entity time budget so a slow or failing type is reported instead of
+stalling or failing the response.
+
+``python -m backend.core.search --rebuild`` repopulates the table.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import logging
+import re
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from sqlalchemy import DDL, event, func, inspect, literal_column, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models.core import Employee, Invoice, Project, Vendor
+from backend.models.document_vault import VaultDocument
+from backend.models.extended import Document, SearchEntry
+
+
+log = logging.getLogger(__name__)
+
+# Seconds before the in-process index re-reads search_entries regardless
+LOCAL_INDEX_TTL = 30.0
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _status(value) -> str:
+    return getattr(value, "value", value) or "unknown"
+
+
+@dataclass(frozen=True)
+class Entity:
+    """How one model is indexed: ``fields`` are the attributes ``entry`` reads."""
+
+    name: str
+    model: Any
+    fields: tuple
+    entry: Callable[[Any], tuple]   # row → (title, subtitle, url, searchable text)
+
+
+ENTITIES = {e.name: e for e in (
+    Entity("projects", Project, ("name", "code", "address", "status"),
+           lambda r: (r.name, f"{r.code} · {_status(r.status)}", f"/projects/{r.id}",
+                      (r.name, r.code, r.address))),
+    Entity("vendors", Vendor, ("name", "trade"),
+           lambda r: (r.name, r.trade or "Vendor", f"/vendors?vendor_id={r.id}",
+                      (r.name, r.trade))),
+    Entity("employees", Employee, ("first_name", "last_name", "role", "email"),
+           lambda r: (f"{r.first_name} {r.last_name}", r.role or "Team", "/team",
+                      (r.first_name, r.last_name, r.role, r.email))),
+    Entity("invoices", Invoice, ("invoice_number", "amount"),
+           lambda r: (r.invoice_number, f"${float(r.amount or 0):,.2f}",
+                      f"/financials/ar?invoice_id={r.id}", (r.invoice_number,))),
+    Entity("documents", Document, ("title", "doc_type"),
+           lambda r: (r.title, r.doc_type, f"/documents?document_id={r.id}",
+                      (r.title, r.doc_type))),
+    Entity("vault_documents", VaultDocument, ("title", "doc_type"),
+           lambda r: (r.title, r.doc_type, f"/documents?vault_document_id={r.id}",
+                      (r.title, r.doc_type))),
+)}
+
+_BY_MODEL = {e.model: e for e in ENTITIES.values()}
+_BY_TABLE = {e.model.__tablename__: e for e in ENTITIES.values()}
+
+
+def _entry_row(entity: Entity, r) -> dict:
+    title, subtitle, url, text = entity.entry(r)
+    return {"entity_type": entity.name, "entity_id": r.id, "title": (title or "")[:300],
+            "subtitle": (subtitle or "")[:300] or None, "url": url,
+            "content": normalize(" ".join(t for t in text if t))}
+
+
+# ── PostgreSQL indexes ───────────────────────────────────────────────────
+
+_table = SearchEntry.__table__
+event.listen(_table, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+event.listen(_table, "after_create", DDL(
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_trgm "
+    "ON search_entries USING gin (content gin_trgm_ops)").execute_if(dialect="postgresql"))
+event.listen(_table, "after_create", DDL(
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_tsv "
+    "ON search_entries USING gin (to_tsvector('simple', content))").execute_if(dialect="postgresql"))
+
+
+# ── Keeping entries in sync ──────────────────────────────────────────────
+
+_STALE = "search_stale"   # session.info: entity types to rebuild at commit
+_DIRTY = "search_dirty"   # session.info: search_entries changed in this transaction
+
+
+def mark_stale(session: Session, *tables: str) -> None:
+    """Rebuild the entries for ``tables`` when ``session`` commits.
+
+    For writes that bypass the session (COPY on the raw connection).
+    """
+    stale = session.info.setdefault(_STALE, set())
+    stale.update(_BY_TABLE[t].name for t in tables if t in _BY_TABLE)
+
+
+def _write(session: Session, entity: Entity, rows: list[dict], removed: list[int]) -> None:
+    ids = [r["entity_id"] for r in rows] + removed
+    if not ids:
+        return
+    session.execute(_table.delete().where(
+        _table.c.entity_type == entity.name, _table.c.entity_id.in_(ids)))
+    if rows:
+        session.execute(_table.insert(), rows)
+    session.info[_DIRTY] = True
+
+
+def rebuild(session: Session, names=None) -> int:
+    """Re-index every record of the given entity types (default: all)."""
+    total = 0
+    for name in names or ENTITIES:
+        entity = ENTITIES[name]
+        model = entity.model
+        cols = [model.id] + [getattr(model, f) for f in entity.fields]
+        session.execute(_table.delete().where(_table.c.entity_type == name))
+        rows = [_entry_row(entity, r) for r in session.query(*cols)]
+        for i in range(0, len(rows), 5000):
+            session.execute(_table.insert(), rows[i:i + 5000])
+        total += len(rows)
+    session.info[_DIRTY] = True
+    return total
+
+
+def reindex(session: Session, name: str, ids) -> int:
+    """Rewrite the entries of the ``name`` records with ``ids`` from the
+    source table; ids no longer there are dropped."""
+    entity = ENTITIES[name]
+    model = entity.model
+    ids = set(ids)
+    cols = [model.id] + [getattr(model, f) for f in entity.fields]
+    rows = [_entry_row(entity, r) for r in session.query(*cols).filter(model.id.in_(ids))]
+    _write(session, entity, rows, sorted(ids - {r["entity_id"] for r in rows}))
+    return len(rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    stale = session.info.get(_STALE, set())
+    changed: dict[str, tuple[list, list]] = {}
+    with session.no_autoflush:
+        for objs, removed in ((session.new, False), (session.dirty, False),
+                              (session.deleted, True)):
+            for obj in objs:
+                entity = _BY_MODEL.get(type(obj))
+                if entity is None or entity.name in stale:
+                    continue
+                rows, gone = changed.setdefault(entity.name, ([], []))
+                if removed:
+                    gone.append(obj.id)
+                elif obj in session.new or _fields_changed(obj, entity):
+                    rows.append(_entry_row(entity, obj))
+        for name, (rows, gone) in changed.items():
+            _write(session, ENTITIES[name], rows, gone)
+
+
+def _fields_changed(obj, entity: Entity) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[f].history.has_changes() for f in entity.fields)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None and table.name in _BY_TABLE:
+            mark_stale(state.session, table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    stale = session.info.pop(_STALE, None)
+    if stale:
+        session.flush()
+        rebuild(session, sorted(stale | session.info.pop(_STALE, set())))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop(_DIRTY, False):
+        _local.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_STALE, None)
+    session.info.pop(_DIRTY, None)
+
+
+# ── In-process index (non-PostgreSQL) ────────────────────────────────────
+
+def _trigrams(word: str) -> set[str]:
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class TrigramIndex:
+    """Trigram postings and a sorted token list over a snapshot of entries.
+
+    Words of three or more characters match as substrings of an entry's
+    content (trigram candidates, then verified); shorter words match as
+    token prefixes via binary search.
+
+    Entries are stored sorted by (type, title length, title), so within a
+    type a lower position is a better tie-break and the top hits of a tier
+    are the first ones met while scanning the matches in order. Tiers, best
+    first: title starts with the term; every word starts a token; the rest.
+    """
+
+    def __init__(self, entries: list[tuple]):
+        # entries: (entity_type, entity_id, title, subtitle, url, content)
+        self.entries = sorted(entries, key=lambda e: (e[0], len(e[2] or ""), normalize(e[2])))
+        self.ranges: dict[str, tuple[int, int]] = {}
+        self.titles: dict[str, list[tuple[str, int]]] = {}
+        self.grams: dict[str, set[int]] = {}
+        tokens = []
+        for i, e in enumerate(self.entries):
+            lo, _ = self.ranges.get(e[0], (i, i))
+            self.ranges[e[0]] = (lo, i + 1)
+            self.titles.setdefault(e[0], []).append((normalize(e[2]), i))
+            content = e[5]
+            for tok in set(words(content)):
+                tokens.append((tok, i))
+            for gram in _trigrams(content):
+                self.grams.setdefault(gram, set()).add(i)
+        for titles in self.titles.values():
+            titles.sort()
+        tokens.sort()
+        self.tokens = [t for t, _ in tokens]
+        self.token_docs = [i for _, i in tokens]
+
+    def _prefix(self, word: str) -> set[int]:
+        lo = bisect_left(self.tokens, word)
+        hi = bisect_left(self.tokens, word + "\uffff", lo)
+        return set(self.token_docs[lo:hi])
+
+    def _substring(self, word: str) -> set[int]:
+        postings = sorted((self.grams.get(g, set()) for g in _trigrams(word)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        docs = postings[0].intersection(*postings[1:])
+        return {i for i in docs if word in self.entries[i][5]}
+
+    def _title_prefix(self, entity_type: str, term: str) -> set[int]:
+        titles = self.titles[entity_type]
+        lo = bisect_left(titles, (term,))
+        hi = bisect_left(titles, (term + "\uffff",), lo)
+        return {i for _, i in titles[lo:hi]}
+
+    def search(self, term: str, types, limit: int) -> dict[str, list[dict]]:
+        term = normalize(term)
+        ws = words(term)
+        if not ws:
+            return {}
+        prefixes: dict[str, set[int]] = {}
+        docs = None
+        for w in sorted(ws, key=len, reverse=True):  # most selective first
+            if len(w) >= 3:
+                found = self._substring(w)
+            else:
+                found = prefixes[w] = self._prefix(w)
+            docs = found if docs is None else docs & found
+            if not docs:
+                return {}
+        word_start = docs
+        for w in ws:
+            word_start = word_start & (prefixes[w] if w in prefixes else self._prefix(w))
+        ordered = sorted(docs)
+
+        out = {}
+        for name in types:
+            if name not in self.ranges:
+                continue
+            lo, hi = self.ranges[name]
+            a, b = bisect_left(ordered, lo), bisect_left(ordered, hi)
+            if a == b:
+                continue
+            title_start = self._title_prefix(name, term)
+            tiers: tuple[list, list, list] = ([], [], [])
+            for i in ordered[a:b]:
+                tier = 0 if i in title_start else 1 if i in word_start else 2
+                if len(tiers[tier]) < limit:
+                    tiers[tier].append(i)
+                    if tier == 0 and len(tiers[0]) == limit:
+                        break
+            picked = [(i, 2 - tier) for tier in range(3) for i in tiers[tier]][:limit]
+            out[name] = [
+                _hit(self.entries[i], score - len(self.entries[i][2] or "") / 1000)
+                for i, score in picked
+            ]
+        return out
+
+
+def _hit(e: tuple, score: float) -> dict:
+    return {"entity_type": e[0], "id": e[1], "title": e[2], "subtitle": e[3],
+            "url": e[4], "score": round(score, 4)}
+
+
+class _LocalIndex:
+    def __init__(self):
+        self._index: Optional[TrigramIndex] = None
+        self._built_at = 0.0
+        self._lock = Lock()
+
+    def invalidate(self):
+        self._index = None
+
+    def get(self, session: Session) -> TrigramIndex:
+        index = self._index
+        if index is not None and time.monotonic() - self._built_at < LOCAL_INDEX_TTL:
+            return index
+        with self._lock:
+            if self._index is None or time.monotonic() - self._built_at >= LOCAL_INDEX_TTL:
+                rows = session.query(
+                    SearchEntry.entity_type, SearchEntry.entity_id, SearchEntry.title,
+                    SearchEntry.subtitle, SearchEntry.url, SearchEntry.content,
+                ).all()
+                self._index = TrigramIndex([tuple(r) for r in rows])
+                self._built_at = time.monotonic()
+            return self._index
+
+
+_local = _LocalIndex()
+
+
+# ── Querying ─────────────────────────────────────────────────────────────
+
+def _search_postgres(session: Session, term: str, types, limit: int) -> dict[str, list[dict]]:
+    term = normalize(term)
+    ws = words(term)
+    if not ws:
+        return {}
+    # Inline the config so the expression matches ix_search_entries_tsv
+    simple = literal_column("'simple'")
+    vector = func.to_tsvector(simple, SearchEntry.content)
+    query = func.to_tsquery(simple, " & ".join(f"{w}:*" for w in ws))
+    score = func.ts_rank(vector, query) + func.similarity(func.lower(SearchEntry.title), term)
+    ranked = select(
+        SearchEntry.entity_type, SearchEntry.entity_id, SearchEntry.title,
+        SearchEntry.subtitle, SearchEntry.url, score.label("score"),
+        func.row_number().over(partition_by=SearchEntry.entity_type,
+                               order_by=(score.desc(), SearchEntry.title)).label("rn"),
+    ).where(
+        SearchEntry.entity_type.in_(list(types)),
+        # Same semantics as TrigramIndex: substring for 3+ chars, else word prefix
+        *[SearchEntry.content.contains(w, autoescape=True) if len(w) >= 3
+          else vector.op("@@")(func.to_tsquery(simple, f"{w}:*")) for w in ws],
+    ).subquery()
+    rows = session.execute(
+        select(ranked).where(ranked.c.rn <= limit).order_by(ranked.c.entity_type, ranked.c.rn)
+    ).all()
+    out: dict[str, list] = {}
+    for r in rows:
+        out.setdefault(r.entity_type, []).append(_hit(tuple(r[:5]), float(r.score)))
+    return out
+
+
+_populated = False
+
+
+def _ensure_populated(session: Session) -> None:
+    """Index existing records the first time an empty index is searched."""
+    global _populated
+    if _populated:
+        return
+    if session.query(SearchEntry.id).first() is None:
+        if rebuild(session):
+            session.commit()
+    _populated = True
+
+
+def search(session: Session, term: str, types=None, limit: int = 5) -> dict[str, list[dict]]:
+    """Ranked hits for ``term``: entity type → up to ``limit`` hit dicts
+    (entity_type, id, title, subtitle, url, score), best first."""
+    types = set(types or ENTITIES) & set(ENTITIES)
+    _ensure_populated(session)
+    if session.get_bind().dialect.name == "postgresql":
+        return _search_postgres(session, term, types, limit)
+    return _local.get(session).search(term, types, limit)
+
+
+# ── Concurrent fan-out ───────────────────────────────────────────────────
+
+_pool = ThreadPoolExecutor(max_workers=settings.search_workers,
+                           thread_name_prefix="secg-search")
+
+
+def _populate_once() -> None:
+    session = SessionLocal()
+    try:
+        _ensure_populated(session)
+    finally:
+        session.close()
+
+
+def _search_one(name: str, term: str, limit: int, timeout: float, deadline: float,
+                load: Optional[Callable[[Session, str, list], Any]]):
+    if time.monotonic() >= deadline:
+        return None   # queued past its budget; the caller has already given up on it
+    session = SessionLocal()
+    raw = None
+    try:
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            # Cancel server-side too, so an abandoned query frees its connection
+            session.execute(text(f"SET LOCAL statement_timeout = {max(int(timeout * 1000), 1)}"))
+        elif dialect == "sqlite":
+            # SQLite's equivalent: abort the running statement past the deadline
+            raw = session.connection().connection.dbapi_connection
+            raw.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        hits = search(session, term, {name}, limit).get(name, [])
+        return load(session, name, hits) if load else hits
+    finally:
+        if raw is not None:
+            raw.set_progress_handler(None, 0)
+        session.close()
+
+
+async def search_concurrent(
+    term: str,
+    types=None,
+    limit: int = 5,
+    timeout: Optional[float] = None,
+    load: Optional[Callable[[Session, str, list], Any]] = None,
+) -> tuple[dict[str, Any], list[str], list[str]]:
+    """``search()`` with one query per entity type, run concurrently.
+
+    Each type gets its own session and ``timeout`` seconds (default
+    ``settings.search_entity_timeout``); ``load(session, name, hits)``, if
+    given, runs in the same worker and its return value replaces the hits.
+    Returns (entity type → hits or loaded value, sorted types that ran out
+    of time, sorted types whose query failed). Latency is that of the
+    slowest type, capped at ``timeout``.
+
+    A type over budget is cancelled if still queued and interrupted by a
+    statement timeout if running, so it doesn't hold a pool thread. A type
+    that fails is logged and left out of the results, like a timeout.
+    """
+    names = sorted(set(types or ENTITIES) & set(ENTITIES))
+    timeout = settings.search_entity_timeout if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    if not _populated:
+        await loop.run_in_executor(_pool, _populate_once)
+    deadline = time.monotonic() + timeout
+    tasks = {
+        # copy_context: per-request instrumentation follows the query into the worker
+        name: loop.run_in_executor(_pool, contextvars.copy_context().run,
+                                   _search_one, name, term, limit, timeout, deadline, load)
+        for name in names
+    }
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=timeout)
+    results: dict[str, Any] = {}
+    timed_out: list[str] = []
+    failed: list[str] = []
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()   # drops it if still queued; if running, the statement timeout ends it
+            timed_out.append(name)
+        elif task.exception() is not None:
+            if isinstance(task.exception(), OperationalError) and time.monotonic() >= deadline:
+                timed_out.append(name)   # cancelled by the statement timeout
+                continue
+            log.warning("Search of %s for %r failed", name, term, exc_info=task.exception())
+            failed.append(name)
+        else:
+            results[name] = task.result()
+    return results, timed_out, failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Global search index maintenance")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Re-index every searchable record")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return 1
+
+    import backend.main  # noqa: F401 — registers every model
+    from backend.core.database import SessionLocal
+    session = SessionLocal()
+    try:
+        count = rebuild(session)
+        session.commit()
+        print(f"Indexed {count} records")
+        return 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
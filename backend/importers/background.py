@@ -0,0 +1,148 @@
+"""Background import jobs for the admin API.
+
+Uploads are handed to a single import thread so the request returns at once
+with a job id. Jobs run one at a time (imports write the same tables) and
+report an ImportProgress that the API polls or streams; cancelling sets the
+progress' cancel event, which importers honour at their next chunk boundary.
+
+Job state lives in this process only — it is lost on restart, and with
+several API processes a job is only visible to the one that started it.
+"""
+
+import logging
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Optional
+
+from backend.core.database import SessionLocal
+from backend.importers.base import BaseImporter, ImportCancelled, ImportProgress
+
+
+logger = logging.getLogger("secg.import")
+
+# Finished jobs kept for polling before the oldest are dropped
+MAX_FINISHED_JOBS = 50
+
+
+class ImportJob:
+    """One queued/running/finished import and its live progress."""
+
+    def __init__(self, source: str, filename: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.source = source
+        self.filename = filename
+        self.status = "queued"   # queued, running, complete, failed, cancelled
+        self.progress = ImportProgress()
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("complete", "failed", "cancelled")
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "source": self.source,
+            "file": self.filename,
+            "status": self.status,
+            "progress": self.progress.as_dict(),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="secg-import")
+_jobs: dict[str, ImportJob] = {}
+_lock = Lock()
+
+
+def _result_dict(result) -> dict:
+    d = {
+        "created": result.created,
+        "updated": result.updated,
+        "skipped": result.skipped,
+        "unchanged": result.unchanged,
+        "errors": list(result.errors[:20]),
+    }
+    if result.tabs:
+        d["tabs"] = {name: stats.summary() for name, stats in result.tabs.items()}
+    return d
+
+
+def _run(job: ImportJob, make_importer: Callable, cleanup_dir: Optional[str]):
+    if job.progress.cancelled:
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+        return
+    job.status = "running"
+    session = SessionLocal()
+    importer: Optional[BaseImporter] = None
+    try:
+        importer = make_importer(session)
+        importer.progress = job.progress
+        importer.cancel_event = job.progress.cancel_event
+        result = importer.run()
+        job.result = _result_dict(result)
+        job.status = "complete"
+    except ImportCancelled:
+        session.rollback()
+        if importer is not None:
+            importer.result.finish()
+            job.result = _result_dict(importer.result)
+        job.status = "cancelled"
+    except Exception as e:  # noqa: BLE001 - reported on the job
+        logger.exception("Import job %s failed", job.id)
+        session.rollback()
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        session.close()
+        job.progress.finish()
+        job.finished_at = datetime.utcnow()
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+
+def _prune():
+    finished = sorted((j for j in _jobs.values() if j.done), key=lambda j: j.finished_at or j.created_at)
+    for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+        del _jobs[job.id]
+
+
+def submit(source: str, make_importer: Callable, filename: Optional[str] = None,
+           cleanup_dir: Optional[str] = None) -> ImportJob:
+    """Queue an import. ``make_importer(session)`` builds the importer to run;
+    ``cleanup_dir`` (the upload's temp dir) is removed when the job ends."""
+    job = ImportJob(source, filename)
+    with _lock:
+        _prune()
+        _jobs[job.id] = job
+    _executor.submit(_run, job, make_importer, cleanup_dir)
+    return job
+
+
+def get(job_id: str) -> Optional[ImportJob]:
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> list[ImportJob]:
+    with _lock:
+        return sorted(_jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+
+def cancel(job_id: str) -> Optional[ImportJob]:
+    """Ask a job to stop; a queued job never starts."""
+    job = _jobs.get(job_id)
+    if job is not None and not job.done:
+        job.progress.cancel()
+    return job
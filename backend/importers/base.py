@@ -1,20 +1,157 @@
 """Base importer with shared utilities for logging, dedup, and batch ops."""
 
+import enum
 import hashlib
+import io
 import logging
-from datetime import datetime
-from decimal import Decimal, InvalidOperation
+import multiprocessing
+import os
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any, Optional
 
+from sqlalchemy import bindparam, func, inspect, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from backend.models.core import AuditLog
-from backend.models.extended import DataSource
+from backend.core.config import settings
+from backend.core import rollups, search
+from backend.importers.coerce import to_bool, to_currency, to_date, to_int, to_string
+from backend.models.core import AuditLog, Project, Vendor
+from backend.models.extended import DataSource, ImportCheckpoint, ImportFingerprint
+
+
+try:  # POSIX only — memory figures are omitted on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
 
 
 logger = logging.getLogger("secg.import")
 
 
+def _peak_rss_kb() -> Optional[int]:
+    """Process peak resident set size in KB, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class ImportCancelled(Exception):
+    """Raised at a chunk boundary once an import has been asked to stop."""
+
+
+class ImportProgress:
+    """Live progress of one import run, read by the job that started it.
+
+    Importers update it at chunk/tab/file boundaries. ``cancel()`` sets a
+    process-shared event, so masterfile pool workers see it too.
+    """
+
+    def __init__(self):
+        self.step: Optional[str] = None     # current tab / file
+        self.steps_done = 0
+        self.steps_total = 0
+        self.rows_done = 0
+        self.rows_total = 0                  # 0 when unknown up front
+        self.cancel_event = multiprocessing.Event()
+        self._t0 = time.perf_counter()
+        self._t1: Optional[float] = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def finish(self):
+        """Freeze the rate once the run has ended."""
+        self._t1 = time.perf_counter()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def rows_per_sec(self) -> float:
+        secs = (self._t1 or time.perf_counter()) - self._t0
+        return self.rows_done / secs if secs > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self._t1 is not None:
+            return 0.0
+        rate = self.rows_per_sec
+        if not self.rows_total or rate <= 0:
+            return None
+        return max(self.rows_total - self.rows_done, 0) / rate
+
+    def as_dict(self) -> dict:
+        eta = self.eta_seconds
+        return {
+            "step": self.step,
+            "steps_done": self.steps_done,
+            "steps_total": self.steps_total,
+            "rows_done": self.rows_done,
+            "rows_total": self.rows_total,
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
+
+class TabStats:
+    """Row throughput and memory figures for one streamed tab/sheet."""
+
+    def __init__(self, tab_name: str):
+        self.tab_name = tab_name
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.rss_start_kb = _peak_rss_kb()
+        self.rss_peak_kb: Optional[int] = None
+        self.lookup_queries = 0
+        self.written = 0
+        self.write_seconds = 0.0
+        self.write_mode: Optional[str] = None
+        self.unchanged = False  # nothing written: every row matched its fingerprint
+        self._t0 = time.perf_counter()
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._t0
+        self.rss_peak_kb = _peak_rss_kb()
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def write_rows_per_sec(self) -> float:
+        return self.written / self.write_seconds if self.write_seconds > 0 else 0.0
+
+    @property
+    def rss_growth_kb(self) -> Optional[int]:
+        """How far the process high-water mark rose while this tab ran."""
+        if self.rss_start_kb is None or self.rss_peak_kb is None:
+            return None
+        return self.rss_peak_kb - self.rss_start_kb
+
+    def summary(self) -> str:
+        mem = ""
+        if self.rss_peak_kb is not None:
+            mem = (f", peak RSS {self.rss_peak_kb / 1024:.1f} MB"
+                   f" (+{self.rss_growth_kb / 1024:.1f} MB)")
+        lookups = f", {self.lookup_queries} lookup queries" if self.lookup_queries else ""
+        if self.unchanged:
+            return f"{self.tab_name}: {self.rows} rows unchanged, {self.seconds:.2f}s"
+        bulk = ""
+        if self.write_mode:
+            bulk = (f", wrote {self.written} via {self.write_mode}"
+                    f" at {self.write_rows_per_sec:,.0f} rows/s")
+        return (f"{self.tab_name}: {self.rows} rows in {self.chunks} chunks, "
+                f"{self.seconds:.2f}s, {self.rows_per_sec:,.0f} rows/s{mem}{lookups}{bulk}")
+
+
 class ImportResult:
     """Tracks the outcome of an import run."""
 
@@ -23,16 +160,40 @@ class ImportResult:
         self.created = 0
         self.updated = 0
         self.skipped = 0
+        self.unchanged = 0  # rows whose fingerprint matched the last import
         self.errors: list[str] = []
+        self.tabs: dict[str, TabStats] = {}
+        # Vendor/project identity cache counters (see IdentityCache)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_queries = 0
         self.started_at = datetime.utcnow()
         self.finished_at: Optional[datetime] = None
 
     def finish(self):
         self.finished_at = datetime.utcnow()
 
+    def start_tab(self, tab_name: str) -> TabStats:
+        """Begin collecting throughput/memory stats for a tab."""
+        stats = TabStats(tab_name)
+        self.tabs[tab_name] = stats
+        return stats
+
+    def merge(self, other: "ImportResult"):
+        """Fold another result (e.g. from a worker process) into this one."""
+        self.created += other.created
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.unchanged += other.unchanged
+        self.errors.extend(other.errors)
+        self.tabs.update(other.tabs)
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.cache_queries += other.cache_queries
+
     @property
     def total_processed(self) -> int:
-        return self.created + self.updated + self.skipped
+        return self.created + self.updated + self.skipped + self.unchanged
 
     def summary(self) -> str:
         elapsed = ""
@@ -44,8 +205,18 @@ class ImportResult:
             f"  Created: {self.created}",
             f"  Updated: {self.updated}",
             f"  Skipped: {self.skipped}",
+            f"  Unchanged: {self.unchanged}",
             f"  Errors:  {len(self.errors)}",
         ]
+        if self.cache_hits or self.cache_misses:
+            lines.append(
+                f"  Lookups: {self.cache_hits} hits, {self.cache_misses} misses, "
+                f"{self.cache_queries} queries"
+            )
+        if self.tabs:
+            lines.append("  Tabs:")
+            for stats in self.tabs.values():
+                lines.append(f"    {stats.summary()}")
         if self.errors:
             for e in self.errors[:10]:
                 lines.append(f"    ⚠ {e}")
@@ -54,6 +225,388 @@ class ImportResult:
         return "\n".join(lines)
 
 
+class IdentityCache:
+    """Per-import key → id maps for vendors (by name) and projects (by code).
+
+    Each map is preloaded with a single query the first time it is needed,
+    so repeated lookups are dict hits. Misses are resolved as a batch: one
+    SELECT picks up rows written outside the cache, then any still-missing
+    stubs are added together and flushed once.
+
+    Call ``reset()`` after a rollback — ids of stubs created in the rolled
+    back transaction are no longer valid.
+
+    With ``isolated`` set (parallel tab import), new stubs are committed in
+    a short transaction of their own, serialized by an advisory lock on
+    PostgreSQL, so concurrent workers never create the same stub twice.
+    """
+
+    _KINDS = {
+        "vendor": (Vendor, "name"),
+        "project": (Project, "code"),
+    }
+    _STUB_LOCK_KEYS = {"vendor": 0x5EC60001, "project": 0x5EC60002}
+
+    def __init__(self, session: Session, result: ImportResult):
+        self.session = session
+        self.result = result
+        self.isolated = False
+        self._maps: dict[str, dict[str, int]] = {}
+
+    def reset(self):
+        self._maps.clear()
+
+    def _map(self, kind: str) -> dict[str, int]:
+        cache = self._maps.get(kind)
+        if cache is None:
+            model, attr = self._KINDS[kind]
+            rows = self.session.query(getattr(model, attr), model.id).all()
+            cache = self._maps[kind] = dict(rows)
+            self.result.cache_queries += 1
+        return cache
+
+    def resolve(self, kind: str, stubs: dict[str, dict]) -> dict[str, int]:
+        """Return ``{key: id}`` for every key in ``stubs``.
+
+        ``stubs`` maps each key to the extra constructor kwargs used if a
+        stub row has to be created for it.
+        """
+        cache = self._map(kind)
+        missing = [k for k in stubs if k not in cache]
+        self.result.cache_hits += len(stubs) - len(missing)
+        self.result.cache_misses += len(missing)
+        if missing:
+            if self.isolated:
+                self._create_isolated(kind, missing, stubs, cache)
+            else:
+                self._create(self.session, kind, missing, stubs, cache)
+        return {k: cache[k] for k in stubs}
+
+    def _create(self, session: Session, kind: str, missing, stubs, cache):
+        model, attr = self._KINDS[kind]
+        col = getattr(model, attr)
+        cache.update(session.query(col, model.id).filter(col.in_(missing)).all())
+        self.result.cache_queries += 1
+        new = [model(**{attr: k}, **stubs[k]) for k in missing if k not in cache]
+        if new:
+            session.add_all(new)
+            session.flush()
+            self.result.cache_queries += 1
+            for obj in new:
+                cache[getattr(obj, attr)] = obj.id
+
+    def _create_isolated(self, kind: str, missing, stubs, cache):
+        session = Session(bind=self.session.get_bind())
+        try:
+            if session.get_bind().dialect.name == "postgresql":
+                session.execute(text("SELECT pg_advisory_xact_lock(:key)"),
+                                {"key": self._STUB_LOCK_KEYS[kind]})
+            self._create(session, kind, missing, stubs, cache)
+            session.commit()
+        finally:
+            session.close()
+
+    def lookup(self, kind: str, key: str) -> Optional[int]:
+        """Return the id for ``key`` without creating a stub."""
+        if not key:
+            return None
+        cache = self._map(kind)
+        if key in cache:
+            self.result.cache_hits += 1
+            return cache[key]
+        self.result.cache_misses += 1
+        model, attr = self._KINDS[kind]
+        row = self.session.query(model.id).filter(getattr(model, attr) == key).first()
+        self.result.cache_queries += 1
+        if row is None:
+            return None
+        cache[key] = row[0]
+        return row[0]
+
+
+class FingerprintStore:
+    """Content hashes of previously imported rows, keyed by tab + natural key.
+
+    A tab's fingerprints are loaded with one query the first time the tab is
+    checked. ``check()`` compares a row hash against the stored one without
+    touching the imported tables; ``remember()`` queues the new hash, and
+    ``flush()`` writes every queued fingerprint in two batched statements.
+    Call it just before committing the rows it describes, and ``discard()``
+    after a rollback.
+
+    With ``refresh`` set nothing is reported unchanged, so every row is
+    re-applied and its fingerprint rewritten (a forced full import).
+    """
+
+    def __init__(self, session: Session, source: str, batch_id: str):
+        self.session = session
+        self.source = source
+        self.batch_id = batch_id
+        self.refresh = False
+        # tab → natural key → (fingerprint id, row hash, record id)
+        self._tabs: dict[str, dict[str, tuple]] = {}
+        self._pending: list[tuple] = []
+        self._queued: set[tuple[str, str]] = set()
+
+    @staticmethod
+    def digest(values) -> str:
+        """Stable sha1 of a row: a dict of cleaned fields or a raw value tuple."""
+        if isinstance(values, dict):
+            values = sorted(values.items())
+        h = hashlib.sha1()
+        for v in values:
+            h.update(repr(v).encode())
+            h.update(b"\x1f")
+        return h.hexdigest()
+
+    def _load(self, tab: str) -> dict[str, tuple]:
+        known = self._tabs.get(tab)
+        if known is None:
+            rows = self.session.query(
+                ImportFingerprint.natural_key, ImportFingerprint.id,
+                ImportFingerprint.row_hash, ImportFingerprint.record_id,
+            ).filter(
+                ImportFingerprint.source == self.source,
+                ImportFingerprint.tab == tab,
+            ).all()
+            known = self._tabs[tab] = {key: (fid, h, rid) for key, fid, h, rid in rows}
+        return known
+
+    def check(self, tab: str, key: str, row_hash: str) -> tuple[str, Optional[int]]:
+        """Return ``(status, record_id)``; status is new, changed or unchanged."""
+        seen = self._load(tab).get(key)
+        if seen is None:
+            return "new", None
+        if seen[1] == row_hash and not self.refresh:
+            return "unchanged", seen[2]
+        return "changed", seen[2]
+
+    def remember(self, tab: str, key: str, row_hash: str, record=None):
+        """Queue ``row_hash`` for ``key``. ``record`` is an id or ORM object."""
+        self._pending.append((tab, key, row_hash, record))
+        self._queued.add((tab, key))
+
+    def queued(self, tab: str, key: str) -> bool:
+        """True if ``key`` was already remembered since the last flush."""
+        return (tab, key) in self._queued
+
+    def flush(self):
+        if not self._pending:
+            return
+        self.session.flush()  # assign ids to records added since remember()
+        inserts, updates = [], []
+        for tab, key, row_hash, record in self._pending:
+            record_id = getattr(record, "id", record)
+            seen = self._load(tab).get(key)
+            if seen is None:
+                inserts.append({"source": self.source, "tab": tab, "natural_key": key,
+                                "row_hash": row_hash, "record_id": record_id,
+                                "batch_id": self.batch_id})
+            else:
+                updates.append({"fid": seen[0], "row_hash": row_hash,
+                                "record_id": record_id, "batch_id": self.batch_id})
+        table = ImportFingerprint.__table__
+        if inserts:
+            self.session.execute(table.insert(), inserts)
+        if updates:
+            self.session.execute(
+                table.update().where(table.c.id == bindparam("fid")).values(
+                    row_hash=bindparam("row_hash"), record_id=bindparam("record_id"),
+                    batch_id=bindparam("batch_id")),
+                updates,
+            )
+        # Re-read touched tabs on the next check to pick up the new hashes
+        for tab in {p[0] for p in self._pending}:
+            self._tabs.pop(tab, None)
+        self._pending = []
+        self._queued.clear()
+
+    def discard(self):
+        self._pending = []
+        self._queued.clear()
+        self._tabs.clear()
+
+
+class CheckpointStore:
+    """Durable record of the steps (and masterfile tabs) a batch completed.
+
+    ``mark()`` adds the checkpoint to the session, so it commits together with
+    the work it describes. On ``--resume`` the same batch id is reused and
+    ``completed()`` finds what already finished — provided the source file's
+    checksum is unchanged; an edited file is imported again.
+    """
+
+    def __init__(self, session: Session, batch_id: str):
+        self.session = session
+        self.batch_id = batch_id
+
+    @staticmethod
+    def checksum(path: Optional[str]) -> str:
+        """sha1 of a file, or of every file (name + content) in a directory."""
+        h = hashlib.sha1()
+        if not path:
+            return h.hexdigest()
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, f) for f in os.listdir(path))
+            files = [f for f in files if os.path.isfile(f)]
+        else:
+            files = [path]
+        for name in files:
+            h.update(os.path.basename(name).encode())
+            h.update(b"\x1f")
+            with open(name, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+        return h.hexdigest()
+
+    def completed(self, step: str, checksum: str, tab: str = "") -> Optional[ImportCheckpoint]:
+        """The checkpoint for ``step``/``tab`` if it finished on this checksum."""
+        return self.session.query(ImportCheckpoint).filter(
+            ImportCheckpoint.batch_id == self.batch_id,
+            ImportCheckpoint.step == step,
+            ImportCheckpoint.tab == tab,
+            ImportCheckpoint.checksum == checksum,
+        ).one_or_none()
+
+    def mark(self, step: str, checksum: str, tab: str = "", rows: int = 0,
+             summary: Optional[str] = None) -> None:
+        """Record ``step``/``tab`` as done; the caller commits."""
+        cp = self.session.query(ImportCheckpoint).filter(
+            ImportCheckpoint.batch_id == self.batch_id,
+            ImportCheckpoint.step == step,
+            ImportCheckpoint.tab == tab,
+        ).one_or_none()
+        if cp is None:
+            cp = ImportCheckpoint(batch_id=self.batch_id, step=step, tab=tab)
+            self.session.add(cp)
+        cp.checksum = checksum
+        cp.rows = rows
+        cp.summary = summary
+
+    def any(self) -> bool:
+        return self.session.query(ImportCheckpoint.id).filter(
+            ImportCheckpoint.batch_id == self.batch_id).first() is not None
+
+
+class BulkWriter:
+    """Buffers plain row dicts for one table and writes them in batches.
+
+    The write path depends on the session's engine:
+
+    * ``copy`` — PostgreSQL via psycopg2: ``COPY ... FROM STDIN`` (CSV)
+    * ``executemany`` — other server databases: one ``INSERT`` per batch
+    * ``orm`` — SQLite: rows become ORM objects on the session, as before
+
+    Rows are keyed by the model's attribute names, which are mapped to
+    column names before buffering; a key that isn't a column raises at
+    ``add()``, not at the first batch write. Every row must use the same
+    keys. Batches are sized by ``settings.import_batch_size``; call
+    ``close()`` before committing.
+    """
+
+    def __init__(self, session: Session, model, batch_size: Optional[int] = None):
+        self.session = session
+        self.model = model
+        self.table = model.__table__
+        self.batch_size = batch_size or settings.import_batch_size
+        self.mode = self._pick_mode(session)
+        self.written = 0
+        self.seconds = 0.0
+        self._rows: list[dict] = []
+        self._columns = {a.key: a.columns[0].name for a in inspect(model).column_attrs}
+        self._keys: Optional[tuple] = None   # keys of the last row checked
+        self._renames: dict[str, str] = {}
+
+    @staticmethod
+    def _pick_mode(session: Session) -> str:
+        dialect = session.get_bind().dialect
+        if dialect.name == "sqlite":
+            return "orm"
+        if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+            return "copy"
+        return "executemany"
+
+    def _check_keys(self, keys: tuple) -> None:
+        unknown = [k for k in keys if k not in self._columns]
+        if unknown:
+            raise ValueError(f"{self.table.name} has no column for {', '.join(unknown)}")
+        self._keys = keys
+        self._renames = {k: self._columns[k] for k in keys if self._columns[k] != k}
+
+    def add(self, **row):
+        keys = tuple(row)
+        if keys != self._keys:
+            self._check_keys(keys)
+        if self.mode == "orm":
+            t0 = time.perf_counter()
+            self.session.add(self.model(**row))
+            self.seconds += time.perf_counter() - t0
+            self.written += 1
+            return
+        if self._renames:
+            row = {self._renames.get(k, k): v for k, v in row.items()}
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        t0 = time.perf_counter()
+        if self.mode == "copy":
+            self._copy(self._rows)
+        else:
+            self.session.execute(self.table.insert(), self._rows)
+        self.seconds += time.perf_counter() - t0
+        self.written += len(self._rows)
+        self._rows = []
+
+    def close(self):
+        t0 = time.perf_counter()
+        if self.mode == "orm":
+            self.session.flush()
+            self.seconds += time.perf_counter() - t0
+        else:
+            self.flush()
+
+    def discard(self):
+        self._rows = []
+
+    def _copy(self, rows: list[dict]):
+        # COPY skips Python-side column defaults, so fill scalar ones in here
+        defaults = {
+            c.name: c.default.arg for c in self.table.columns
+            if c.default is not None and c.default.is_scalar and c.name not in rows[0]
+        }
+        columns = list(rows[0]) + list(defaults)
+        # Text format: \N is NULL, so empty strings stay empty strings
+        buf = io.StringIO()
+        for row in rows:
+            buf.write("\t".join(self._copy_value(row[c] if c in row else defaults[c])
+                                for c in columns))
+            buf.write("\n")
+        buf.seek(0)
+        cols = ", ".join(f'"{c}"' for c in columns)
+        dbapi_conn = self.session.connection().connection.dbapi_connection
+        with dbapi_conn.cursor() as cur:
+            cur.copy_expert(f'COPY "{self.table.name}" ({cols}) FROM STDIN', buf)
+        # COPY bypasses session events; rebuild rollups and search entries at commit
+        rollups.mark_stale(self.session, self.table.name)
+        search.mark_stale(self.session, self.table.name)
+
+    _COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+    @classmethod
+    def _copy_value(cls, v) -> str:
+        if v is None:
+            return "\\N"
+        if isinstance(v, enum.Enum):
+            v = v.name
+        elif isinstance(v, (date, datetime)):
+            v = v.isoformat()
+        return str(v).translate(cls._COPY_ESCAPES)
+
+
 class BaseImporter:
     """Common import functionality. Subclass and implement `run()`."""
 
@@ -64,6 +617,12 @@ class BaseImporter:
         self.session = session
         self.batch_id = batch_id or self._generate_batch_id()
         self.result = ImportResult(self.source_name)
+        self.identity = IdentityCache(session, self.result)
+        self.fingerprints = FingerprintStore(session, self.source_name, self.batch_id)
+        self._writers: list[BulkWriter] = []
+        # Set by a background job (see backend.importers.background)
+        self.progress: Optional[ImportProgress] = None
+        self.cancel_event = None
 
     def run(self) -> ImportResult:
         """Override in subclass. Should call self.result.finish() when done."""
@@ -71,69 +630,53 @@ class BaseImporter:
 
     # ── Utilities ────────────────────────────────────────────────────────
 
+    def report_progress(self, step: Optional[str] = None, rows: int = 0,
+                        step_done: bool = False) -> None:
+        """Advance ``self.progress`` (if a job is watching) and honour cancel."""
+        if self.progress is not None:
+            if step is not None:
+                self.progress.step = step
+            self.progress.rows_done += rows
+            if step_done:
+                self.progress.steps_done += 1
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        """Raise ImportCancelled if the job running this import was cancelled."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ImportCancelled(f"{self.source_name} import cancelled")
+
     def _generate_batch_id(self) -> str:
         ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         return f"{self.source_name}_{ts}"
 
+    # The clean_* helpers delegate to backend.importers.coerce, which checks
+    # native openpyxl types first; results are unchanged.
+
     @staticmethod
     def clean_currency(value: Any) -> Decimal:
         """Parse a currency string like '$1,234.56' into a Decimal."""
-        if value is None or value == "":
-            return Decimal("0")
-        if isinstance(value, (int, float)):
-            return Decimal(str(value))
-        if isinstance(value, Decimal):
-            return value
-        s = str(value).strip().replace("$", "").replace(",", "").replace(" ", "")
-        if s == "" or s == "-":
-            return Decimal("0")
-        try:
-            return Decimal(s)
-        except InvalidOperation:
-            return Decimal("0")
+        return to_currency(value)
 
     @staticmethod
     def clean_string(value: Any, max_length: int = 300) -> Optional[str]:
         """Clean and truncate a string value."""
-        if value is None:
-            return None
-        s = str(value).strip()
-        if s == "" or s.lower() == "none":
-            return None
-        return s[:max_length]
+        return to_string(value, max_length)
 
     @staticmethod
     def clean_int(value: Any) -> int:
         """Parse a value into an integer, defaulting to 0."""
-        if value is None or value == "":
-            return 0
-        try:
-            return int(float(str(value).strip().replace(",", "")))
-        except (ValueError, TypeError):
-            return 0
+        return to_int(value)
 
     @staticmethod
     def clean_date(value: Any) -> Optional[datetime]:
         """Attempt to parse various date formats."""
-        if value is None or value == "":
-            return None
-        if isinstance(value, datetime):
-            return value.date() if hasattr(value, "date") else value
-        s = str(value).strip()
-        for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%Y-%m-%dT%H:%M:%S"):
-            try:
-                return datetime.strptime(s, fmt).date()
-            except ValueError:
-                continue
-        return None
+        return to_date(value)
 
     @staticmethod
     def clean_bool(value: Any) -> bool:
         """Parse yes/no/true/false into boolean."""
-        if value is None:
-            return False
-        s = str(value).strip().lower()
-        return s in ("yes", "true", "1", "y", "x")
+        return to_bool(value)
 
     def log_data_source(self, record_count: int, status: str = "completed"):
         """Record this import run in the data_sources table."""
@@ -163,37 +706,165 @@ class BaseImporter:
 
     def get_or_create_vendor(self, name: str) -> int:
         """Find a vendor by name or create a stub. Returns vendor ID."""
-        from backend.models.core import Vendor
         name_clean = self.clean_string(name)
         if not name_clean:
             return None
-        existing = self.session.query(Vendor).filter(
-            Vendor.name == name_clean
-        ).first()
-        if existing:
-            return existing.id
-        vendor = Vendor(name=name_clean)
-        self.session.add(vendor)
-        self.session.flush()
-        return vendor.id
+        return self.identity.resolve("vendor", {name_clean: {}})[name_clean]
 
     def get_or_create_project(self, code: str, name: str = None,
                                **kwargs) -> int:
         """Find a project by code or create a stub. Returns project ID."""
-        from backend.models.core import Project
         code_clean = self.clean_string(code, 20)
         if not code_clean:
             return None
-        existing = self.session.query(Project).filter(
-            Project.code == code_clean
-        ).first()
-        if existing:
-            return existing.id
-        project = Project(
-            code=code_clean,
-            name=name or code_clean,
-            **kwargs,
-        )
-        self.session.add(project)
-        self.session.flush()
-        return project.id
+        stub = {"name": name or code_clean, **kwargs}
+        return self.identity.resolve("project", {code_clean: stub})[code_clean]
+
+    def bulk_writer(self, model) -> BulkWriter:
+        """Open a batched writer for ``model`` rows (see BulkWriter)."""
+        writer = BulkWriter(self.session, model)
+        self._writers.append(writer)
+        return writer
+
+    def bulk_upsert(self, model, rows: list[dict], keys: tuple, update: tuple,
+                    existing: dict) -> None:
+        """Write ``rows`` as set-based inserts/updates on the natural ``keys``.
+
+        ``existing`` maps the key tuple of every row already in the table to
+        its id. On PostgreSQL one ``INSERT ... ON CONFLICT (keys)`` covers
+        both cases; elsewhere new rows go out as one executemany INSERT and
+        existing ones as one executemany UPDATE by id. Only the ``update``
+        columns are overwritten (none: existing rows are left alone).
+        Rows repeating a key collapse to the last one. Every row must use
+        the same columns.
+        """
+        by_key = {tuple(row[k] for k in keys): row for row in rows}
+        if not by_key:
+            return
+        table = model.__table__
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = pg_insert(table)
+            if update:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(keys),
+                    set_={**{c: stmt.excluded[c] for c in update}, "updated_at": func.now()},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(keys))
+            self.session.execute(stmt, list(by_key.values()))
+            return
+        inserts = [row for key, row in by_key.items() if key not in existing]
+        updates = [{"_id": existing[key], **{c: row[c] for c in update}}
+                   for key, row in by_key.items() if key in existing] if update else []
+        if inserts:
+            self.session.execute(table.insert(), inserts)
+        if updates:
+            self.session.execute(table.update().where(table.c.id == bindparam("_id")), updates)
+
+    def close_writers(self, stats: Optional[TabStats] = None) -> None:
+        """Write out every open BulkWriter, recording totals on ``stats``."""
+        writers, self._writers = self._writers, []
+        for writer in writers:
+            writer.close()
+            if stats is not None:
+                stats.written += writer.written
+                stats.write_seconds += writer.seconds
+                stats.write_mode = writer.mode
+
+    def discard_writers(self) -> None:
+        """Drop buffered rows after a rollback."""
+        for writer in self._writers:
+            writer.discard()
+        self._writers = []
+
+    def upsert_keyed(self, tab: str, model, key: str, fields: dict,
+                     existing_id: Optional[int] = None) -> str:
+        """Insert, update or skip one source row by its content hash.
+
+        ``fields`` are the cleaned column values for ``model``; their hash is
+        compared with the fingerprint stored for ``key`` on the last import.
+        Unchanged rows cost no query at all. ``existing_id`` names a matching
+        record that predates fingerprinting, so it is updated in place.
+        A key repeated within one import is counted as skipped.
+        Returns ``"created"``, ``"updated"``, ``"unchanged"`` or ``"skipped"``.
+        """
+        if self.fingerprints.queued(tab, key):
+            self.result.skipped += 1
+            return "skipped"
+        row_hash = self.fingerprints.digest(fields)
+        status, record_id = self.fingerprints.check(tab, key, row_hash)
+        if status == "unchanged":
+            self.result.unchanged += 1
+            return status
+        record = self.session.get(model, record_id or existing_id) \
+            if (record_id or existing_id) else None
+        if record is not None:
+            for name, value in fields.items():
+                setattr(record, name, value)
+            self.result.updated += 1
+            status = "updated"
+        else:
+            record = model(**fields)
+            self.session.add(record)
+            self.result.created += 1
+            status = "created"
+        self.fingerprints.remember(tab, key, row_hash, record)
+        return status
+
+    def row_changed(self, tab: str, key: str, fields) -> bool:
+        """True if this source row must be written: its hash differs from the
+        one stored for ``key`` on the last import.
+
+        For handlers that write in bulk or update records in place instead
+        of going through ``upsert_keyed``. The new hash is queued here;
+        unchanged rows are counted, and a key repeated within one import is
+        counted as skipped.
+        """
+        if self.fingerprints.queued(tab, key):
+            self.result.skipped += 1
+            return False
+        row_hash = self.fingerprints.digest(fields)
+        status, _ = self.fingerprints.check(tab, key, row_hash)
+        if status == "unchanged":
+            self.result.unchanged += 1
+            return False
+        self.fingerprints.remember(tab, key, row_hash)
+        return True
+
+    def log_row_seen(self, tab: str, row, occurrences: dict) -> bool:
+        """True if this row of an append-only log was imported before.
+
+        Log rows have no natural key, so the key is the row's own hash plus
+        its repeat count (``occurrences`` tracks identical rows within the
+        tab). An edited row therefore reads as a new one. Unseen rows are
+        remembered here and the caller inserts them.
+        """
+        row_hash = self.fingerprints.digest(row)
+        n = occurrences[row_hash] = occurrences.get(row_hash, 0) + 1
+        key = f"{row_hash}#{n}"
+        status, _ = self.fingerprints.check(tab, key, row_hash)
+        if status != "new":  # even on refresh: re-inserting would duplicate
+            self.result.unchanged += 1
+            return True
+        self.fingerprints.remember(tab, key, row_hash)
+        return False
+
+    def prefetch_vendors(self, names) -> None:
+        """Resolve a batch of vendor names up front (one flush for new stubs)."""
+        stubs = {}
+        for name in names:
+            name_clean = self.clean_string(name)
+            if name_clean:
+                stubs[name_clean] = {}
+        if stubs:
+            self.identity.resolve("vendor", stubs)
+
+    def prefetch_projects(self, codes: dict) -> None:
+        """Resolve a batch of ``{code: name}`` projects up front."""
+        stubs = {}
+        for code, name in codes.items():
+            code_clean = self.clean_string(code, 20)
+            if code_clean:
+                stubs[code_clean] = {"name": name or code_clean}
+        if stubs:
+            self.identity.resolve("project", stubs)
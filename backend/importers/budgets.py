@@ -2,11 +2,15 @@
 
 Reads files like: 1363_walnut_grove_tract_1_christiana_tn_37037_budget_02112026.csv
 Creates: Project → CostCodes → SOVLines → PayApps + PayAppLines
+
+A directory of budget CSVs can be imported concurrently: each file runs in a
+pool worker with its own session and transaction (BudgetCSVBatchImporter).
 """
 
 import csv
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
@@ -14,9 +18,10 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
-from backend.importers.base import BaseImporter, ImportResult
+from backend.importers.base import BaseImporter, ImportCancelled, ImportResult
 from backend.models.core import (
-    CostCode, PayApp, PayAppLine, Project, ProjectStatus, ProjectType, SOVLine,
+    CostCode, PayApp, PayAppLine, PayAppStatus, Project, ProjectStatus,
+    ProjectType, SOVLine,
 )
 
 
@@ -79,6 +84,25 @@ PROJECT_MAP = {
 }
 
 
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    from backend.core.database import engine
+    engine.dispose(close=False)
+
+
+def _import_file_worker(file_path: str, batch_id: str) -> ImportResult:
+    """Import one budget CSV in a pool worker with its own session."""
+    from backend.core.database import SessionLocal
+    session = SessionLocal()
+    try:
+        importer = BudgetCSVImporter(session, file_path, batch_id=batch_id)
+        # Files for the same project may run concurrently; commit stubs apart
+        importer.identity.isolated = True
+        return importer.run()
+    finally:
+        session.close()
+
+
 class BudgetCSVImporter(BaseImporter):
     """Imports a single construction loan budget CSV into the database."""
 
@@ -132,23 +156,24 @@ class BudgetCSVImporter(BaseImporter):
         meta = self._identify_project()
 
         # ── Create or find project ───────────────────────────────────────
-        project = self.session.query(Project).filter(
-            Project.code == meta["code"]
-        ).first()
-
-        if not project:
-            project = Project(
-                code=meta["code"],
-                name=meta["name"],
-                status=ProjectStatus.active,
-                project_type=meta["type"],
-                address=meta["address"],
-                city=meta["city"],
-                state=meta["state"],
-                zip_code=meta["zip"],
-            )
-            self.session.add(project)
-            self.session.flush()
+        project_id = self.get_or_create_project(
+            meta["code"], meta["name"],
+            status=ProjectStatus.active,
+            project_type=meta["type"],
+            address=meta["address"],
+            city=meta["city"],
+            state=meta["state"],
+            zip_code=meta["zip"],
+        )
+        project = self.session.get(Project, project_id)
+
+        # Existing rows for this project, loaded once: natural key → id
+        cost_codes = {(project.id, code): id_ for code, id_ in self.session.query(
+            CostCode.code, CostCode.id).filter(CostCode.project_id == project.id)}
+        sov_lines = {(project.id, num): id_ for num, id_ in self.session.query(
+            SOVLine.line_number, SOVLine.id).filter(SOVLine.project_id == project.id)}
+        pay_apps = {(project.id, num): id_ for num, id_ in self.session.query(
+            PayApp.pay_app_number, PayApp.id).filter(PayApp.project_id == project.id)}
 
         # ── Read CSV ─────────────────────────────────────────────────────
         rows = []
@@ -174,10 +199,12 @@ class BudgetCSVImporter(BaseImporter):
             project.budget_total = self.clean_currency(totals_row[2])
             if approved_idx >= 0:
                 project.contract_amount = self.clean_currency(totals_row[approved_idx])
-            self.session.flush()
 
-        # ── Create cost codes for each budget line item ──────────────────
+        # ── Cost codes for each budget line item ─────────────────────────
         sort_order = 0
+        budget_lines = []
+        cost_code_rows = []
+        seen = set()
         for row in line_items:
             line_num = self.clean_int(row[0])
             description = self.clean_string(row[1])
@@ -194,37 +221,30 @@ class BudgetCSVImporter(BaseImporter):
             sort_order += 1
             code_str = f"{line_num:03d}"
 
-            # Check for existing cost code
-            existing_cc = self.session.query(CostCode).filter(
-                CostCode.project_id == project.id,
-                CostCode.code == code_str,
-            ).first()
-
-            if existing_cc:
-                existing_cc.budget_amount = budget_amount
-                existing_cc.description = description
+            if (project.id, code_str) in cost_codes or code_str in seen:
                 self.result.updated += 1
-                cost_code = existing_cc
             else:
-                cost_code = CostCode(
-                    project_id=project.id,
-                    code=code_str,
-                    description=description,
-                    budget_amount=budget_amount,
-                    category=self._categorize_cost_code(description),
-                    sort_order=sort_order,
-                )
-                self.session.add(cost_code)
                 self.result.created += 1
-
-            self.session.flush()
-
-            # ── Create SOV line ──────────────────────────────────────────
-            existing_sov = self.session.query(SOVLine).filter(
-                SOVLine.project_id == project.id,
-                SOVLine.line_number == line_num,
-            ).first()
-
+            seen.add(code_str)
+            cost_code_rows.append(dict(
+                project_id=project.id,
+                code=code_str,
+                description=description,
+                budget_amount=budget_amount,
+                category=self._categorize_cost_code(description),
+                sort_order=sort_order,
+            ))
+            budget_lines.append((row, line_num, description, budget_amount, code_str))
+
+        self.bulk_upsert(CostCode, cost_code_rows, ("project_id", "code"),
+                         ("description", "budget_amount"), cost_codes)
+        # Ids of the cost codes just inserted, for the SOV lines below
+        code_ids = dict(self.session.query(CostCode.code, CostCode.id).filter(
+            CostCode.project_id == project.id))
+
+        # ── SOV line per budget line item ────────────────────────────────
+        sov_rows = []
+        for row, line_num, description, budget_amount, code_str in budget_lines:
             # Calculate totals from draw columns
             total_drawn = Decimal("0")
             for di in draw_cols:
@@ -236,37 +256,25 @@ class BudgetCSVImporter(BaseImporter):
 
             pct = (approved_val / budget_amount * 100) if budget_amount > 0 else Decimal("0")
 
-            if not existing_sov:
-                sov = SOVLine(
-                    project_id=project.id,
-                    cost_code_id=cost_code.id,
-                    line_number=line_num,
-                    description=description,
-                    scheduled_value=budget_amount,
-                    total_completed=approved_val,
-                    percent_complete=min(pct, Decimal("100")),
-                    balance_to_finish=balance_val,
-                )
-                self.session.add(sov)
-            else:
-                existing_sov.scheduled_value = budget_amount
-                existing_sov.total_completed = approved_val
-                existing_sov.percent_complete = min(pct, Decimal("100"))
-                existing_sov.balance_to_finish = balance_val
-
-            # ── Create individual draw records as PayApps ────────────────
-            for draw_idx, col_idx in enumerate(draw_cols, start=1):
-                if col_idx >= len(row):
-                    continue
-                draw_amount = self.clean_currency(row[col_idx])
-                if draw_amount == 0:
-                    continue
-
-                # We create PayAppLines; the PayApp (draw) itself is
-                # created once per draw number at the project level.
-                # This is handled in a second pass below.
+            sov_rows.append(dict(
+                project_id=project.id,
+                cost_code_id=code_ids.get(code_str),
+                line_number=line_num,
+                description=description,
+                scheduled_value=budget_amount,
+                total_completed=approved_val,
+                percent_complete=min(pct, Decimal("100")),
+                balance_to_finish=balance_val,
+            ))
+
+        self.bulk_upsert(SOVLine, sov_rows, ("project_id", "line_number"),
+                         ("scheduled_value", "total_completed",
+                          "percent_complete", "balance_to_finish"), sov_lines)
 
         # ── Create PayApps (draws) at the project level ──────────────────
+        # Individual draw amounts per line stay on the CSV; a PayApp (draw)
+        # is created once per draw number from the totals row.
+        pay_app_rows = []
         if totals_row:
             for draw_idx, col_idx in enumerate(draw_cols, start=1):
                 if col_idx >= len(totals_row):
@@ -275,21 +283,18 @@ class BudgetCSVImporter(BaseImporter):
                 if draw_total == 0:
                     continue
 
-                existing_pa = self.session.query(PayApp).filter(
-                    PayApp.project_id == project.id,
-                    PayApp.pay_app_number == draw_idx,
-                ).first()
-
-                if not existing_pa:
-                    pa = PayApp(
-                        project_id=project.id,
-                        pay_app_number=draw_idx,
-                        amount_requested=draw_total,
-                        amount_approved=draw_total,
-                        net_payment=draw_total,
-                        status="paid",
-                    )
-                    self.session.add(pa)
+                pay_app_rows.append(dict(
+                    project_id=project.id,
+                    pay_app_number=draw_idx,
+                    amount_requested=draw_total,
+                    amount_approved=draw_total,
+                    net_payment=draw_total,
+                    status=PayAppStatus.paid,
+                ))
+
+        # Existing draws are left as they are (no update columns)
+        self.bulk_upsert(PayApp, pay_app_rows, ("project_id", "pay_app_number"),
+                         (), pay_apps)
 
         self.session.commit()
         self.log_data_source(self.result.total_processed)
@@ -330,32 +335,68 @@ class BudgetCSVImporter(BaseImporter):
 
 
 class BudgetCSVBatchImporter(BaseImporter):
-    """Imports all budget CSV files from a directory."""
+    """Imports all budget CSV files from a directory.
+
+    Each file is its own transaction: a bad file is rolled back and recorded
+    as an error without affecting the others. With ``workers`` > 1 files are
+    imported concurrently in a process pool, one session per file.
+    """
 
     source_name = "budget_csv_batch"
 
     def __init__(self, session: Session, directory: str,
-                 batch_id: Optional[str] = None):
+                 batch_id: Optional[str] = None, workers: Optional[int] = None):
         super().__init__(session, batch_id)
         self.directory = directory
+        if session.get_bind().dialect.name == "sqlite":
+            workers = 1  # SQLite serializes writers; a pool would only contend
+        self.workers = workers or os.cpu_count() or 1
 
     def run(self) -> ImportResult:
         csv_files = sorted(
             f for f in os.listdir(self.directory)
             if f.endswith(".csv") and "budget" in f.lower()
         )
-
-        for fname in csv_files:
-            fpath = os.path.join(self.directory, fname)
-            importer = BudgetCSVImporter(
-                self.session, fpath, batch_id=self.batch_id
-            )
-            sub_result = importer.run()
-            self.result.created += sub_result.created
-            self.result.updated += sub_result.updated
-            self.result.skipped += sub_result.skipped
-            self.result.errors.extend(sub_result.errors)
-            print(sub_result.summary())
+        paths = [os.path.join(self.directory, fname) for fname in csv_files]
+        if self.progress is not None:
+            self.progress.steps_total = len(paths)
+
+        if self.workers <= 1 or len(paths) <= 1:
+            for fpath in paths:
+                self.report_progress(os.path.basename(fpath))
+                importer = BudgetCSVImporter(
+                    self.session, fpath, batch_id=self.batch_id
+                )
+                try:
+                    sub_result = importer.run()
+                except Exception as e:
+                    self.session.rollback()
+                    self.result.errors.append(f"{os.path.basename(fpath)}: {e}")
+                    continue
+                self.result.merge(sub_result)
+                print(sub_result.summary())
+                self.report_progress(rows=sub_result.total_processed, step_done=True)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(paths)),
+                                     initializer=_init_worker) as pool:
+                futures = {pool.submit(_import_file_worker, fpath, self.batch_id): fpath
+                           for fpath in paths}
+                try:
+                    for future in as_completed(futures):
+                        fname = os.path.basename(futures[future])
+                        try:
+                            sub_result = future.result()
+                        except Exception as e:
+                            self.result.errors.append(f"{fname}: {e}")
+                            continue
+                        self.result.merge(sub_result)
+                        print(sub_result.summary())
+                        self.report_progress(fname, rows=sub_result.total_processed,
+                                             step_done=True)
+                except ImportCancelled:
+                    # Files already running finish; queued ones never start
+                    pool.shutdown(cancel_futures=True)
+                    raise
 
         self.result.finish()
         return self.result
@@ -0,0 +1,210 @@
+"""Cell coercion for importers: fast scalar converters and per-tab row coercers.
+
+The ``to_*`` functions give exactly the results of the ``BaseImporter.clean_*``
+helpers (which delegate to them) but check for the native openpyxl types
+first — ``datetime``, ``float``, ``int`` — before falling back to string
+parsing.
+
+``RowCoercer`` goes one step further for hot tabs: given ``{column: kind}``
+and a sample of rows it picks, once per tab, a converter specialised to the
+type each column actually holds and the date format its strings use, then
+converts a whole row per call.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable, Optional
+
+
+# Tried in order; they are mutually exclusive, so order never changes a result
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%Y-%m-%dT%H:%M:%S")
+
+_ZERO = Decimal("0")
+_INT_EXACT = 2 ** 53  # ints beyond this don't survive the float round trip
+
+
+# ── Scalar converters (same results as BaseImporter.clean_*) ────────────
+
+def to_currency(value: Any) -> Decimal:
+    t = type(value)
+    if t is float or t is int:
+        return Decimal(str(value))
+    if t is str:
+        if value == "":
+            return _ZERO
+        try:
+            return Decimal(value)  # plain numbers need no scrubbing
+        except InvalidOperation:
+            pass
+    elif value is None:
+        return _ZERO
+    elif isinstance(value, Decimal):
+        return value
+    elif isinstance(value, (int, float)):
+        return Decimal(str(value))
+    s = str(value).strip().replace("$", "").replace(",", "").replace(" ", "")
+    if s == "" or s == "-":
+        return _ZERO
+    try:
+        return Decimal(s)
+    except InvalidOperation:
+        return _ZERO
+
+
+def to_string(value: Any, max_length: int = 300) -> Optional[str]:
+    if value is None:
+        return None
+    s = (value if type(value) is str else str(value)).strip()
+    if s == "" or s.lower() == "none":
+        return None
+    return s[:max_length]
+
+
+def to_int(value: Any) -> int:
+    t = type(value)
+    if t is int and -_INT_EXACT < value < _INT_EXACT:
+        return value
+    if t is float:
+        try:
+            return int(value)
+        except ValueError:  # nan
+            return 0
+    if value is None or value == "":
+        return 0
+    try:
+        return int(float(str(value).strip().replace(",", "")))
+    except (ValueError, TypeError):
+        return 0
+
+
+def parse_date(s: str, first: Optional[str] = None) -> Optional[date]:
+    """Parse a stripped date string, trying ``first`` before DATE_FORMATS."""
+    if first is not None:
+        try:
+            return datetime.strptime(s, first).date()
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        if fmt == first:
+            continue
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def to_date(value: Any, first: Optional[str] = None) -> Optional[date]:
+    if type(value) is datetime:
+        return value.date()
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    return parse_date(str(value).strip(), first)
+
+
+def to_bool(value: Any) -> bool:
+    if value is None:
+        return False
+    return str(value).strip().lower() in ("yes", "true", "1", "y", "x")
+
+
+def infer_date_format(values: Iterable[Any]) -> Optional[str]:
+    """The format that parses the most sampled date strings, or None."""
+    hits = dict.fromkeys(DATE_FORMATS, 0)
+    for v in values:
+        if type(v) is not str or not v.strip():
+            continue
+        s = v.strip()
+        for fmt in DATE_FORMATS:
+            try:
+                datetime.strptime(s, fmt)
+            except ValueError:
+                continue
+            hits[fmt] += 1
+            break
+    best = max(hits, key=hits.get)
+    return best if hits[best] else None
+
+
+# ── Per-tab row coercion ─────────────────────────────────────────────────
+
+def _is_formula(v) -> bool:
+    return type(v) is str and v.startswith("=")
+
+
+def _compile(kind, values: list):
+    """Build ``f(cell)`` for one column from its sampled (non-None) values.
+
+    ``kind`` is "currency", "int", "date", "bool", "string" or
+    ("string", max_length). Formula strings read as None, like ``_val``.
+    """
+    types = {type(v) for v in values}
+    if isinstance(kind, tuple):
+        kind, max_length = kind
+    else:
+        max_length = 300
+
+    if kind == "string":
+        if types <= {str}:
+            def conv(v):
+                if type(v) is str:
+                    if v.startswith("="):
+                        return None
+                    s = v.strip()
+                    if s == "" or s.lower() == "none":
+                        return None
+                    return s[:max_length]
+                return to_string(v, max_length)
+            return conv
+        return lambda v: None if _is_formula(v) else to_string(v, max_length)
+
+    if kind == "currency":
+        if types <= {float, int}:
+            def conv(v):
+                if type(v) is float:
+                    return Decimal(str(v))
+                return to_currency(None if _is_formula(v) else v)
+            return conv
+        return lambda v: to_currency(None if _is_formula(v) else v)
+
+    if kind == "int":
+        return lambda v: to_int(None if _is_formula(v) else v)
+
+    if kind == "date":
+        if types <= {datetime}:
+            def conv(v):
+                if type(v) is datetime:
+                    return v.date()
+                return to_date(None if _is_formula(v) else v)
+            return conv
+        fmt = infer_date_format(values)
+        return lambda v: to_date(None if _is_formula(v) else v, fmt)
+
+    if kind == "bool":
+        return lambda v: to_bool(None if _is_formula(v) else v)
+
+    raise ValueError(f"Unknown column kind: {kind!r}")
+
+
+class RowCoercer:
+    """Convert the chosen columns of every row of a tab in one call.
+
+    ``columns`` maps column index → kind (see ``_compile``); the result of
+    ``coerce(row)`` lists the converted values in that order, each equal to
+    ``clean_<kind>(_val(row, idx))``. Converters are specialised from
+    ``sample`` — pass the first chunk of data rows.
+    """
+
+    def __init__(self, columns: dict, sample: Iterable[tuple] = ()):
+        sample = list(sample)
+        self._compiled = []
+        for idx, kind in columns.items():
+            values = [row[idx] for row in sample
+                      if row is not None and idx < len(row) and row[idx] is not None]
+            self._compiled.append((idx, _compile(kind, values)))
+
+    def __call__(self, row) -> list:
+        n = len(row) if row is not None else 0
+        return [conv(row[idx] if idx < n else None) for idx, conv in self._compiled]
@@ -41,6 +41,11 @@ class LeadsImporter(BaseImporter):
         header = [str(h).strip() if h else "" for h in rows[1]]
         col_map = {name: idx for idx, name in enumerate(header)}
 
+        # Leads imported before fingerprinting, matched by title + contact
+        self._existing = {
+            (title, contact): lead_id for lead_id, title, contact in
+            self.session.query(Lead.id, Lead.opportunity_title, Lead.client_contact)
+        }
         for row_data in rows[2:]:
             try:
                 self._import_lead(row_data, col_map)
@@ -48,6 +53,7 @@ class LeadsImporter(BaseImporter):
                 title = row_data[col_map.get("Opportunity Title", 2)] if len(row_data) > 2 else "?"
                 self.result.errors.append(f"Row '{title}': {e}")
 
+        self.fingerprints.flush()
         self.session.commit()
         self.log_data_source(self.result.total_processed)
         self.session.commit()
@@ -61,16 +67,8 @@ class LeadsImporter(BaseImporter):
             self.result.skipped += 1
             return
 
-        # Dedup by opportunity title + client contact
+        # Keyed by opportunity title + client contact
         contact = self.clean_string(row[col.get("Client Contact", 4)])
-        existing = self.session.query(Lead).filter(
-            Lead.opportunity_title == title,
-            Lead.client_contact == contact,
-        ).first()
-
-        if existing:
-            self.result.skipped += 1
-            return
 
         # Parse estimated revenue (handles "$0.00" format)
         est_rev_str = self.clean_string(row[col.get("Estimated Revenue", 22)])
@@ -79,7 +77,7 @@ class LeadsImporter(BaseImporter):
         # Map lead status
         raw_status = self.clean_string(row[col.get("Lead Status", 5)])
 
-        lead = Lead(
+        fields = dict(
             opportunity_title=title,
             client_contact=contact,
             email=self.clean_string(row[col.get("Email", 1)]),
@@ -110,8 +108,8 @@ class LeadsImporter(BaseImporter):
             related_job=self.clean_string(row[col.get("Related Job", 36)]),
             notes=self.clean_string(row[col.get("Notes", 28)], 2000),
         )
-        self.session.add(lead)
-        self.result.created += 1
+        self.upsert_keyed("Leads", Lead, f"{title}\x1f{contact or ''}", fields,
+                          self._existing.get((title, contact)))
 
 
 class ProposalsImporter(BaseImporter):
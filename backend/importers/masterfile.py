@@ -4,19 +4,28 @@ Column mappings verified against actual SECG_Ultimate_Masterfile.xlsx
 uploaded 2026-02-19.
 """
 
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from graphlib import TopologicalSorter
+from itertools import chain, islice
+from typing import Iterator, Optional
 import re
 
 import openpyxl
+from sqlalchemy import bindparam
 from sqlalchemy.orm import Session
 
-from backend.importers.base import BaseImporter, ImportResult
+from backend.core import rollups
+from backend.importers.base import (
+    BaseImporter, CheckpointStore, FingerprintStore, ImportCancelled, ImportResult,
+)
+from backend.importers.coerce import RowCoercer
 from backend.models.core import (
     ChangeOrder, ChangeOrderStatus, CostCode, CostEventSource,
     CostEventType, Employee, Invoice, InvoiceStatus, Payment, PayApp,
-    PayAppLine, Project, ProjectStatus, ProjectType, Quote, SOVLine, Vendor,
+    PayAppLine, PayAppStatus, Project, ProjectStatus, ProjectType, Quote, SOVLine, Vendor,
 )
 from backend.models.extended import CostEvent
 from backend.models.extended import (
@@ -32,76 +41,387 @@ SKIP_TABS = {
     "PAYMENT WATERFALL", "WEEKLY DIGEST", "CASH POSITION",
 }
 
+# Cost code given to imported costs that carry none of their own (one per project)
+UNCODED = "UNCODED"
+
+# Rows pulled from the read-only worksheet per chunk. Pending ORM objects are
+# flushed at each chunk boundary, so peak memory tracks this, not tab size.
+CHUNK_SIZE = 1000
+
+# Tab name → handler method name.
+TAB_HANDLERS = {
+    "TXN LOG": "_import_txn_log",
+    "DEBT SCHEDULE": "_import_debts",
+    "PROPERTIES": "_import_properties",
+    "PROJECT BUDGETS": "_import_project_budgets",
+    "JOB COSTING": "_import_job_costing",
+    "SOV DRAW BUILDER": "_import_sov",
+    "DRAW TRACKER": "_import_draw_tracker",
+    "EMPLOYEE COSTS": "_import_employee_costs",
+    "PAYROLL": "_import_payroll",
+    "PAYROLL CALENDAR": "_import_payroll_calendar",
+    "DAILY INPUTS": "_import_daily_inputs",
+    "CASH FLOW 13WK": "_import_cash_forecast",
+    "PHASE SYNC": "_import_phase_sync",
+    "DEBT PAYOFF": "_import_debt_payoff",
+    "RECURRING EXP": "_import_recurring_expenses",
+    "MONTHLY PL": "_import_monthly_pl",
+    "MULTIFAMILY PL": "_import_multifamily_pl",
+    "SCENARIO MODEL": "_import_scenarios",
+    "COA": "_import_chart_of_accounts",
+    "DATA LOG": "_import_data_log",
+    "CHANGE ORDERS": "_import_change_orders",
+    "LIEN WAIVERS": "_import_lien_waivers",
+    "VENDOR SCORECARD": "_import_vendor_scorecard",
+    "PROJECT SCHEDULE": "_import_project_schedule",
+    "RETAINAGE": "_import_retainage",
+    "BID PIPELINE": "_import_bid_pipeline",
+    "CREW ALLOCATION": "_import_crew_allocation",
+    "AR AGING": "_import_ar_aging",
+    "AP AGING": "_import_ap_aging",
+    "LOWES PRO": "_import_lowes_pro",
+    "VICTORY CROSSINGS": "_import_victory_crossings",
+}
+
+# Stage 1: tabs that create the projects, vendors and employees other tabs
+# reference. They run in-process, in dependency order, before anything else.
+FOUNDATION_TABS = ("PROJECT BUDGETS", "VENDOR SCORECARD", "EMPLOYEE COSTS", "PAYROLL")
+
+# Tab → tabs that must finish before it starts. Every non-foundation tab also
+# waits for all of FOUNDATION_TABS; tabs not listed are otherwise independent.
+TAB_DEPENDENCIES = {
+    "PAYROLL": ("EMPLOYEE COSTS",),               # updates employees by name
+    "DEBT PAYOFF": ("DEBT SCHEDULE",),             # annotates existing debts
+    "CREW ALLOCATION": ("EMPLOYEE COSTS", "PAYROLL"),
+    "AP AGING": ("VENDOR SCORECARD",),             # scorecard overwrites notes
+    "LIEN WAIVERS": ("PROJECT BUDGETS",),          # project lookup, no stubs
+    "RETAINAGE": ("PROJECT BUDGETS",),
+}
+
+
+def tab_graph(tabs) -> dict[str, set[str]]:
+    """Dependency graph (tab → prerequisite tabs) restricted to ``tabs``."""
+    present = set(tabs)
+    foundation = {t for t in tabs if t in FOUNDATION_TABS}
+    graph = {}
+    for tab in tabs:
+        deps = set(TAB_DEPENDENCIES.get(tab, ())) & present
+        if tab not in foundation:
+            deps |= foundation
+        graph[tab] = deps
+    return graph
+
+
+# Cancel event of the job that started this worker pool (see _init_worker)
+_cancel_event = None
+
+
+def _init_worker(cancel_event=None):
+    # Forked workers must not reuse the parent's pooled connections
+    from backend.core.database import engine
+    engine.dispose(close=False)
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _import_tab_worker(file_path: str, tab_name: str, batch_id: str,
+                       chunk_size: int, full: bool = False,
+                       checksum: Optional[str] = None,
+                       tenant_id: Optional[int] = None) -> ImportResult:
+    """Import one tab in a pool worker with its own session and workbook."""
+    from backend.core.database import SessionLocal
+    session = SessionLocal()
+    try:
+        importer = MasterfileImporter(session, file_path, batch_id,
+                                      chunk_size=chunk_size, workers=1, full=full,
+                                      checkpoints=checksum is not None, tenant_id=tenant_id)
+        importer.checksum = checksum
+        # Other workers create stubs concurrently; commit them independently
+        importer.identity.isolated = True
+        importer.cancel_event = _cancel_event
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            importer._import_tab(wb, tab_name)
+        finally:
+            wb.close()
+        return importer.result
+    finally:
+        session.close()
+
 
 class MasterfileImporter(BaseImporter):
     source_name = "masterfile"
     source_type = "masterfile_import"
 
-    def __init__(self, session: Session, file_path: str, batch_id: Optional[str] = None):
+    def __init__(self, session: Session, file_path: str, batch_id: Optional[str] = None,
+                 chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None,
+                 full: bool = False, checkpoints: bool = False,
+                 tenant_id: Optional[int] = None):
         super().__init__(session, batch_id)
         self.file_path = file_path
+        # Tenant of the imported cost events (and of the rollups they move):
+        # the given one, else the session's (X-Tenant-Id), else the default
+        self.tenant_id = tenant_id or rollups.session_tenant(session)
+        session.info[rollups.TENANT] = self.tenant_id
+        self.chunk_size = chunk_size
+        # full=True re-applies every row even if its fingerprint is unchanged
+        self.full = full
+        self.fingerprints.refresh = full
+        # checkpoints=True records each finished tab under the batch id, and
+        # skips tabs this batch already finished on the same file (resume)
+        self.checkpoints = CheckpointStore(session, self.batch_id) if checkpoints else None
+        self.checksum: Optional[str] = None
+        if session.get_bind().dialect.name == "sqlite":
+            workers = 1  # SQLite serializes writers; a pool would only contend
+        self.workers = workers or os.cpu_count() or 1
+        self._uncoded: dict[int, int] = {}   # project id → its UNCODED cost code id
 
     def run(self) -> ImportResult:
+        if self.checkpoints is not None and self.checksum is None:
+            self.checksum = CheckpointStore.checksum(self.file_path)
         wb = openpyxl.load_workbook(self.file_path, read_only=True)
-        tab_handlers = {
-            "TXN LOG": self._import_txn_log,
-            "DEBT SCHEDULE": self._import_debts,
-            "PROPERTIES": self._import_properties,
-            "PROJECT BUDGETS": self._import_project_budgets,
-            "JOB COSTING": self._import_job_costing,
-            "SOV DRAW BUILDER": self._import_sov,
-            "DRAW TRACKER": self._import_draw_tracker,
-            "EMPLOYEE COSTS": self._import_employee_costs,
-            "PAYROLL": self._import_payroll,
-            "PAYROLL CALENDAR": self._import_payroll_calendar,
-            "DAILY INPUTS": self._import_daily_inputs,
-            "CASH FLOW 13WK": self._import_cash_forecast,
-            "PHASE SYNC": self._import_phase_sync,
-            "DEBT PAYOFF": self._import_debt_payoff,
-            "RECURRING EXP": self._import_recurring_expenses,
-            "MONTHLY PL": self._import_monthly_pl,
-            "MULTIFAMILY PL": self._import_multifamily_pl,
-            "SCENARIO MODEL": self._import_scenarios,
-            "COA": self._import_chart_of_accounts,
-            "DATA LOG": self._import_data_log,
-            "CHANGE ORDERS": self._import_change_orders,
-            "LIEN WAIVERS": self._import_lien_waivers,
-            "VENDOR SCORECARD": self._import_vendor_scorecard,
-            "PROJECT SCHEDULE": self._import_project_schedule,
-            "RETAINAGE": self._import_retainage,
-            "BID PIPELINE": self._import_bid_pipeline,
-            "CREW ALLOCATION": self._import_crew_allocation,
-            "AR AGING": self._import_ar_aging,
-            "AP AGING": self._import_ap_aging,
-            "LOWES PRO": self._import_lowes_pro,
-            "VICTORY CROSSINGS": self._import_victory_crossings,
-        }
+        tabs = []
         for tab_name in wb.sheetnames:
             if tab_name in SKIP_TABS:
                 print(f"  skip {tab_name} (computed)")
-                continue
-            handler = tab_handlers.get(tab_name)
-            if handler:
-                print(f"  importing {tab_name}...")
-                try:
-                    ws = wb[tab_name]
-                    rows = list(ws.iter_rows(values_only=True))
-                    handler(rows)
-                    self.session.commit()
-                    print(f"    ok {tab_name}")
-                except Exception as e:
-                    self.result.errors.append(f"Tab '{tab_name}': {e}")
-                    self.session.rollback()
-                    print(f"    FAIL {tab_name}: {e}")
+            elif tab_name in TAB_HANDLERS:
+                tabs.append(tab_name)
             else:
                 print(f"  no handler: {tab_name}")
+        if self.progress is not None:
+            self.progress.steps_total = len(tabs)
+            self.progress.rows_total = sum(wb[t].max_row or 0 for t in tabs)
+
+        graph = tab_graph(tabs)
+        stage_one = [t for t in TopologicalSorter(graph).static_order()
+                     if t in FOUNDATION_TABS]
+        for tab_name in stage_one:
+            self._import_tab(wb, tab_name, self._must_reimport(tab_name))
         wb.close()
+
+        done = set(stage_one)
+        self._run_stage_two({t: deps - done for t, deps in graph.items() if t not in done})
+
         self.log_data_source(self.result.total_processed)
         self.session.commit()
         self.result.finish()
         return self.result
 
+    def _run_stage_two(self, graph: dict[str, set[str]]):
+        """Run the remaining tabs, fanning out to a process pool if allowed."""
+        sorter = TopologicalSorter(graph)
+        if self.workers <= 1:
+            wb = openpyxl.load_workbook(self.file_path, read_only=True)
+            try:
+                for tab_name in sorter.static_order():
+                    self._import_tab(wb, tab_name, self._must_reimport(tab_name))
+            finally:
+                wb.close()
+            return
+
+        sorter.prepare()
+        pending = {}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.cancel_event,)) as pool:
+            while sorter.is_active():
+                for tab_name in sorter.get_ready():
+                    print(f"  queued {tab_name}")
+                    future = pool.submit(_import_tab_worker, self.file_path, tab_name,
+                                         self.batch_id, self.chunk_size,
+                                         self._must_reimport(tab_name),
+                                         self.checksum if self.checkpoints else None,
+                                         self.tenant_id)
+                    pending[future] = tab_name
+                if self.progress is not None:
+                    self.progress.step = ", ".join(sorted(pending.values()))
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    tab_name = pending.pop(future)
+                    try:
+                        sub_result = future.result()
+                    except ImportCancelled:
+                        continue
+                    except Exception as e:
+                        self.result.errors.append(f"Tab '{tab_name}': worker failed: {e}")
+                    else:
+                        self.result.merge(sub_result)
+                        rows = sum(stats.rows for stats in sub_result.tabs.values())
+                        self.report_progress(rows=rows, step_done=True)
+                    sorter.done(tab_name)
+                # Workers stop at their next chunk boundary; queued ones at once
+                self.check_cancelled()
+
+    def _must_reimport(self, tab_name: str) -> bool:
+        """True if a prerequisite tab wrote rows and may have overwritten what
+        this tab applied, so this tab's unchanged row hashes can't be trusted."""
+        if self.full:
+            return True
+        for dep in TAB_DEPENDENCIES.get(tab_name, ()):
+            stats = self.result.tabs.get(dep)
+            if stats is not None and not stats.unchanged:
+                return True
+        return False
+
+    def _import_tab(self, wb, tab_name: str, force: bool = False):
+        """Import one tab in its own transaction, recording its TabStats.
+
+        Every row is checked against its fingerprint from the last import as
+        the tab streams, and only new or changed rows are written. A tab
+        that wrote nothing is reported unchanged. ``force`` re-applies every
+        row of this tab. A tab this batch already checkpointed is skipped
+        even when forced.
+        """
+        handler = getattr(self, TAB_HANDLERS[tab_name])
+        self.report_progress(tab_name)
+        print(f"  importing {tab_name}...")
+        stats = self.result.start_tab(tab_name)
+        queries_before = self.result.cache_queries
+        if self.checkpoints is not None:
+            done = self.checkpoints.completed(self.source_name, self.checksum, tab_name)
+            if done is not None:
+                self._skip_tab(stats, done.rows or 0, "done earlier in this batch")
+                return
+        refresh = self.fingerprints.refresh
+        try:
+            written = self.result.created + self.result.updated
+            self.fingerprints.refresh = refresh or force
+            handler(self._stream_rows(wb[tab_name], stats))
+            self.close_writers(stats)
+            stats.unchanged = self.result.created + self.result.updated == written
+            self.fingerprints.flush()
+            self._checkpoint(tab_name, stats.rows)
+            self.session.commit()
+            stats.finish()
+            stats.lookup_queries = self.result.cache_queries - queries_before
+            print(f"    ok {stats.summary()}")
+        except ImportCancelled:
+            stats.finish()
+            self._abort_tab()
+            print(f"    CANCELLED {tab_name}")
+            raise
+        except Exception as e:
+            stats.finish()
+            self.result.errors.append(f"Tab '{tab_name}': {e}")
+            self._abort_tab()
+            print(f"    FAIL {tab_name}: {e}")
+        finally:
+            self.fingerprints.refresh = refresh
+        if self.progress is not None:
+            self.progress.steps_done += 1
+
+    def _skip_tab(self, stats, rows: int, note: Optional[str] = None):
+        """Finish ``stats`` for a tab that needed no work."""
+        stats.rows = rows
+        stats.unchanged = True
+        self.result.unchanged += rows
+        stats.finish()
+        print(f"    ok {stats.summary()}" + (f" ({note})" if note else ""))
+        self.report_progress(rows=rows, step_done=True)
+
+    def _checkpoint(self, tab_name: str, rows: int):
+        if self.checkpoints is not None:
+            self.checkpoints.mark(self.source_name, self.checksum, tab_name, rows=rows)
+
+    def _abort_tab(self):
+        """Roll back the in-flight tab and drop everything buffered for it."""
+        self.session.rollback()
+        self.discard_writers()
+        self.fingerprints.discard()
+        self.identity.reset()
+        self._uncoded.clear()
+
     # helpers
+    def _uncoded_cost_codes(self, project_ids) -> dict[int, int]:
+        """Project id → its UNCODED cost code id, creating missing ones in
+        one statement (ON CONFLICT DO NOTHING on PostgreSQL, so parallel
+        tab workers can't collide)."""
+        missing = {p for p in project_ids if p is not None and p not in self._uncoded}
+        if missing:
+            def known():
+                return dict(self.session.query(CostCode.project_id, CostCode.id).filter(
+                    CostCode.code == UNCODED, CostCode.project_id.in_(missing)))
+            found = known()
+            if missing - found.keys():
+                self.bulk_upsert(CostCode, [
+                    dict(project_id=p, code=UNCODED, description="Uncoded (imported)")
+                    for p in missing - found.keys()
+                ], ("project_id", "code"), (), {})
+                found = known()
+            self._uncoded.update(found)
+        return self._uncoded
+
+    def _cost_event(self, project_id: int, event_date, amount, event_type: CostEventType,
+                    source: CostEventSource, vendor_id=None, *details) -> dict:
+        """A cost_events row; ``details`` (reference, PO, notes, ...) have no
+        column of their own and are folded into the description."""
+        return dict(
+            tenant_id=self.tenant_id, project_id=project_id,
+            cost_code_id=self._uncoded_cost_codes((project_id,))[project_id],
+            event_type=event_type.value, event_date=event_date, amount=amount,
+            description=" | ".join(filter(None, details))[:500] or None,
+            vendor_id=vendor_id, source_type=source.value, status="posted",
+        )
+
+    def _stream_rows(self, ws, stats) -> Iterator[tuple]:
+        """Yield worksheet rows lazily in chunks of ``chunk_size``.
+
+        Only one chunk of raw rows is held at a time; the session is flushed
+        after each chunk so pending ORM objects don't accumulate either.
+        """
+        rows = ws.iter_rows(values_only=True)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            stats.rows += len(chunk)
+            stats.chunks += 1
+            yield from chunk
+            self.session.flush()
+            self.report_progress(rows=len(chunk))
+            del chunk
+
+    @staticmethod
+    def _ids_by_key(rows) -> dict[str, list[int]]:
+        """``(*natural key columns, id)`` rows → ``"a|b"`` → ids in id order,
+        the ``existing`` argument of ``_nth_key``."""
+        ids = {}
+        for *key, id_ in sorted(rows, key=lambda r: r[-1]):
+            ids.setdefault("|".join(map(str, key)), []).append(id_)
+        return ids
+
+    @staticmethod
+    def _nth_key(key: str, occurrences: dict, existing: dict) -> tuple[str, Optional[int]]:
+        """Fingerprint key for a row whose natural ``key`` may repeat in a tab.
+
+        The n-th row with ``key`` becomes ``key#n`` and is matched with the
+        n-th record already stored under ``key`` (from before fingerprints
+        existed), if any. ``occurrences`` counts repeats within the tab.
+        """
+        n = occurrences[key] = occurrences.get(key, 0) + 1
+        ids = existing.get(key, ())
+        return f"{key}#{n}", ids[n - 1] if n <= len(ids) else None
+
+    def _chunks(self, rows):
+        """Group a row iterator into lists of ``chunk_size``."""
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def _data_rows(rows, start, min_rows=None):
+        """Skip ``start`` title/header rows and return an iterator over the rest.
+
+        Yields nothing when the tab has fewer than ``min_rows`` rows in total
+        (defaults to ``start + 1``, i.e. at least one data row).
+        """
+        min_rows = start + 1 if min_rows is None else min_rows
+        head = list(islice(rows, max(start, min_rows)))
+        if len(head) < min_rows:
+            return iter(())
+        return chain(head[start:], rows)
+
     def _val(self, row, idx, default=None):
         if row is None or idx >= len(row) or idx < 0:
             return default
@@ -148,47 +468,58 @@ class MasterfileImporter(BaseImporter):
     #   QBO Category[9] QBO Acct Code[10] Payment Method[11]
     #   User/Employee[12] Buyer[13] PO Number[14] Is MF?[15]
     def _import_txn_log(self, rows):
-        if len(rows) < 2: return
-        for row in rows[1:]:
-            date = self.clean_date(self._val(row, 0))
-            amount = self.clean_currency(self._val(row, 6))
-            if date is None and amount == 0:
-                self.result.skipped += 1
-                continue
-            project_name = self.clean_string(self._val(row, 8))
-            project_id = self.get_or_create_project(project_name[:20], project_name) if project_name else None
-            vendor_name = self.clean_string(self._val(row, 4))
-            vendor_id = self.get_or_create_vendor(vendor_name) if vendor_name else None
-            src_raw = self.clean_string(self._val(row, 1)) or ""
-            src_map = {"ramp": CostEventSource.ramp_import, "qbo": CostEventSource.qbo_sync,
-                       "lowes": CostEventSource.lowes_import, "home depot": CostEventSource.homedepot_import,
-                       "buildertrend": CostEventSource.buildertrend_import}
-            source = CostEventSource.masterfile_import
-            for k, v in src_map.items():
-                if k in src_raw.lower(): source = v; break
-            event = CostEvent(
-                project_id=project_id, vendor_id=vendor_id, date=date, amount=amount,
-                description=self.clean_string(self._val(row, 5), 500),
-                reference_number=self.clean_string(self._val(row, 10)),
-                po_number=self.clean_string(self._val(row, 14)),
-                source=source, source_ref=src_raw, import_batch=self.batch_id,
-                notes=self.clean_string(self._val(row, 9)),
-            )
-            self.session.add(event)
-            self.result.created += 1
-            if self.result.created % 500 == 0: self.session.flush()
+        events = self.bulk_writer(CostEvent)
+        seen = {}
+        coerce = None
+        for chunk in self._chunks(self._data_rows(rows, 1)):
+            if coerce is None:  # column types/date format from the first chunk
+                coerce = RowCoercer({0: "date", 6: "currency", 8: "string", 4: "string",
+                                     1: "string", 5: ("string", 500), 10: "string",
+                                     14: "string", 9: "string"}, chunk)
+            cells = [coerce(row) for row in chunk]
+            # Resolve every project/vendor in the chunk with one batch each
+            projects = {}
+            for c in cells:
+                pn = c[2]
+                if pn: projects[pn[:20]] = pn
+            self.prefetch_projects(projects)
+            self.prefetch_vendors(c[3] for c in cells)
+            self._uncoded_cost_codes(self.identity.lookup("project", self.clean_string(code, 20))
+                                     for code in projects)
+            for row, c in zip(chunk, cells):
+                date, amount, project_name, vendor_name, src_raw, desc, ref, po, notes = c
+                # cost_events needs a date and a project; rows without either can't be stored
+                if date is None or not project_name:
+                    self.result.skipped += 1
+                    continue
+                if self.log_row_seen("TXN LOG", row, seen):
+                    continue
+                project_id = self.get_or_create_project(project_name[:20], project_name)
+                vendor_id = self.get_or_create_vendor(vendor_name) if vendor_name else None
+                src_raw = src_raw or ""
+                src_map = {"ramp": CostEventSource.ramp_import, "qbo": CostEventSource.qbo_sync,
+                           "lowes": CostEventSource.lowes_import, "home depot": CostEventSource.homedepot_import,
+                           "buildertrend": CostEventSource.buildertrend_import}
+                source = CostEventSource.masterfile_import
+                for k, v in src_map.items():
+                    if k in src_raw.lower(): source = v; break
+                events.add(**self._cost_event(
+                    project_id, date, amount,
+                    CostEventType.vendor_bill if vendor_id else CostEventType.other,
+                    source, vendor_id,
+                    desc, ref and f"Ref {ref}", po and f"PO {po}", notes,
+                ))
+                self.result.created += 1
 
     # === DEBT SCHEDULE -> debts (59 rows) ===
     # Row 1 header but data shifted: [0]=Category [1]=Priority [2]=Creditor
     #   [3]=Amount [4]=Detail [5]=Risk [6]=TOTAL(formula) [7]=Status [8]=Notes [9]=SOURCE
     def _import_debts(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        existing = dict(self.session.query(Debt.name, Debt.id).all())
+        for row in self._data_rows(rows, 2):
             creditor = self.clean_string(self._val(row, 2))
             if not creditor: self.result.skipped += 1; continue
             if creditor.startswith("TOTAL") or creditor.startswith("="): self.result.skipped += 1; continue
-            existing = self.session.query(Debt).filter(Debt.name == creditor).first()
-            if existing: self.result.skipped += 1; continue
             category = self.clean_string(self._val(row, 0))
             dt = DebtType.other
             if category:
@@ -197,7 +528,7 @@ class MasterfileImporter(BaseImporter):
                 elif "construction" in cl or "loan" in cl: dt = DebtType.construction_loan
             amount = self.clean_currency(self._val(row, 3))
             status = self.clean_string(self._val(row, 7))
-            debt = Debt(
+            self.upsert_keyed("DEBT SCHEDULE", Debt, creditor, dict(
                 name=creditor, lender=category, debt_type=dt,
                 current_balance=amount, original_balance=amount,
                 is_active=status not in ("SETTLED", "PAID") if status else True,
@@ -206,59 +537,55 @@ class MasterfileImporter(BaseImporter):
                     self.clean_string(self._val(row, 5)),
                     status, self.clean_string(self._val(row, 8)),
                 ])),
-            )
-            self.session.add(debt)
-            self.result.created += 1
+            ), existing.get(creditor))
 
     # === PROPERTIES -> properties (16 rows) ===
     # Row 1 header: Property[0] SqFt[1] Construction Budget[2] Current Debt[3]
     #   Remaining Draw[4] ARV[5] Equity[6](f) $/SqFt[7](f) LTV[8](f)
     #   Exit Strategy[9] Lender[10] Status[11]
     def _import_properties(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        existing = dict(self.session.query(Property.address, Property.id).all())
+        for row in self._data_rows(rows, 2):
             name = self.clean_string(self._val(row, 0))
             if not name or name.startswith("TOTAL"): self.result.skipped += 1; continue
-            existing = self.session.query(Property).filter(Property.address == name).first()
-            if existing: self.result.skipped += 1; continue
             budget = self.clean_currency(self._val(row, 2))
             debt_val = self.clean_currency(self._val(row, 3))
             arv = self.clean_currency(self._val(row, 5))
-            prop = Property(
+            self.upsert_keyed("PROPERTIES", Property, name, dict(
                 address=name, state="TN",
                 purchase_price=budget, current_value=arv, arv=arv,
                 equity=arv - debt_val if arv > 0 and debt_val > 0 else None,
                 ltv=Decimal(str(round(float(debt_val)/float(arv),4))) if arv > 0 else None,
                 exit_strategy=self.clean_string(self._val(row, 9)),
                 notes=f"Lender: {self._val(row, 10) or ''} | SqFt: {self._val(row, 1) or ''} | Status: {self._val(row, 11) or ''}",
-            )
-            self.session.add(prop)
-            self.result.created += 1
+            ), existing.get(name))
 
     # === PROJECT BUDGETS -> projects (13 rows) ===
     # Row 1 header: Project[0] Total Budget[1] Draws Released[2]
     #   Remaining Balance[3](f) % Complete[4](f) Draws#[5] PM[6] Status/Notes[7]
     def _import_project_budgets(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        for row in self._data_rows(rows, 2):
             name = self.clean_string(self._val(row, 0))
             if not name or name.startswith("TOTAL"): self.result.skipped += 1; continue
             budget = self.clean_currency(self._val(row, 1))
             released = self.clean_currency(self._val(row, 2))
             pm = self.clean_string(self._val(row, 6))
+            notes = self.clean_string(self._val(row, 7))
             code = self._extract_project_code(name)
+            # Existing projects keep their name and status, so no upsert_keyed
+            if not self.row_changed("PROJECT BUDGETS", code, (name, budget, released, pm, notes)):
+                continue
             project = self.session.query(Project).filter(Project.code == code).first()
             if project:
                 project.budget_total = budget
                 project.contract_amount = released
                 project.project_manager = pm
-                project.notes = self.clean_string(self._val(row, 7))
+                project.notes = notes
                 self.result.updated += 1
             else:
                 project = Project(code=code, name=name, status=ProjectStatus.active,
                     budget_total=budget, contract_amount=released,
-                    project_manager=pm, state="TN",
-                    notes=self.clean_string(self._val(row, 7)))
+                    project_manager=pm, state="TN", notes=notes)
                 self.session.add(project)
                 self.result.created += 1
             self.session.flush()
@@ -268,15 +595,16 @@ class MasterfileImporter(BaseImporter):
     #   Budget[2] Actual Cost[3] Variance($)[4](f) Variance(%)[5](f)
     #   Committed[6] Open POs[7] Est to Complete[8](f) Est at Complete[9](f)
     def _import_job_costing(self, rows):
-        if len(rows) < 5: return
         current_project_id = None
-        for row in rows[3:]:
+        existing = {(pid, code): id_ for pid, code, id_ in
+                    self.session.query(CostCode.project_id, CostCode.code, CostCode.id)}
+        upserts, seen = [], set()
+        for row in self._data_rows(rows, 3, 5):
             val0 = self.clean_string(self._val(row, 0))
             if not val0: continue
             if val0.startswith("PROJECT:"):
                 code = val0.replace("PROJECT:", "").strip().split()[0]
-                p = self.session.query(Project).filter(Project.code == code).first()
-                current_project_id = p.id if p else self.get_or_create_project(code, code)
+                current_project_id = self.get_or_create_project(code, code)
                 continue
             if val0 in ("Cost Code / Division", "TOTALS") or val0.startswith("="): continue
             if current_project_id is None: continue
@@ -285,20 +613,20 @@ class MasterfileImporter(BaseImporter):
             budget = self.clean_currency(self._val(row, 2))
             actual = self.clean_currency(self._val(row, 3))
             committed = self.clean_currency(self._val(row, 6))
-            existing = self.session.query(CostCode).filter(
-                CostCode.project_id == current_project_id, CostCode.code == code_str).first()
-            if existing:
-                existing.description = val0; existing.budget_amount = budget
-                existing.actual_amount = actual; existing.committed_amount = committed
-                existing.variance = budget - actual if budget > 0 else Decimal("0")
-                self.result.updated += 1
-            else:
-                cc = CostCode(project_id=current_project_id, code=code_str,
-                    description=val0, budget_amount=budget, actual_amount=actual,
-                    committed_amount=committed, category=val0,
-                    variance=budget - actual if budget > 0 else Decimal("0"))
-                self.session.add(cc)
-                self.result.created += 1
+            fields = dict(project_id=current_project_id, code=code_str,
+                description=val0, budget_amount=budget, actual_amount=actual,
+                committed_amount=committed, category=val0,
+                variance=budget - actual if budget > 0 else Decimal("0"))
+            key = (current_project_id, code_str)
+            if not self.row_changed("JOB COSTING", f"{current_project_id}|{code_str}", fields):
+                continue
+            if key in existing or key in seen: self.result.updated += 1
+            else: self.result.created += 1
+            seen.add(key)
+            upserts.append(fields)
+        self.bulk_upsert(CostCode, upserts, ("project_id", "code"),
+                         ("description", "budget_amount", "actual_amount",
+                          "committed_amount", "variance"), existing)
 
     # === SOV DRAW BUILDER -> sov_lines (219 rows, multi-project) ===
     # Row 3 header: Division[0] Scheduled Value[1] Prior Draws[2] Balance[3]
@@ -306,17 +634,18 @@ class MasterfileImporter(BaseImporter):
     #   Stored Materials[8] Total+Stored[9](f) % of Total[10](f)
     #   Retainage(10%)[11](f) Net Draw This Period[12](f) SOURCE[13]
     def _import_sov(self, rows):
-        if len(rows) < 5: return
         current_project_id = None; line_num = 0
-        for row in rows[4:]:
+        existing = {(pid, num): id_ for pid, num, id_ in
+                    self.session.query(SOVLine.project_id, SOVLine.line_number, SOVLine.id)}
+        upserts = []
+        for row in self._data_rows(rows, 4):
             val0 = self.clean_string(self._val(row, 0))
             if not val0: continue
             if val0.startswith("=") or val0 == "Division": continue
             # detect project header
             if " — " in val0 or " -- " in val0:
                 code = self._extract_project_code(val0)
-                p = self.session.query(Project).filter(Project.code == code).first()
-                current_project_id = p.id if p else self.get_or_create_project(code, val0)
+                current_project_id = self.get_or_create_project(code, val0)
                 line_num = 0; continue
             if val0.startswith("TOTAL"): continue
             if current_project_id is None: continue
@@ -327,71 +656,81 @@ class MasterfileImporter(BaseImporter):
             if pct_raw is not None and not isinstance(pct_raw, str):
                 try: pct = Decimal(str(round(float(pct_raw)*100, 2)))
                 except: pass
-            sov = SOVLine(project_id=current_project_id, line_number=line_num,
+            fields = dict(project_id=current_project_id, line_number=line_num,
                 description=val0, scheduled_value=sched,
                 previous_billed=self.clean_currency(self._val(row, 2)),
                 current_billed=self.clean_currency(self._val(row, 6)),
                 balance_to_finish=self.clean_currency(self._val(row, 3)),
                 stored_materials=self.clean_currency(self._val(row, 8)),
                 percent_complete=pct)
-            self.session.add(sov)
-            self.result.created += 1
+            if not self.row_changed("SOV DRAW BUILDER", f"{current_project_id}|{line_num}", fields):
+                continue
+            upserts.append(fields)
+            if (current_project_id, line_num) in existing: self.result.updated += 1
+            else: self.result.created += 1
+        self.bulk_upsert(SOVLine, upserts, ("project_id", "line_number"),
+                         ("description", "scheduled_value", "previous_billed",
+                          "current_billed", "balance_to_finish", "stored_materials",
+                          "percent_complete"), existing)
 
     # === DRAW TRACKER -> pay_apps (77 rows) ===
     # Data shifted: Seq[0] Project[1] Phase[2] Amount[3] Status[4] ...
     def _import_draw_tracker(self, rows):
-        if len(rows) < 5: return
-        for row in rows[4:]:
+        existing = {(pid, num): id_ for pid, num, id_ in
+                    self.session.query(PayApp.project_id, PayApp.pay_app_number, PayApp.id)}
+        inserts = []
+        for row in self._data_rows(rows, 4):
             project_code = self.clean_string(self._val(row, 1))
             phase = self.clean_string(self._val(row, 2))
             amount = self.clean_currency(self._val(row, 3))
             status = self.clean_string(self._val(row, 4))
             if not project_code or not phase: self.result.skipped += 1; continue
-            p = self.session.query(Project).filter(Project.code == project_code).first()
-            pid = p.id if p else self.get_or_create_project(project_code, project_code)
+            pid = self.get_or_create_project(project_code, project_code)
             draw_num = 0
             if phase and "draw" in phase.lower():
                 for part in phase.split():
                     try: draw_num = int(part); break
                     except: continue
-            existing = self.session.query(PayApp).filter(
-                PayApp.project_id == pid, PayApp.pay_app_number == draw_num).first()
-            if existing: self.result.skipped += 1; continue
-            pa_status = "paid" if status and "RELEASED" in status.upper() else "draft"
-            pa = PayApp(project_id=pid, pay_app_number=draw_num or self.clean_int(self._val(row, 0)),
-                amount_requested=amount, amount_approved=amount if pa_status == "paid" else Decimal("0"),
-                net_payment=amount if pa_status == "paid" else Decimal("0"),
-                status=pa_status, notes=phase)
-            self.session.add(pa)
+            draw_num = draw_num or self.clean_int(self._val(row, 0))
+            if (pid, draw_num) in existing: self.result.skipped += 1; continue
+            existing[(pid, draw_num)] = None
+            pa_status = PayAppStatus.paid if status and "RELEASED" in status.upper() else PayAppStatus.draft
+            inserts.append(dict(project_id=pid, pay_app_number=draw_num,
+                amount_requested=amount, amount_approved=amount if pa_status == PayAppStatus.paid else Decimal("0"),
+                net_payment=amount if pa_status == PayAppStatus.paid else Decimal("0"),
+                status=pa_status, notes=phase))
             self.result.created += 1
+        # Draws already recorded are left alone
+        self.bulk_upsert(PayApp, inserts, ("project_id", "pay_app_number"), (), {})
 
     # === EMPLOYEE COSTS -> employees (14 rows) ===
     # Row 1 header (data shifted): Employee[0] Title[1] Salary[2]
     #   Employer Taxes[3] Vehicle[4] ...
     def _import_employee_costs(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        existing = {f"{first} {last}".strip(): id_ for first, last, id_ in
+                    self.session.query(Employee.first_name, Employee.last_name, Employee.id)}
+        for row in self._data_rows(rows, 2):
             name = self.clean_string(self._val(row, 0))
             if not name or name.startswith("TOTAL"): self.result.skipped += 1; continue
-            title = self.clean_string(self._val(row, 1))
-            salary = self.clean_currency(self._val(row, 2))
             parts = name.split(None, 1)
             first = parts[0]; last = parts[1] if len(parts) > 1 else ""
-            existing = self.session.query(Employee).filter(
-                Employee.first_name == first, Employee.last_name == last).first()
-            if existing:
-                existing.role = title; existing.salary = salary; self.result.updated += 1
-            else:
-                emp = Employee(first_name=first, last_name=last, role=title, salary=salary, is_active=True)
-                self.session.add(emp); self.result.created += 1
+            self.upsert_keyed("EMPLOYEE COSTS", Employee, name, dict(
+                first_name=first, last_name=last,
+                role=self.clean_string(self._val(row, 1)),
+                salary=self.clean_currency(self._val(row, 2)),
+            ), existing.get(name))
 
     # === PAYROLL -> payroll_entries + employee updates (13 rows) ===
     # Row 1 header: Employee[0] Title[1] Hourly Rate[2] Weekly Gross[3]
     #   Annual Salary[4] YTD Gross[5](f) YTD Net Pay[6] YTD Emp Taxes[7]
     #   YTD Employer Taxes[8] YTD Reimb[9] Total YTD[10] Status[11]
     def _import_payroll(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        period_start, period_end = datetime(2025,1,1).date(), datetime(2025,12,31).date()
+        employees = {f"{first} {last}".strip(): id_ for first, last, id_ in
+                     self.session.query(Employee.first_name, Employee.last_name, Employee.id)}
+        entries = dict(self.session.query(PayrollEntry.employee_id, PayrollEntry.id).filter(
+            PayrollEntry.pay_period_start == period_start))
+        for row in self._data_rows(rows, 2):
             name = self.clean_string(self._val(row, 0))
             if not name or name.startswith("TOTAL"): self.result.skipped += 1; continue
             title = self.clean_string(self._val(row, 1))
@@ -399,59 +738,58 @@ class MasterfileImporter(BaseImporter):
             annual = self.clean_currency(self._val(row, 4))
             parts = name.split(None, 1)
             first = parts[0]; last = parts[1] if len(parts) > 1 else ""
-            emp = self.session.query(Employee).filter(
-                Employee.first_name == first, Employee.last_name == last).first()
-            if emp:
-                if hourly > 0: emp.hourly_rate = hourly
-                if annual > 0: emp.salary = annual
-                emp.role = title or emp.role
-                self.result.updated += 1
-            else:
-                emp = Employee(first_name=first, last_name=last, role=title,
-                    hourly_rate=hourly if hourly > 0 else None,
-                    salary=annual if annual > 0 else None, is_active=True)
-                self.session.add(emp); self.session.flush()
-                self.result.created += 1
+            # Blank cells leave what EMPLOYEE COSTS set
+            fields = dict(first_name=first, last_name=last)
+            if title: fields["role"] = title
+            if hourly > 0: fields["hourly_rate"] = hourly
+            if annual > 0: fields["salary"] = annual
+            self.upsert_keyed("PAYROLL", Employee, name, fields, employees.get(name))
+            if annual <= 0: continue
+            if name not in employees:
+                self.session.flush()
+                employees[name] = self.session.query(Employee.id).filter(
+                    Employee.first_name == first, Employee.last_name == last).first()[0]
+            emp_id = employees[name]
             ytd_er_tax = self.clean_currency(self._val(row, 8))
-            if annual > 0 and emp.id:
-                entry = PayrollEntry(employee_id=emp.id,
-                    pay_period_start=datetime(2025,1,1).date(),
-                    pay_period_end=datetime(2025,12,31).date(),
-                    gross_pay=annual, net_pay=self.clean_currency(self._val(row, 6)),
-                    employer_taxes=ytd_er_tax, total_cost=annual + ytd_er_tax,
-                    notes=self.clean_string(self._val(row, 11)))
-                self.session.add(entry)
+            self.upsert_keyed("PAYROLL", PayrollEntry, f"{name}|{period_start}", dict(
+                employee_id=emp_id, pay_period_start=period_start, pay_period_end=period_end,
+                gross_pay=annual, net_pay=self.clean_currency(self._val(row, 6)),
+                employer_taxes=ytd_er_tax, total_cost=annual + ytd_er_tax,
+                notes=self.clean_string(self._val(row, 11)),
+            ), entries.get(emp_id))
 
     # === PAYROLL CALENDAR -> payroll_calendar (30 rows) ===
     # Row 2 header: Pay#[0] Pay Date[1] Est Gross[2](f) Employer Taxes[3](f)
     #   Total Cash Needed[4](f) Draw Expected?[5] Cash Source/Notes[6]
     def _import_payroll_calendar(self, rows):
-        if len(rows) < 4: return
-        for row in rows[3:]:
+        existing = dict(self.session.query(PayrollCalendar.pay_date, PayrollCalendar.id))
+        for row in self._data_rows(rows, 3):
             pay_date = self.clean_date(self._val(row, 1))
             if not pay_date: self.result.skipped += 1; continue
-            existing = self.session.query(PayrollCalendar).filter(
-                PayrollCalendar.pay_date == pay_date).first()
-            if existing: self.result.skipped += 1; continue
-            cal = PayrollCalendar(pay_date=pay_date, period_start=pay_date,
-                period_end=pay_date, status="scheduled",
-                notes=self.clean_string(self._val(row, 6)))
-            self.session.add(cal); self.result.created += 1
+            self.upsert_keyed("PAYROLL CALENDAR", PayrollCalendar, pay_date.isoformat(), dict(
+                pay_date=pay_date, period_start=pay_date, period_end=pay_date,
+                status="scheduled", notes=self.clean_string(self._val(row, 6)),
+            ), existing.get(pay_date))
 
     # === DAILY INPUTS -> cash_snapshots (71 rows, form layout) ===
     def _import_daily_inputs(self, rows):
-        if len(rows) < 10: return
-        snap = CashSnapshot(snapshot_date=datetime.now().date(),
-            account_name="DAILY INPUTS Snapshot",
-            balance=self.clean_currency(self._val(rows[7] if len(rows) > 7 else None, 1)),
-            notes="Imported from DAILY INPUTS tab")
-        self.session.add(snap); self.result.created += 1
+        head = list(islice(rows, 10))
+        if len(head) < 10: return
+        today = datetime.now().date()
+        existing = self.session.query(CashSnapshot.id).filter(
+            CashSnapshot.snapshot_date == today,
+            CashSnapshot.account_name == "DAILY INPUTS Snapshot").first()
+        self.upsert_keyed("DAILY INPUTS", CashSnapshot, today.isoformat(), dict(
+            snapshot_date=today, account_name="DAILY INPUTS Snapshot",
+            balance=self.clean_currency(self._val(head[7], 1)),
+            notes="Imported from DAILY INPUTS tab",
+        ), existing and existing[0])
 
     # === CASH FLOW 13WK -> cash_forecast_lines (45 rows) ===
     # Row 2 header: Category[0] Monthly Avg[1] Wk1[2]..Wk13[14] SOURCE[15]
     def _import_cash_forecast(self, rows):
-        if len(rows) < 4: return
-        header = rows[2]
+        rows = self._data_rows(rows, 2, 4)
+        header = next(rows, None)
         week_dates = []
         for i in range(2, min(15, len(header) if header else 0)):
             h = str(header[i]) if header[i] else ""
@@ -459,46 +797,55 @@ class MasterfileImporter(BaseImporter):
             if "\n" in h:
                 dp = h.split("\n")[-1]
                 d = self.clean_date(f"{dp}/2026")
-            week_dates.append((i, d))
-        for row in rows[3:]:
+            week_dates.append((i, d or datetime.now().date()))
+        existing = self._ids_by_key(self.session.query(
+            CashForecastLine.category, CashForecastLine.week_starting, CashForecastLine.id))
+        seen = {}
+        for row in rows:
             cat = self.clean_string(self._val(row, 0))
             if not cat or cat.startswith("=") or cat.startswith("TOTAL"): continue
             for ci, wd in week_dates:
-                val = self._val(row, ci)
-                amt = self.clean_currency(val)
-                if amt == 0: continue
-                line = CashForecastLine(week_starting=wd or datetime.now().date(),
-                    category=cat, amount_in=amt if amt > 0 else Decimal("0"),
-                    amount_out=abs(amt) if amt < 0 else Decimal("0"), net=amt)
-                self.session.add(line); self.result.created += 1
+                amt = self.clean_currency(self._val(row, ci))
+                key, existing_id = self._nth_key(f"{cat}|{wd}", seen, existing)
+                # A cleared cell zeroes the line it created before
+                if amt == 0 and existing_id is None: continue
+                self.upsert_keyed("CASH FLOW 13WK", CashForecastLine, key, dict(
+                    week_starting=wd, category=cat,
+                    amount_in=amt if amt > 0 else Decimal("0"),
+                    amount_out=abs(amt) if amt < 0 else Decimal("0"), net=amt,
+                ), existing_id)
 
     # === PHASE SYNC -> phase_sync_entries (25 rows) ===
     # Row 3 header: Project[0] Phase[1] Material Type[2] Supplier[3]
     #   Supplier Terms[4] PO Date[5] ... (24 cols)
     def _import_phase_sync(self, rows):
-        if len(rows) < 5: return
-        for row in rows[4:]:
+        existing = self._ids_by_key(self.session.query(
+            PhaseSyncEntry.project_id, PhaseSyncEntry.phase_name, PhaseSyncEntry.id))
+        seen = {}
+        for row in self._data_rows(rows, 4):
             pc = self.clean_string(self._val(row, 0))
             phase = self.clean_string(self._val(row, 1))
             if not pc or not phase: self.result.skipped += 1; continue
-            p = self.session.query(Project).filter(Project.code == pc).first()
-            pid = p.id if p else self.get_or_create_project(pc, pc)
-            entry = PhaseSyncEntry(project_id=pid, phase_name=phase,
+            pid = self.get_or_create_project(pc, pc)
+            key, existing_id = self._nth_key(f"{pid}|{phase}", seen, existing)
+            self.upsert_keyed("PHASE SYNC", PhaseSyncEntry, key, dict(
+                project_id=pid, phase_name=phase,
                 status=self.clean_string(self._val(row, 4)),
                 planned_start=self.clean_date(self._val(row, 5)),
                 planned_end=self.clean_date(self._val(row, 8)),
-                notes=f"Material: {self._val(row, 2) or ''} | Supplier: {self._val(row, 3) or ''}")
-            self.session.add(entry); self.result.created += 1
+                notes=f"Material: {self._val(row, 2) or ''} | Supplier: {self._val(row, 3) or ''}",
+            ), existing_id)
 
     # === DEBT PAYOFF -> updates debts (24 rows) ===
     # Row 2 header: Creditor[0] Amount Owed[1] Settlement Offer[2]
     #   Settlement%[3](f) Savings[4](f) Lien Risk[5] Priority[6](f)
     #   Payoff Order[7] Strategy Notes[8]
     def _import_debt_payoff(self, rows):
-        if len(rows) < 4: return
-        for row in rows[3:]:
+        for row in self._data_rows(rows, 3):
             creditor = self.clean_string(self._val(row, 0))
             if not creditor or creditor.startswith("TOTAL"): self.result.skipped += 1; continue
+            # The notes are appended to, so only a new or edited row may touch them
+            if not self.row_changed("DEBT PAYOFF", creditor, row): continue
             debt = self.session.query(Debt).filter(
                 Debt.name.ilike(f"%{creditor.split('(')[0].strip()[:20]}%")).first()
             if debt:
@@ -519,8 +866,10 @@ class MasterfileImporter(BaseImporter):
     #   Annual Total[4](f) Auto-Pay?[5] Due Day[6] Payment Method[7]
     #   Status[8] Notes[9]
     def _import_recurring_expenses(self, rows):
-        if len(rows) < 4: return
-        for row in rows[3:]:
+        existing = self._ids_by_key(self.session.query(
+            RecurringExpense.description, RecurringExpense.id))
+        seen = {}
+        for row in self._data_rows(rows, 3):
             vn = self.clean_string(self._val(row, 0))
             if not vn or vn.startswith("TOTAL") or vn.startswith("="): self.result.skipped += 1; continue
             amount = self.clean_currency(self._val(row, 3))
@@ -532,85 +881,98 @@ class MasterfileImporter(BaseImporter):
             elif "quarter" in freq_str: freq = RecurringFrequency.quarterly
             elif "annual" in freq_str: freq = RecurringFrequency.annually
             vid = self.get_or_create_vendor(vn)
-            exp = RecurringExpense(vendor_id=vid, description=vn, amount=amount, frequency=freq,
+            key, existing_id = self._nth_key(vn, seen, existing)
+            self.upsert_keyed("RECURRING EXP", RecurringExpense, key, dict(
+                vendor_id=vid, description=vn, amount=amount, frequency=freq,
                 is_active=(self.clean_string(self._val(row, 8)) or "").upper() != "CANCELLED",
-                notes=f"Cat: {self._val(row, 1) or ''} | AutoPay: {self._val(row, 5) or ''} | Method: {self._val(row, 7) or ''} | Status: {self._val(row, 8) or ''} | {self._val(row, 9) or ''}")
-            self.session.add(exp); self.result.created += 1
+                notes=f"Cat: {self._val(row, 1) or ''} | AutoPay: {self._val(row, 5) or ''} | Method: {self._val(row, 7) or ''} | Status: {self._val(row, 8) or ''} | {self._val(row, 9) or ''}",
+            ), existing_id)
 
     # === MONTHLY PL -> pl_entries division=company_wide (51 rows) ===
     # Row 2 header: MONTH->[0] Jan[1]..Dec[12] YTD TOTAL[13] SOURCE[14]
     def _import_monthly_pl(self, rows):
-        self._import_pl_pivoted(rows, "company_wide", data_start=4)
+        self._import_pl_pivoted(rows, "MONTHLY PL", "company_wide", data_start=4)
 
     # === MULTIFAMILY PL -> pl_entries division=multifamily (86 rows) ===
     # Row 4 header, data from row 6
     def _import_multifamily_pl(self, rows):
-        self._import_pl_pivoted(rows, "multifamily", data_start=6)
+        self._import_pl_pivoted(rows, "MULTIFAMILY PL", "multifamily", data_start=6)
 
-    def _import_pl_pivoted(self, rows, division, data_start):
-        if len(rows) < data_start + 1: return
-        for row in rows[data_start:]:
+    def _import_pl_pivoted(self, rows, tab, division, data_start):
+        existing = self._ids_by_key(self.session.query(
+            PLEntry.account_name, PLEntry.period_month, PLEntry.id).filter(
+            PLEntry.division == division, PLEntry.period_year == 2025,
+            PLEntry.is_budget == False))  # noqa: E712
+        seen = {}
+        for row in self._data_rows(rows, data_start):
             acct = self.clean_string(self._val(row, 0))
             if not acct or acct.startswith("=") or acct.startswith("TOTAL") or acct.startswith("~"): continue
             for m_idx in range(12):
-                col = m_idx + 1
-                val = self._val(row, col)
-                amount = self.clean_currency(val)
-                if amount == 0: continue
-                entry = PLEntry(period_year=2025, period_month=m_idx + 1,
-                    division=division, account_name=acct, amount=amount, is_budget=False)
-                self.session.add(entry); self.result.created += 1
+                amount = self.clean_currency(self._val(row, m_idx + 1))
+                key, existing_id = self._nth_key(f"{acct}|{m_idx + 1}", seen, existing)
+                if amount == 0 and existing_id is None: continue
+                self.upsert_keyed(tab, PLEntry, key, dict(
+                    period_year=2025, period_month=m_idx + 1, division=division,
+                    account_name=acct, amount=amount, is_budget=False,
+                ), existing_id)
 
     # === SCENARIO MODEL -> scenarios + assumptions (56 rows) ===
     def _import_scenarios(self, rows):
-        if len(rows) < 12: return
+        scenarios = dict(self.session.query(Scenario.name, Scenario.id))
+        existing = self._ids_by_key(self.session.query(
+            ScenarioAssumption.scenario_id, ScenarioAssumption.variable_name, ScenarioAssumption.id))
+        seen = {}
         current_id = None
-        for row in rows[1:]:
+        for row in self._data_rows(rows, 1, 12):
             val0 = self.clean_string(self._val(row, 0))
             if not val0: continue
             if val0.startswith("SCENARIO") or val0.startswith("CURRENT STATE"):
-                existing = self.session.query(Scenario).filter(Scenario.name == val0).first()
-                if existing: current_id = existing.id; self.result.skipped += 1
-                else:
-                    sc = Scenario(name=val0, is_baseline=val0.startswith("CURRENT"))
-                    self.session.add(sc); self.session.flush()
-                    current_id = sc.id; self.result.created += 1
+                self.upsert_keyed("SCENARIO MODEL", Scenario, val0, dict(
+                    name=val0, is_baseline=val0.startswith("CURRENT"),
+                ), scenarios.get(val0))
+                if val0 not in scenarios:
+                    self.session.flush()
+                    scenarios[val0] = self.session.query(Scenario.id).filter(
+                        Scenario.name == val0).first()[0]
+                current_id = scenarios[val0]
                 continue
             if current_id is None: continue
             var_val = self._val(row, 1)
             if var_val is not None:
-                a = ScenarioAssumption(scenario_id=current_id, variable_name=val0,
-                    variable_value=str(var_val))
-                self.session.add(a); self.result.created += 1
+                key, existing_id = self._nth_key(f"{current_id}|{val0}", seen, existing)
+                self.upsert_keyed("SCENARIO MODEL", ScenarioAssumption, key, dict(
+                    scenario_id=current_id, variable_name=val0, variable_value=str(var_val),
+                ), existing_id)
 
     # === COA -> chart_of_accounts (98 rows) ===
     # Row 2 header: Acct#[0] Account Name[1] Type[2] Detail Type/Notes[3]
     def _import_chart_of_accounts(self, rows):
-        if len(rows) < 4: return
-        for row in rows[3:]:
+        existing = dict(self.session.query(ChartOfAccounts.account_number, ChartOfAccounts.id))
+        for row in self._data_rows(rows, 3):
             acct_num = self.clean_string(self._val(row, 0), 20)
             name = self.clean_string(self._val(row, 1))
             if not acct_num or not name: self.result.skipped += 1; continue
-            existing = self.session.query(ChartOfAccounts).filter(
-                ChartOfAccounts.account_number == acct_num).first()
-            if existing: self.result.skipped += 1; continue
-            coa = ChartOfAccounts(account_number=acct_num, name=name,
+            self.upsert_keyed("COA", ChartOfAccounts, acct_num, dict(
+                account_number=acct_num, name=name,
                 account_type=self.clean_string(self._val(row, 2)),
-                notes=self.clean_string(self._val(row, 3)))
-            self.session.add(coa); self.result.created += 1
+                notes=self.clean_string(self._val(row, 3)),
+            ), existing.get(acct_num))
 
     # === DATA LOG -> data_sources (20 rows) ===
     # Row 2 header: File Name[0] Type[1] Used In Tab(s)[2] Key Data[3]
     #   Records[4] Date Range[5] Status[6]
     def _import_data_log(self, rows):
-        if len(rows) < 4: return
-        for row in rows[3:]:
+        existing = self._ids_by_key(self.session.query(DataSource.name, DataSource.id))
+        seen = {}
+        for row in self._data_rows(rows, 3):
             name = self.clean_string(self._val(row, 0))
             if not name: continue
-            ds = DataSource(name=name, source_type=self.clean_string(self._val(row, 1)),
+            key, existing_id = self._nth_key(name, seen, existing)
+            self.upsert_keyed("DATA LOG", DataSource, key, dict(
+                name=name, source_type=self.clean_string(self._val(row, 1)),
                 status=self.clean_string(self._val(row, 6)),
-                notes=f"Tabs: {self._val(row, 2) or ''} | Data: {self._val(row, 3) or ''}")
-            self.session.add(ds); self.result.created += 1
+                notes=f"Tabs: {self._val(row, 2) or ''} | Data: {self._val(row, 3) or ''}",
+            ), existing_id)
 
     # === CHANGE ORDERS -> change_orders (47 rows) ===
     # Row 3 header: CO#[0] Project[1] Date Submitted[2] Description[3]
@@ -618,13 +980,13 @@ class MasterfileImporter(BaseImporter):
     #   Schedule Impact[9] Submitted To[10] Status[11] Approval Date[12]
     #   Approved Amount[13] Variance[14](f) Reason Code[15] Notes[16]
     def _import_change_orders(self, rows):
-        if len(rows) < 5: return
-        for row in rows[4:]:
+        existing = {f"{pid}|{num}": id_ for pid, num, id_ in
+                    self.session.query(ChangeOrder.project_id, ChangeOrder.co_number, ChangeOrder.id)}
+        for row in self._data_rows(rows, 4):
             co_num = self.clean_string(self._val(row, 0), 20)
             project_code = self.clean_string(self._val(row, 1))
             if not co_num or not project_code: self.result.skipped += 1; continue
-            p = self.session.query(Project).filter(Project.code == project_code).first()
-            pid = p.id if p else self.get_or_create_project(project_code, project_code)
+            pid = self.get_or_create_project(project_code, project_code)
             mat = self.clean_currency(self._val(row, 5))
             labor = self.clean_currency(self._val(row, 6))
             sub = self.clean_currency(self._val(row, 7))
@@ -634,15 +996,17 @@ class MasterfileImporter(BaseImporter):
             if "approved" in status_raw: status = ChangeOrderStatus.approved
             elif "pending" in status_raw: status = ChangeOrderStatus.pending_approval
             elif "rejected" in status_raw: status = ChangeOrderStatus.rejected
-            co = ChangeOrder(project_id=pid, co_number=co_num,
+            key = f"{pid}|{co_num}"
+            self.upsert_keyed("CHANGE ORDERS", ChangeOrder, key, dict(
+                project_id=pid, co_number=co_num,
                 title=self.clean_string(self._val(row, 3)),
                 description=self.clean_string(self._val(row, 3), 2000),
                 amount=total, status=status,
                 requested_by=self.clean_string(self._val(row, 4)),
                 date_submitted=self.clean_date(self._val(row, 2)),
                 date_approved=self.clean_date(self._val(row, 12)),
-                notes=f"Mat: ${mat:,.0f} | Lab: ${labor:,.0f} | Sub: ${sub:,.0f} | Reason: {self._val(row, 15) or ''} | {self._val(row, 16) or ''}")
-            self.session.add(co); self.result.created += 1
+                notes=f"Mat: ${mat:,.0f} | Lab: ${labor:,.0f} | Sub: ${sub:,.0f} | Reason: {self._val(row, 15) or ''} | {self._val(row, 16) or ''}",
+            ), existing.get(key))
 
     # === LIEN WAIVERS -> lien_waivers (53 rows) ===
     # Row 4 header: Vendor/Sub[0] Project[1] Draw#[2] Payment Amount[3]
@@ -650,23 +1014,28 @@ class MasterfileImporter(BaseImporter):
     #   Payment Cleared?[7] Unconditional Waiver?[8] Unconditional Date[9]
     #   Waiver Covers Through[10] Remaining Owed[11] Risk Level[12] Notes[13]
     def _import_lien_waivers(self, rows):
-        if len(rows) < 6: return
-        for row in rows[5:]:
+        existing = self._ids_by_key(self.session.query(
+            LienWaiver.vendor_id, LienWaiver.project_id, LienWaiver.id))
+        seen = {}
+        for row in self._data_rows(rows, 5):
             vn = self.clean_string(self._val(row, 0))
             if not vn or vn.startswith("TOTAL"): self.result.skipped += 1; continue
             pc = self.clean_string(self._val(row, 1))
+            pid = self.identity.lookup("project", pc)
+            if not pid: self.result.skipped += 1; continue   # lien_waivers needs a project
             vid = self.get_or_create_vendor(vn)
-            p = self.session.query(Project).filter(Project.code == pc).first() if pc else None
-            pid = p.id if p else None
             cond = self.clean_string(self._val(row, 4))
             uncond = self.clean_string(self._val(row, 8))
             wtype = "unconditional" if uncond else ("conditional" if cond else None)
-            lw = LienWaiver(project_id=pid, vendor_id=vid, waiver_type=wtype,
+            # A vendor can have several waivers on one project: the n-th row is the n-th waiver
+            key, existing_id = self._nth_key(f"{vid}|{pid}", seen, existing)
+            self.upsert_keyed("LIEN WAIVERS", LienWaiver, key, dict(
+                project_id=pid, vendor_id=vid, waiver_type=wtype,
                 amount=self.clean_currency(self._val(row, 3)),
                 through_date=self.clean_date(self._val(row, 10)),
                 received_date=self.clean_date(self._val(row, 9)) or self.clean_date(self._val(row, 5)),
-                notes=f"Risk: {self._val(row, 12) or ''} | Draw: {self._val(row, 2) or ''} | {self._val(row, 13) or ''}")
-            self.session.add(lw); self.result.created += 1
+                notes=f"Risk: {self._val(row, 12) or ''} | Draw: {self._val(row, 2) or ''} | {self._val(row, 13) or ''}",
+            ), existing_id)
 
     # === VENDOR SCORECARD -> vendors (49 rows) ===
     # Row 3 header: Vendor/Sub[0] Trade[1] Phone[2] Email[3]
@@ -676,10 +1045,10 @@ class MasterfileImporter(BaseImporter):
     #   Total Paid YTD[12] Total Still Owed[13] Last Payment Date[14]
     #   Projects Worked[15] Preferred?[16] Notes/Issues[17]
     def _import_vendor_scorecard(self, rows):
-        if len(rows) < 5: return
-        for row in rows[4:]:
+        for row in self._data_rows(rows, 4):
             name = self.clean_string(self._val(row, 0))
             if not name or name.startswith("TOTAL"): self.result.skipped += 1; continue
+            if not self.row_changed("VENDOR SCORECARD", name, row): continue
             vendor = self.session.query(Vendor).filter(Vendor.name == name).first()
             if not vendor:
                 vendor = Vendor(name=name)
@@ -707,15 +1076,16 @@ class MasterfileImporter(BaseImporter):
     #   Milestone[0] Planned Date[1] Actual Date[2] Days Variance[3](f)
     #   Status[4](f) Responsible[5] Notes[6]
     def _import_project_schedule(self, rows):
-        if len(rows) < 5: return
+        existing = self._ids_by_key(self.session.query(
+            ProjectMilestone.project_id, ProjectMilestone.task_name, ProjectMilestone.id))
+        seen = {}
         current_pid = None; sort_order = 0
-        for row in rows[3:]:
+        for row in self._data_rows(rows, 3, 5):
             val0 = self.clean_string(self._val(row, 0))
             if not val0: continue
             if val0.startswith("PROJECT:"):
                 code = self._extract_project_code(val0.replace("PROJECT:", "").strip())
-                p = self.session.query(Project).filter(Project.code == code).first()
-                current_pid = p.id if p else self.get_or_create_project(code, val0)
+                current_pid = self.get_or_create_project(code, val0)
                 sort_order = 0; continue
             if val0 == "Milestone" or val0.startswith("="): continue
             if current_pid is None: continue
@@ -725,55 +1095,65 @@ class MasterfileImporter(BaseImporter):
             if actual: status = MilestoneStatus.completed
             elif planned and planned < datetime.now().date(): status = MilestoneStatus.delayed
             else: status = MilestoneStatus.not_started
-            ms = ProjectMilestone(project_id=current_pid, task_name=val0,
+            key, existing_id = self._nth_key(f"{current_pid}|{val0}", seen, existing)
+            self.upsert_keyed("PROJECT SCHEDULE", ProjectMilestone, key, dict(
+                project_id=current_pid, task_name=val0,
                 status=status, planned_start=planned, planned_end=planned,
                 actual_start=actual, actual_end=actual,
                 assigned_to=self.clean_string(self._val(row, 5)),
-                sort_order=sort_order, notes=self.clean_string(self._val(row, 6)))
-            self.session.add(ms); self.result.created += 1
+                sort_order=sort_order, notes=self.clean_string(self._val(row, 6)),
+            ), existing_id)
 
     # === RETAINAGE -> retainage_entries (36 rows, 2 sections) ===
     # Section 1 "HELD BY LENDERS" row 4: Project[0] Lender[1] Total Contract[2]
     #   Total Billed[3] Retainage%[4] Retainage Held($)[5] ...
     # Section 2 "YOU OWE TO SUBS" row 14: Sub/Vendor[0] Project[1] ...
     def _import_retainage(self, rows):
-        if len(rows) < 6: return
+        existing = self._ids_by_key(self.session.query(
+            RetainageEntry.project_id, RetainageEntry.vendor_id, RetainageEntry.id))
+        seen = {}
         section = None
-        for row in rows:
+        for row in self._data_rows(rows, 0, 6):
             val0 = self.clean_string(self._val(row, 0))
             if not val0: continue
             if "HELD BY LENDERS" in val0: section = "receivable"; continue
             if "YOU OWE" in val0 or "RETAINAGE YOU OWE" in val0: section = "payable"; continue
             if val0 in ("Project", "Sub/Vendor") or val0.startswith("TOTAL") or val0.startswith("="): continue
             if section == "receivable":
-                p = self.session.query(Project).filter(Project.code == val0).first()
-                if not p: continue
+                pid = self.identity.lookup("project", val0)
+                if not pid: continue
                 pct = self._val(row, 4)
                 ret_pct = Decimal(str(pct)) if pct and not isinstance(pct, str) else Decimal("0.10")
                 billed = self.clean_currency(self._val(row, 3))
                 held = billed * ret_pct if billed > 0 else Decimal("0")
-                entry = RetainageEntry(project_id=p.id, amount_held=held, balance=held,
-                    notes=f"Lender: {self._val(row, 1) or ''} | Release: {self._val(row, 6) or ''} | Type: receivable")
-                self.session.add(entry); self.result.created += 1
+                key, existing_id = self._nth_key(f"{pid}|None", seen, existing)
+                self.upsert_keyed("RETAINAGE", RetainageEntry, key, dict(
+                    project_id=pid, vendor_id=None, amount_held=held, balance=held,
+                    notes=f"Lender: {self._val(row, 1) or ''} | Release: {self._val(row, 6) or ''} | Type: receivable",
+                ), existing_id)
             elif section == "payable":
-                vid = self.get_or_create_vendor(val0)
                 pc = self.clean_string(self._val(row, 1))
-                p = self.session.query(Project).filter(Project.code == pc).first() if pc else None
+                pid = self.identity.lookup("project", pc)
+                if not pid: self.result.skipped += 1; continue   # retainage_entries needs a project
+                vid = self.get_or_create_vendor(val0)
                 pct = self._val(row, 4)
                 ret_pct = Decimal(str(pct)) if pct and not isinstance(pct, str) else Decimal("0.10")
                 paid = self.clean_currency(self._val(row, 3))
                 held = paid * ret_pct if paid > 0 else Decimal("0")
-                entry = RetainageEntry(project_id=p.id if p else None, vendor_id=vid,
-                    amount_held=held, balance=held,
-                    notes=f"Release: {self._val(row, 6) or ''} | Type: payable")
-                self.session.add(entry); self.result.created += 1
+                key, existing_id = self._nth_key(f"{pid}|{vid}", seen, existing)
+                self.upsert_keyed("RETAINAGE", RetainageEntry, key, dict(
+                    project_id=pid, vendor_id=vid, amount_held=held, balance=held,
+                    notes=f"Release: {self._val(row, 6) or ''} | Type: payable",
+                ), existing_id)
 
     # === BID PIPELINE -> bid_pipeline (46 rows) ===
     # Row 3 header, data shifted: Name[0] Client[1] Salesperson[2]
     #   Date?[3] Date2?[4] Value[5] Status[6] ...
     def _import_bid_pipeline(self, rows):
-        if len(rows) < 5: return
-        for row in rows[4:]:
+        existing = self._ids_by_key(self.session.query(
+            BidPipeline.opportunity_name, BidPipeline.id))
+        seen = {}
+        for row in self._data_rows(rows, 4):
             name = self.clean_string(self._val(row, 0))
             if not name or name.startswith("TOTAL"): self.result.skipped += 1; continue
             value = self.clean_currency(self._val(row, 5))
@@ -788,47 +1168,56 @@ class MasterfileImporter(BaseImporter):
             if prob_raw is not None and not isinstance(prob_raw, str):
                 try: prob = Decimal(str(round(float(prob_raw)*100, 2)))
                 except: pass
-            bid = BidPipeline(opportunity_name=name,
+            key, existing_id = self._nth_key(name, seen, existing)
+            self.upsert_keyed("BID PIPELINE", BidPipeline, key, dict(
+                opportunity_name=name,
                 client_name=self.clean_string(self._val(row, 1)),
                 salesperson=self.clean_string(self._val(row, 2)),
                 estimated_value=value, status=status, probability=prob,
-                notes=self.clean_string(self._val(row, 16)))
-            self.session.add(bid); self.result.created += 1
+                notes=self.clean_string(self._val(row, 16)),
+            ), existing_id)
 
     # === CREW ALLOCATION -> crew_allocations (36 rows) ===
     # Row 3 header: Employee/Resource[0] Role[1] week cols [2]-[14]
     def _import_crew_allocation(self, rows):
-        if len(rows) < 5: return
-        date_row = rows[3] if len(rows) > 3 else None
+        rows = self._data_rows(rows, 3, 5)
+        date_row = next(rows, None)
         week_dates = []
         if date_row:
             for i in range(2, min(15, len(date_row))):
                 raw = self.clean_string(self._val(date_row, i))
                 d = self.clean_date(f"{raw}/2026") if raw else None
                 week_dates.append((i, d))
-        for row in rows[4:]:
+        existing = self._ids_by_key(self.session.query(
+            CrewAllocation.notes, CrewAllocation.week_starting, CrewAllocation.id))
+        employees = {}
+        seen = {}
+        for row in rows:
             emp_name = self.clean_string(self._val(row, 0))
             if not emp_name or emp_name.startswith("TOTAL"): continue
             role = self.clean_string(self._val(row, 1))
-            parts = emp_name.split(None, 1)
-            emp = self.session.query(Employee).filter(Employee.first_name == parts[0]).first()
-            eid = emp.id if emp else None
+            first = emp_name.split(None, 1)[0]
+            if first not in employees:
+                emp = self.session.query(Employee.id).filter(Employee.first_name == first).first()
+                employees[first] = emp and emp[0]
             for ci, wd in week_dates:
                 assignment = self.clean_string(self._val(row, ci))
                 if not assignment or wd is None: continue
-                p = self.session.query(Project).filter(Project.code == assignment).first()
-                pid = p.id if p else self.get_or_create_project(assignment, assignment)
-                alloc = CrewAllocation(employee_id=eid, project_id=pid,
+                pid = self.get_or_create_project(assignment, assignment)
+                key, existing_id = self._nth_key(f"{emp_name}|{wd}", seen, existing)
+                self.upsert_keyed("CREW ALLOCATION", CrewAllocation, key, dict(
+                    employee_id=employees[first], project_id=pid,
                     week_starting=wd, role_on_project=role,
-                    hours_allocated=Decimal("40"), notes=emp_name)
-                self.session.add(alloc); self.result.created += 1
+                    hours_allocated=Decimal("40"), notes=emp_name,
+                ), existing_id)
 
     # === AR AGING -> invoices (28 rows) ===
     # Row 1 header: Client[0] Amount Owed[1] Invoice Date[2] Due Date[3]
     #   Description[4] Aging Bucket[5] Status[6] Collection Notes[7] SOURCE[8]
     def _import_ar_aging(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        existing = self._ids_by_key(self.session.query(Invoice.invoice_number, Invoice.id))
+        seen = {}
+        for row in self._data_rows(rows, 2):
             client = self.clean_string(self._val(row, 0))
             if not client or client.startswith("TOTAL"): self.result.skipped += 1; continue
             amount = self.clean_currency(self._val(row, 1))
@@ -836,64 +1225,79 @@ class MasterfileImporter(BaseImporter):
             bucket = self.clean_string(self._val(row, 5))
             status = InvoiceStatus.overdue
             if bucket == "0-30": status = InvoiceStatus.sent
-            inv = Invoice(project_id=None,
-                invoice_number=self.clean_string(self._val(row, 4)) or f"AR-{client[:10]}",
+            number = self.clean_string(self._val(row, 4)) or f"AR-{client[:10]}"
+            key, existing_id = self._nth_key(number, seen, existing)
+            self.upsert_keyed("AR AGING", Invoice, key, dict(
+                project_id=None, invoice_number=number,
                 date_issued=self.clean_date(self._val(row, 2)),
                 date_due=self.clean_date(self._val(row, 3)),
                 amount=amount, balance=amount, status=status,
-                notes=f"Client: {client} | Bucket: {bucket} | {self._val(row, 7) or ''}")
-            self.session.add(inv); self.result.created += 1
+                notes=f"Client: {client} | Bucket: {bucket} | {self._val(row, 7) or ''}",
+            ), existing_id)
 
     # === AP AGING -> vendor updates (22 rows) ===
     # Row 1 header: Vendor[0] Amount Owed[1] Aging Bucket[2] Priority[3]
     #   Notes[4] Risk Level[5] Action[6] SOURCE[7]
     def _import_ap_aging(self, rows):
-        if len(rows) < 3: return
-        for row in rows[2:]:
+        appended = {}
+        seen = {}
+        for row in self._data_rows(rows, 2):
             vn = self.clean_string(self._val(row, 0))
             if not vn or vn.startswith("TOTAL"): self.result.skipped += 1; continue
+            # The notes are appended to, so only a new or edited row may touch them
+            key, _ = self._nth_key(vn, seen, {})
+            if not self.row_changed("AP AGING", key, row): continue
             amount = self.clean_currency(self._val(row, 1))
             bucket = self.clean_string(self._val(row, 2))
             priority = self.clean_string(self._val(row, 3))
             risk = self.clean_string(self._val(row, 5))
-            vendor = self.session.query(Vendor).filter(Vendor.name == vn).first()
-            if not vendor:
-                vendor = Vendor(name=vn); self.session.add(vendor); self.session.flush()
-            vendor.notes = (vendor.notes or "") + f" | AP: ${amount:,.0f} ({bucket}) Pri: {priority} Risk: {risk}"
+            vid = self.get_or_create_vendor(vn)
+            appended[vid] = appended.get(vid, "") + f" | AP: ${amount:,.0f} ({bucket}) Pri: {priority} Risk: {risk}"
             self.result.updated += 1
+        if not appended: return
+        # One read of the current notes, then a single executemany UPDATE
+        vendors = Vendor.__table__
+        current = dict(self.session.query(Vendor.id, Vendor.notes).filter(Vendor.id.in_(appended)).all())
+        self.session.execute(
+            vendors.update().where(vendors.c.id == bindparam("vid")).values(notes=bindparam("new_notes")),
+            [{"vid": vid, "new_notes": (current.get(vid) or "") + extra} for vid, extra in appended.items()],
+        )
 
     # === LOWES PRO -> cost_events (446 rows) ===
     # Row 1 header: Date[0] Store[1] PO(Raw)[2] Project(Normalized)[3]
     #   Division[4] Purchaser[5] Invoice#[6] CC Last 4[7] Tax[8]
     #   Order Total[9] MF?[10] SOURCE[11]
     def _import_lowes_pro(self, rows):
-        if len(rows) < 3: return
         lowes_id = self.get_or_create_vendor("Lowe's Pro")
-        for row in rows[2:]:
+        seen = {}
+        for row in self._data_rows(rows, 2):
             date = self.clean_date(self._val(row, 0))
             total = self.clean_currency(self._val(row, 9))
             if not date or total == 0: self.result.skipped += 1; continue
             pc = self.clean_string(self._val(row, 3))
-            pid = None
-            if pc:
-                p = self.session.query(Project).filter(Project.code == pc).first()
-                pid = p.id if p else self.get_or_create_project(pc, pc)
-            event = CostEvent(project_id=pid, vendor_id=lowes_id, date=date,
-                amount=-abs(total), event_type=CostEventType.material_purchase,
-                description=f"Lowe's {self._val(row, 1) or ''} — PO: {self._val(row, 2) or ''}",
-                reference_number=self.clean_string(self._val(row, 6)),
-                source=CostEventSource.lowes_import, source_ref="Lowe's Pro Export",
-                import_batch=self.batch_id,
-                notes=f"Purchaser: {self._val(row, 5) or ''} | CC: {self._val(row, 7) or ''} | Tax: {self._val(row, 8) or 0} | MF: {self._val(row, 10) or 'N'}")
-            self.session.add(event); self.result.created += 1
-            if self.result.created % 500 == 0: self.session.flush()
+            if not pc: self.result.skipped += 1; continue   # cost_events needs a project
+            if self.log_row_seen("LOWES PRO", row, seen): continue
+            pid = self.get_or_create_project(pc, pc)
+            ref = self.clean_string(self._val(row, 6))
+            self.session.add(CostEvent(**self._cost_event(
+                pid, date, -abs(total), CostEventType.material_purchase,
+                CostEventSource.lowes_import, lowes_id,
+                f"Lowe's {self._val(row, 1) or ''} — PO: {self._val(row, 2) or ''}",
+                ref and f"Ref {ref}",
+                f"Purchaser: {self._val(row, 5) or ''} | CC: {self._val(row, 7) or ''} | Tax: {self._val(row, 8) or 0} | MF: {self._val(row, 10) or 'N'}",
+            )))
+            self.result.created += 1
 
     # === VICTORY CROSSINGS -> bid_pipeline (134 rows, pro forma) ===
     def _import_victory_crossings(self, rows):
-        if len(rows) < 5: return
-        bid = BidPipeline(opportunity_name="Victory Crossings 64-Unit Development",
+        if len(list(islice(rows, 5))) < 5: return
+        name = "Victory Crossings 64-Unit Development"
+        existing = self.session.query(BidPipeline.id).filter(
+            BidPipeline.opportunity_name == name).first()
+        self.upsert_keyed("VICTORY CROSSINGS", BidPipeline, name, dict(
+            opportunity_name=name,
             client_name="SECG (Internal Development)", project_type="Multifamily",
             estimated_value=Decimal("9256000"), status=BidStatus.pursuing,
             salesperson="Samuel Carson",
-            notes="64-unit development pro forma — imported from VICTORY CROSSINGS tab")
-        self.session.add(bid); self.result.created += 1
+            notes="64-unit development pro forma — imported from VICTORY CROSSINGS tab",
+        ), existing and existing[0])
@@ -19,7 +19,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from backend.core.database import SessionLocal
-from backend.importers.base import ImportResult
+from backend.importers.base import CheckpointStore, ImportResult
 
 
 logger = logging.getLogger("secg.import")
@@ -32,80 +32,109 @@ def run_full_import(
     proposals_path: Optional[str] = None,
     jobs_path: Optional[str] = None,
     include_schedule: bool = True,
+    workers: Optional[int] = None,
+    full: bool = False,
+    resume: Optional[str] = None,
+    tenant_id: Optional[int] = None,
 ) -> dict[str, ImportResult]:
     """Execute all import steps in dependency order.
 
     Order matters — projects and vendors must exist before cost events,
     quotes, or milestones can reference them.
 
-    Returns a dict of source_name → ImportResult.
+    ``workers`` caps the process pools used for independent masterfile tabs
+    and budget CSV files (defaults to the CPU count; always 1 on SQLite). Masterfile tabs and
+    rows whose content hash is unchanged since the last import are skipped
+    unless ``full`` is set.
+
+    Each step that finishes without errors, and each masterfile tab, is
+    checkpointed under the batch id together with its source checksum.
+    Passing a previous batch id as ``resume`` re-runs that batch, skipping
+    the checkpointed work whose source file is unchanged.
+
+    Masterfile cost events are recorded under ``tenant_id`` (default tenant
+    if None).
+
+    Returns a dict of source_name → ImportResult for the steps that ran.
     """
-    batch_id = f"full_import_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+    batch_id = resume or f"full_import_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
     results = {}
     session = SessionLocal()
+    checkpoints = CheckpointStore(session, batch_id)
+
+    def run_step(number: int, step: str, label: str, path: Optional[str], make_importer):
+        checksum = CheckpointStore.checksum(path)
+        done = checkpoints.completed(step, checksum)
+        if done is not None:
+            print(f"\n▸ Step {number}: {label} already complete in this batch — skipping")
+            return
+        print(f"\n▸ Step {number}: Importing {label}...")
+        result = make_importer().run()
+        results[step] = result
+        print(result.summary())
+        if not result.errors:
+            checkpoints.mark(step, checksum, rows=result.total_processed,
+                             summary=result.summary())
+            session.commit()
 
     try:
         print("=" * 60)
         print(f"SECG ERP Import Pipeline — Batch: {batch_id}")
+        if resume:
+            if checkpoints.any():
+                print("Resuming: completed steps with unchanged sources are skipped")
+            else:
+                print("Resuming: no checkpoints recorded for this batch, running everything")
         print("=" * 60)
 
         # ── Step 1: Masterfile (creates projects, vendors, employees, etc.) ──
         if masterfile_path and os.path.exists(masterfile_path):
-            print("\n▸ Step 1: Importing Masterfile...")
             from backend.importers.masterfile import MasterfileImporter
-            importer = MasterfileImporter(session, masterfile_path, batch_id)
-            results["masterfile"] = importer.run()
-            print(results["masterfile"].summary())
+            run_step(1, "masterfile", "Masterfile", masterfile_path,
+                     lambda: MasterfileImporter(session, masterfile_path, batch_id,
+                                                workers=workers, full=full,
+                                                checkpoints=True, tenant_id=tenant_id))
         else:
             print("\n▸ Step 1: Skipping Masterfile (not provided)")
 
         # ── Step 2: Open Jobs + Quotes (creates/validates project stubs) ─────
         if jobs_path and os.path.exists(jobs_path):
-            print("\n▸ Step 2: Importing Open Jobs & Quotes...")
             from backend.importers.jobs import OpenJobsImporter
-            importer = OpenJobsImporter(session, jobs_path, batch_id)
-            results["open_jobs"] = importer.run()
-            print(results["open_jobs"].summary())
+            run_step(2, "open_jobs", "Open Jobs & Quotes", jobs_path,
+                     lambda: OpenJobsImporter(session, jobs_path, batch_id))
         else:
             print("\n▸ Step 2: Skipping Open Jobs (not provided)")
 
         # ── Step 3: Budget CSVs (cost codes, SOV lines, draws) ───────────────
         if budget_dir and os.path.exists(budget_dir):
-            print("\n▸ Step 3: Importing Budget CSVs...")
             from backend.importers.budgets import BudgetCSVBatchImporter
-            importer = BudgetCSVBatchImporter(session, budget_dir, batch_id)
-            results["budgets"] = importer.run()
-            print(results["budgets"].summary())
+            run_step(3, "budgets", "Budget CSVs", budget_dir,
+                     lambda: BudgetCSVBatchImporter(session, budget_dir, batch_id,
+                                                    workers=workers))
         else:
             print("\n▸ Step 3: Skipping Budget CSVs (not provided)")
 
         # ── Step 4: Leads ────────────────────────────────────────────────────
         if leads_path and os.path.exists(leads_path):
-            print("\n▸ Step 4: Importing Leads...")
             from backend.importers.leads import LeadsImporter
-            importer = LeadsImporter(session, leads_path, batch_id)
-            results["leads"] = importer.run()
-            print(results["leads"].summary())
+            run_step(4, "leads", "Leads", leads_path,
+                     lambda: LeadsImporter(session, leads_path, batch_id))
         else:
             print("\n▸ Step 4: Skipping Leads (not provided)")
 
         # ── Step 5: Lead Proposals ───────────────────────────────────────────
         if proposals_path and os.path.exists(proposals_path):
-            print("\n▸ Step 5: Importing Lead Proposals...")
             from backend.importers.leads import ProposalsImporter
-            importer = ProposalsImporter(session, proposals_path, batch_id)
-            results["proposals"] = importer.run()
-            print(results["proposals"].summary())
+            run_step(5, "proposals", "Lead Proposals", proposals_path,
+                     lambda: ProposalsImporter(session, proposals_path, batch_id))
         else:
             print("\n▸ Step 5: Skipping Proposals (not provided)")
 
         # ── Step 6: Schedule (milestones from PDF data) ──────────────────────
         if include_schedule:
-            print("\n▸ Step 6: Importing Schedule Milestones...")
             from backend.importers.schedule import ScheduleImporter
-            importer = ScheduleImporter(session, batch_id)
-            results["schedule"] = importer.run()
-            print(results["schedule"].summary())
+            run_step(6, "schedule", "Schedule Milestones", None,
+                     lambda: ScheduleImporter(session, batch_id))
         else:
             print("\n▸ Step 6: Skipping Schedule")
 
@@ -116,11 +145,13 @@ def run_full_import(
         total_created = sum(r.created for r in results.values())
         total_updated = sum(r.updated for r in results.values())
         total_skipped = sum(r.skipped for r in results.values())
+        total_unchanged = sum(r.unchanged for r in results.values())
         total_errors = sum(len(r.errors) for r in results.values())
 
         print(f"  Total created:  {total_created}")
         print(f"  Total updated:  {total_updated}")
         print(f"  Total skipped:  {total_skipped}")
+        print(f"  Total unchanged: {total_unchanged}")
         print(f"  Total errors:   {total_errors}")
         print(f"  Sources run:    {len(results)}")
         print("=" * 60)
@@ -139,6 +170,9 @@ def run_single_import(
     source: str,
     file_path: str,
     batch_id: Optional[str] = None,
+    workers: Optional[int] = None,
+    full: bool = False,
+    tenant_id: Optional[int] = None,
 ) -> ImportResult:
     """Run a single importer by name.
 
@@ -149,6 +183,9 @@ def run_single_import(
                 'jobs', 'schedule'
         file_path: Path to the import file
         batch_id: Optional batch identifier
+        workers: Process pool size for masterfile tabs / budget CSV files
+        full: Re-apply unchanged masterfile tabs/rows (masterfile only)
+        tenant_id: Tenant of imported cost events (masterfile only)
     """
     session = SessionLocal()
     batch_id = batch_id or f"{source}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
@@ -156,10 +193,12 @@ def run_single_import(
     try:
         if source == "masterfile":
             from backend.importers.masterfile import MasterfileImporter
-            importer = MasterfileImporter(session, file_path, batch_id)
+            importer = MasterfileImporter(session, file_path, batch_id,
+                                          workers=workers, full=full, tenant_id=tenant_id)
         elif source == "budgets":
             from backend.importers.budgets import BudgetCSVBatchImporter
-            importer = BudgetCSVBatchImporter(session, file_path, batch_id)
+            importer = BudgetCSVBatchImporter(session, file_path, batch_id,
+                                              workers=workers)
         elif source == "budget_single":
             from backend.importers.budgets import BudgetCSVImporter
             importer = BudgetCSVImporter(session, file_path, batch_id)
@@ -14,8 +14,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.api import api_router
+from backend.core import events, realtime
 from backend.core.config import settings
 from backend.core.database import Base, engine
+from backend.core.instrumentation import InstrumentationMiddleware, instrument_routes
+from backend.core.outbox import dispatcher
+from backend.core.schema import missing_indexes, schema_cache
 
 
 _DEFAULT_USERS = [
@@ -77,8 +81,36 @@ async def lifespan(app: FastAPI):
         log.info("DB create_all succeeded")
     except Exception as exc:
         log.error("DB create_all FAILED: %s", exc, exc_info=True)
+    try:
+        if schema_cache.refreshed_at is None:   # create_all refreshes it on success
+            schema_cache.refresh()
+        log.info("Schema cache: %d tables (generation %d)",
+                 len(schema_cache.tables()), schema_cache.generation)
+    except Exception as exc:
+        log.error("Schema cache refresh FAILED: %s", exc, exc_info=True)
+    try:
+        # Built by a deploy step (CREATE INDEX CONCURRENTLY), never while booting
+        missing = missing_indexes()
+        if missing:
+            log.warning("%d model indexes missing (%s); run python -m backend.core.schema",
+                        len(missing), ", ".join(ix.name for ix in missing))
+    except Exception as exc:
+        log.error("Index check FAILED: %s", exc, exc_info=True)
+    try:
+        for change in events.upgrade():
+            log.info("Upgraded %s", change)
+    except Exception as exc:
+        log.error("system_events upgrade FAILED: %s", exc, exc_info=True)
     _seed_admin_users(log)
+    try:
+        realtime.start()
+    except Exception as exc:
+        log.error("Realtime broker start FAILED: %s", exc, exc_info=True)
+    if settings.outbox_enabled:
+        dispatcher.start()
     yield
+    dispatcher.stop()
+    realtime.stop()
 
 
 app = FastAPI(
@@ -99,6 +131,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request query count / DB time / serialization time (see /api/admin/instrumentation)
+app.add_middleware(InstrumentationMiddleware)
+
 # Mount all API routes under /api
 app.include_router(api_router, prefix=settings.api_prefix)
 
@@ -118,3 +153,6 @@ def root():
         "docs": "/api/docs",
         "health": "/health",
     }
+
+
+instrument_routes(app)
@@ -205,7 +205,11 @@ class Employee(TimestampMixin, Base):
 
 class Vendor(TimestampMixin, Base):
     __tablename__ = "vendors"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_vendors_name_id", "name", "id"),   # keyset pagination
+        Index("ix_vendors_insurance_expiry", "insurance_expiry"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(200), nullable=False)
@@ -236,7 +240,10 @@ class Vendor(TimestampMixin, Base):
 
 class Project(TimestampMixin, Base):
     __tablename__ = "projects"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_projects_status", "status"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     code = Column(String(20), unique=True, nullable=False)
@@ -276,7 +283,12 @@ class Project(TimestampMixin, Base):
 
 class CostCode(TimestampMixin, Base):
     __tablename__ = "cost_codes"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # A unique index, not a constraint, so create_missing_indexes() adds it
+        # to existing databases; bulk upserts ON CONFLICT on these columns
+        Index("uq_cost_codes_project_code", "project_id", "code", unique=True),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -339,7 +351,10 @@ class Commitment(TimestampMixin, Base):
 
 class ChangeOrder(TimestampMixin, Base):
     __tablename__ = "change_orders"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_change_orders_project_id_date_submitted", "project_id", "date_submitted"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -392,7 +407,10 @@ class Quote(TimestampMixin, Base):
 
 class SOVLine(TimestampMixin, Base):
     __tablename__ = "sov_lines"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("uq_sov_lines_project_line", "project_id", "line_number", unique=True),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -416,7 +434,10 @@ class SOVLine(TimestampMixin, Base):
 
 class PayApp(TimestampMixin, Base):
     __tablename__ = "pay_apps"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("uq_pay_apps_project_number", "project_id", "pay_app_number", unique=True),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -462,7 +483,11 @@ class PayAppLine(TimestampMixin, Base):
 
 class Invoice(TimestampMixin, Base):
     __tablename__ = "invoices"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_invoices_status_date_due", "status", "date_due"),
+        Index("ix_invoices_date_due", "date_due"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -496,7 +521,10 @@ class InvoiceLine(TimestampMixin, Base):
 
 class Payment(TimestampMixin, Base):
     __tablename__ = "payments"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_payments_qb_txn_id", "qb_txn_id"),   # incremental sync upserts
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
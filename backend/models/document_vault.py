@@ -1,7 +1,7 @@
 """Document Vault models — extends the existing Document model with vault features."""
 
 from sqlalchemy import (
-    Column, Date, ForeignKey,
+    Column, Date, ForeignKey, Index,
     Integer, String, Text,
 )
 from sqlalchemy.orm import relationship
@@ -13,7 +13,14 @@ from backend.models.core import TimestampMixin
 class VaultDocument(TimestampMixin, Base):
     """Enhanced document model for the Document Vault module."""
     __tablename__ = "vault_documents"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_vault_documents_status_created_at", "status", "created_at"),
+        Index("ix_vault_documents_project_id", "project_id"),
+        Index("ix_vault_documents_vendor_id", "vendor_id"),
+        Index("ix_vault_documents_employee_id", "employee_id"),
+        Index("ix_vault_documents_expiry_date", "expiry_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -10,12 +10,13 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from sqlalchemy import (
-    Boolean, Column, Date, DateTime, Enum, ForeignKey,
-    Integer, Numeric, String, Text,
+    Boolean, Column, Date, DateTime, Enum, ForeignKey, Index,
+    Integer, Numeric, String, Text, UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 
 from backend.core.database import Base
+from backend.core.jsontypes import JSONPayload
 from backend.models.core import TimestampMixin
 
 
@@ -149,7 +150,10 @@ class RecurringExpense(TimestampMixin, Base):
 
 class CashSnapshot(TimestampMixin, Base):
     __tablename__ = "cash_snapshots"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_cash_snapshots_snapshot_date", "snapshot_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     snapshot_date = Column(Date, nullable=False)
@@ -164,7 +168,10 @@ class CashSnapshot(TimestampMixin, Base):
 
 class CashForecastLine(TimestampMixin, Base):
     __tablename__ = "cash_forecast_lines"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_cash_forecast_lines_week_starting", "week_starting"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     week_starting = Column(Date, nullable=False)
@@ -219,7 +226,10 @@ class PayrollEntry(TimestampMixin, Base):
 
 class PayrollCalendar(TimestampMixin, Base):
     __tablename__ = "payroll_calendar"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_payroll_calendar_pay_date", "pay_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     pay_date = Column(Date, nullable=False)
@@ -235,7 +245,10 @@ class PayrollCalendar(TimestampMixin, Base):
 
 class PLEntry(TimestampMixin, Base):
     __tablename__ = "pl_entries"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_pl_entries_period_year_period_month_division", "period_year", "period_month", "division"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     period_year = Column(Integer, nullable=False)
@@ -290,6 +303,47 @@ class DataSource(TimestampMixin, Base):
     notes = Column(Text)
 
 
+class ImportFingerprint(TimestampMixin, Base):
+    """Content hash of one imported source row, keyed by tab + natural key.
+
+    natural_key "*" holds the hash of the whole tab.
+    """
+    __tablename__ = "import_fingerprints"
+    __table_args__ = (
+        UniqueConstraint("source", "tab", "natural_key", name="uq_import_fingerprint_key"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String(50), nullable=False)     # importer source_name
+    tab = Column(String(100), nullable=False)
+    natural_key = Column(String(600), nullable=False)
+    row_hash = Column(String(40), nullable=False)   # sha1 hex
+    record_id = Column(Integer)                     # id of the row it produced
+    batch_id = Column(String(100))
+
+
+class ImportCheckpoint(TimestampMixin, Base):
+    """A completed unit of an import batch: a pipeline step, or one tab of it.
+
+    ``tab`` is "" for the step itself. A checkpoint only counts on resume
+    while the source still has the same ``checksum``.
+    """
+    __tablename__ = "import_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("batch_id", "step", "tab", name="uq_import_checkpoint_unit"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String(100), nullable=False, index=True)
+    step = Column(String(50), nullable=False)       # masterfile, open_jobs, budgets, ...
+    tab = Column(String(100), nullable=False, default="")
+    checksum = Column(String(40), nullable=False)   # sha1 hex of the source file(s)
+    rows = Column(Integer, default=0)
+    summary = Column(Text)
+
+
 # ── Lien Waivers ─────────────────────────────────────────────────────────
 
 class LienWaiver(TimestampMixin, Base):
@@ -312,7 +366,10 @@ class LienWaiver(TimestampMixin, Base):
 
 class ProjectMilestone(TimestampMixin, Base):
     __tablename__ = "project_milestones"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_project_milestones_project_id_sort_order", "project_id", "sort_order"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -350,7 +407,10 @@ class RetainageEntry(TimestampMixin, Base):
 
 class BidPipeline(TimestampMixin, Base):
     __tablename__ = "bid_pipeline"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_bid_pipeline_status_estimated_value", "status", "estimated_value"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     opportunity_name = Column(String(300), nullable=False)
@@ -368,7 +428,10 @@ class BidPipeline(TimestampMixin, Base):
 
 class CrewAllocation(TimestampMixin, Base):
     __tablename__ = "crew_allocations"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_crew_allocations_week_starting", "week_starting"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     employee_id = Column(Integer, ForeignKey("employees.id"))
@@ -383,7 +446,10 @@ class CrewAllocation(TimestampMixin, Base):
 
 class Lead(TimestampMixin, Base):
     __tablename__ = "leads"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_leads_lead_status", "lead_status"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     opportunity_title = Column(String(300))
@@ -422,7 +488,10 @@ class Lead(TimestampMixin, Base):
 
 class LeadProposal(TimestampMixin, Base):
     __tablename__ = "lead_proposals"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_lead_proposals_status", "status"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     lead_id = Column(Integer, ForeignKey("leads.id"))
@@ -493,7 +562,11 @@ class UserAccount(TimestampMixin, Base):
 
 class CalendarEvent(TimestampMixin, Base):
     __tablename__ = "calendar_events"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_calendar_events_start_datetime", "start_datetime"),
+        Index("ix_calendar_events_project_id_start_datetime", "project_id", "start_datetime"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, nullable=False, index=True, default=1)
@@ -517,7 +590,11 @@ class CalendarEvent(TimestampMixin, Base):
 
 class CalendarAttendee(Base):
     __tablename__ = "calendar_attendees"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_calendar_attendees_event_id", "event_id"),
+        Index("ix_calendar_attendees_employee_id", "employee_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     event_id = Column(Integer, ForeignKey("calendar_events.id"), nullable=False)
@@ -529,7 +606,11 @@ class CalendarAttendee(Base):
 
 class DailyLog(TimestampMixin, Base):
     __tablename__ = "daily_logs"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_daily_logs_project_id_log_date", "project_id", "log_date"),
+        Index("ix_daily_logs_log_date", "log_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, nullable=False, index=True, default=1)
@@ -557,7 +638,10 @@ class DailyLog(TimestampMixin, Base):
 
 class DailyLogCrewEntry(Base):
     __tablename__ = "daily_log_crew"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_daily_log_crew_daily_log_id", "daily_log_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"), nullable=False)
@@ -573,7 +657,10 @@ class DailyLogCrewEntry(Base):
 
 class DailyLogPhoto(Base):
     __tablename__ = "daily_log_photos"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_daily_log_photos_daily_log_id", "daily_log_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     daily_log_id = Column(Integer, ForeignKey("daily_logs.id"), nullable=False)
@@ -627,7 +714,13 @@ class Role(TimestampMixin, Base):
 
 class Document(TimestampMixin, Base):
     __tablename__ = "documents"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_documents_project_id", "project_id"),
+        Index("ix_documents_vendor_id", "vendor_id"),
+        Index("ix_documents_employee_id", "employee_id"),
+        Index("ix_documents_created_at", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
@@ -650,14 +743,22 @@ class Document(TimestampMixin, Base):
 
 class SystemEvent(TimestampMixin, Base):
     __tablename__ = "system_events"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_system_events_processed_id", "processed", "id"),
+        # /api/admin/events time-range queries and retention pruning; the
+        # payload expression/GIN indexes are in backend.core.events
+        Index("ix_system_events_created_at", "created_at"),
+        Index("ix_system_events_event_type_created_at", "event_type", "created_at"),
+        Index("ix_system_events_source_created_at", "source_type", "source_id", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
     event_type = Column(String(100), nullable=False)
     source_type = Column(String(50), nullable=False)
     source_id = Column(Integer, nullable=False)
-    payload = Column(Text)
+    payload = Column(JSONPayload)
     processed = Column(Boolean, default=False)
 
 
@@ -679,7 +780,11 @@ class NotificationRule(TimestampMixin, Base):
 
 class Notification(TimestampMixin, Base):
     __tablename__ = "notifications"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_notifications_recipient_id_is_read_created_at", "recipient_id", "is_read", "created_at"),
+        Index("ix_notifications_is_read_created_at", "is_read", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
@@ -716,7 +821,10 @@ class NotificationPreference(TimestampMixin, Base):
 
 class ApprovalRequest(TimestampMixin, Base):
     __tablename__ = "approval_requests"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_approval_requests_status_created_at", "status", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
@@ -752,7 +860,11 @@ class ApprovalRule(TimestampMixin, Base):
 
 class ExceptionItem(TimestampMixin, Base):
     __tablename__ = "exception_items"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_exception_items_status_created_at", "status", "created_at"),
+        Index("ix_exception_items_created_at", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
@@ -788,9 +900,60 @@ class PeriodSnapshot(TimestampMixin, Base):
     notes = Column(Text)
 
 
+class KpiRollup(TimestampMixin, Base):
+    """Materialized aggregate of one metric for one tenant and day.
+
+    Maintained incrementally by ``backend.core.rollups``. The "*" dimension
+    holds the metric's total; its presence marks the day as seeded.
+    """
+    __tablename__ = "kpi_rollups"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "rollup_date", "metric", "dimension", name="uq_kpi_rollup"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, nullable=False, index=True)
+    rollup_date = Column(Date, nullable=False)
+    metric = Column(String(50), nullable=False)     # ar, debt, projects, pipeline, ...
+    dimension = Column(String(300), nullable=False)  # status / type / period key, "*" = total
+    count = Column(Integer, default=0)
+    value = Column(Numeric(16, 2), default=0)
+    value_2 = Column(Numeric(16, 2), default=0)
+    value_3 = Column(Numeric(16, 2), default=0)
+
+
+class SearchEntry(TimestampMixin, Base):
+    """One searchable record for global search, kept in sync on writes.
+
+    ``content`` is the lowercased text matched against; see backend.core.search.
+    """
+    __tablename__ = "search_entries"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_entry"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(30), nullable=False)   # projects, vendors, employees, ...
+    entity_id = Column(Integer, nullable=False)
+    title = Column(String(300), nullable=False)
+    subtitle = Column(String(300))
+    url = Column(String(300))
+    content = Column(Text, nullable=False)
+
+
 class CostEvent(TimestampMixin, Base):
     __tablename__ = "cost_events"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Transaction log keyset pagination: overall, per project, vendor and source
+        Index("ix_cost_events_event_date_id", "event_date", "id"),
+        Index("ix_cost_events_project_event_date_id", "project_id", "event_date", "id"),
+        Index("ix_cost_events_vendor_id_event_date_id", "vendor_id", "event_date", "id"),
+        Index("ix_cost_events_source_type_event_date_id", "source_type", "event_date", "id"),
+        Index("ix_cost_events_qb_sync_id", "qb_sync_id"),   # incremental sync upserts
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
@@ -836,7 +999,10 @@ class Integration(TimestampMixin, Base):
 
 class SyncLog(TimestampMixin, Base):
     __tablename__ = "sync_logs"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_sync_logs_entity_type_started_at", "entity_type", "started_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     integration_id = Column(Integer, ForeignKey("integrations.id"), nullable=False, index=True)
@@ -848,3 +1014,65 @@ class SyncLog(TimestampMixin, Base):
     completed_at = Column(DateTime)
     status = Column(String(20))
     error_details = Column(Text)
+
+    @property
+    def duration_seconds(self):
+        if self.started_at is None or self.completed_at is None:
+            return None
+        return (self.completed_at - self.started_at).total_seconds()
+
+    @property
+    def records_per_second(self):
+        seconds = self.duration_seconds
+        if not seconds or self.records_processed is None:
+            return None
+        return round(self.records_processed / seconds, 2)
+
+
+class SyncCursor(TimestampMixin, Base):
+    """High-water mark of one integration entity: the provider's change
+    token, or the latest modification time synced (see backend.sync.incremental)."""
+
+    __tablename__ = "sync_cursors"
+    __table_args__ = (
+        UniqueConstraint("integration_id", "entity_type", name="uq_sync_cursor_entity"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id"), nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    high_water = Column(String(200))
+    records_synced = Column(Integer, default=0)
+    last_synced_at = Column(DateTime)
+
+
+class SyncSkippedRecord(TimestampMixin, Base):
+    """A provider record that couldn't be mapped (e.g. its project isn't
+    synced yet), retried on every run until it maps (see backend.sync.incremental)."""
+
+    __tablename__ = "sync_skipped_records"
+    __table_args__ = (
+        UniqueConstraint("integration_id", "entity_type", "external_id",
+                         name="uq_sync_skipped_record"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    integration_id = Column(Integer, ForeignKey("integrations.id"), nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    external_id = Column(String(100), nullable=False)
+    record = Column(JSONPayload, nullable=False)
+    attempts = Column(Integer, default=1)
+
+
+class SchedulerLease(TimestampMixin, Base):
+    """Leader lease: the sync worker holding ``name`` runs the scheduler."""
+
+    __tablename__ = "scheduler_leases"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    holder = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
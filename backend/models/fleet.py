@@ -9,7 +9,7 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from sqlalchemy import (
-    Column, Date, DateTime, Enum, ForeignKey,
+    Column, Date, DateTime, Enum, ForeignKey, Index,
     Integer, Numeric, String, Text, func,
 )
 from sqlalchemy.orm import relationship
@@ -80,7 +80,10 @@ class FleetVehicle(TimestampMixin, Base):
 
 class MaintenanceSchedule(Base):
     __tablename__ = "maintenance_schedules"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_maintenance_schedules_vehicle_id", "vehicle_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     vehicle_id = Column(Integer, ForeignKey("fleet_vehicles.id"), nullable=False)
@@ -101,7 +104,10 @@ class MaintenanceSchedule(Base):
 
 class MaintenanceLog(TimestampMixin, Base):
     __tablename__ = "maintenance_logs"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_maintenance_logs_vehicle_id_performed_date", "vehicle_id", "performed_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     vehicle_id = Column(Integer, ForeignKey("fleet_vehicles.id"), nullable=False)
@@ -121,7 +127,10 @@ class MaintenanceLog(TimestampMixin, Base):
 
 class FuelLog(Base):
     __tablename__ = "fuel_logs"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_fuel_logs_vehicle_id_fill_date", "vehicle_id", "fill_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     vehicle_id = Column(Integer, ForeignKey("fleet_vehicles.id"), nullable=False)
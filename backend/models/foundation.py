@@ -7,7 +7,7 @@ live in backend.models.extended.
 
 from datetime import date, datetime
 from sqlalchemy import (
-    Boolean, Column, Date, DateTime, ForeignKey, Integer,
+    Boolean, Column, Date, DateTime, ForeignKey, Index, Integer,
     Numeric, String, Text, func, JSON,
 )
 from sqlalchemy.orm import relationship
@@ -77,7 +77,12 @@ class Geofence(TimestampMixin, Base):
 
 class TimeEntry(TimestampMixin, Base):
     __tablename__ = "time_entries"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_time_entries_employee_id_punch_in", "employee_id", "punch_in"),
+        Index("ix_time_entries_project_id_punch_in", "project_id", "punch_in"),
+        Index("ix_time_entries_punch_in", "punch_in"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
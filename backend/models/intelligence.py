@@ -2,7 +2,7 @@
 
 from datetime import date
 from sqlalchemy import (
-    Boolean, Column, Date, DateTime, ForeignKey, Integer,
+    Boolean, Column, Date, DateTime, ForeignKey, Index, Integer,
     Numeric, String, Text, func,
 )
 from sqlalchemy.orm import relationship
@@ -17,7 +17,11 @@ class TimestampMixin:
 class ProfitFadeSnapshot(TimestampMixin, Base):
     """Weekly per-project margin/CPI health snapshot."""
     __tablename__ = "profit_fade_snapshots"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_profit_fade_snapshots_project_id_snapshot_date", "project_id", "snapshot_date"),
+        Index("ix_profit_fade_snapshots_snapshot_date", "snapshot_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -58,7 +62,10 @@ class ProfitFadeSnapshot(TimestampMixin, Base):
 class CashFlowForecast(TimestampMixin, Base):
     """13-week rolling cash flow forecast."""
     __tablename__ = "cash_flow_forecasts"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_cash_flow_forecasts_scenario_forecast_date", "scenario", "forecast_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     forecast_date = Column(Date, nullable=False)
@@ -1,7 +1,7 @@
 """Materials & Inventory models — track materials, stock levels, and transactions."""
 
 from sqlalchemy import (
-    Column, Date, ForeignKey,
+    Column, Date, ForeignKey, Index,
     Integer, Numeric, String, Text,
 )
 from sqlalchemy.orm import relationship
@@ -33,7 +33,10 @@ class MaterialItem(TimestampMixin, Base):
 
 class InventoryEntry(TimestampMixin, Base):
     __tablename__ = "inventory_entries"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_inventory_entries_material_id", "material_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     material_id = Column(Integer, ForeignKey("material_items.id"), nullable=False)
@@ -52,7 +55,12 @@ class InventoryEntry(TimestampMixin, Base):
 
 class MaterialTransaction(TimestampMixin, Base):
     __tablename__ = "material_transactions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_material_transactions_material_id_transaction_date", "material_id", "transaction_date"),
+        Index("ix_material_transactions_project_id_transaction_date", "project_id", "transaction_date"),
+        Index("ix_material_transactions_transaction_date", "transaction_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     material_id = Column(Integer, ForeignKey("material_items.id"), nullable=False)
@@ -2,7 +2,7 @@
 
 from datetime import date
 from sqlalchemy import (
-    Boolean, Column, Date, DateTime, ForeignKey, Integer,
+    Boolean, Column, Date, DateTime, ForeignKey, Index, Integer,
     Numeric, String, Text, func,
 )
 from sqlalchemy.orm import relationship
@@ -16,7 +16,10 @@ class TimestampMixin:
 
 class Permit(TimestampMixin, Base):
     __tablename__ = "permits"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_permits_project_id", "project_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -37,7 +40,12 @@ class Permit(TimestampMixin, Base):
 
 class Inspection(TimestampMixin, Base):
     __tablename__ = "inspections"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_inspections_project_id", "project_id"),
+        Index("ix_inspections_scheduled_date", "scheduled_date"),
+        Index("ix_inspections_permit_id", "permit_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     permit_id = Column(Integer, ForeignKey("permits.id"), nullable=False)
@@ -2,7 +2,7 @@
 
 from datetime import date
 from sqlalchemy import (
-    Boolean, Column, Date, DateTime, ForeignKey, Integer,
+    Boolean, Column, Date, DateTime, ForeignKey, Index, Integer,
     Numeric, String, Text, func,
 )
 from sqlalchemy.orm import relationship
@@ -16,7 +16,12 @@ class TimestampMixin:
 
 class PurchaseOrder(TimestampMixin, Base):
     __tablename__ = "purchase_orders"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_purchase_orders_project_id", "project_id"),
+        Index("ix_purchase_orders_vendor_id", "vendor_id"),
+        Index("ix_purchase_orders_status", "status"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     po_number = Column(String(50), nullable=False)
@@ -43,7 +48,10 @@ class PurchaseOrder(TimestampMixin, Base):
 
 class PurchaseOrderLine(TimestampMixin, Base):
     __tablename__ = "purchase_order_lines"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_purchase_order_lines_po_id", "po_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     po_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
@@ -60,7 +68,10 @@ class PurchaseOrderLine(TimestampMixin, Base):
 
 class DrawRequest(TimestampMixin, Base):
     __tablename__ = "draw_requests"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_draw_requests_project_id", "project_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
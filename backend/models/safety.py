@@ -1,7 +1,7 @@
 """Safety & Compliance models — incidents, toolbox talks, certifications."""
 
 from sqlalchemy import (
-    Boolean, Column, Date, DateTime, ForeignKey,
+    Boolean, Column, Date, DateTime, ForeignKey, Index,
     Integer, String, Text, func,
 )
 from sqlalchemy.orm import relationship
@@ -12,7 +12,12 @@ from backend.models.core import TimestampMixin
 
 class SafetyIncident(TimestampMixin, Base):
     __tablename__ = "safety_incidents"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_safety_incidents_project_id_incident_date", "project_id", "incident_date"),
+        Index("ix_safety_incidents_incident_date", "incident_date"),
+        Index("ix_safety_incidents_status", "status"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -32,7 +37,11 @@ class SafetyIncident(TimestampMixin, Base):
 
 class ToolboxTalk(TimestampMixin, Base):
     __tablename__ = "toolbox_talks"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_toolbox_talks_project_id_conducted_date", "project_id", "conducted_date"),
+        Index("ix_toolbox_talks_conducted_date", "conducted_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -46,7 +55,11 @@ class ToolboxTalk(TimestampMixin, Base):
 
 class Certification(TimestampMixin, Base):
     __tablename__ = "certifications"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_certifications_employee_id_expiry_date", "employee_id", "expiry_date"),
+        Index("ix_certifications_expiry_date", "expiry_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
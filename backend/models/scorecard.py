@@ -1,7 +1,7 @@
 """Employee Scorecard & Incentive Tracker models."""
 
 from sqlalchemy import (
-    Column, Date, DateTime, ForeignKey,
+    Column, Date, DateTime, ForeignKey, Index,
     Integer, Numeric, String, Text, func,
 )
 from sqlalchemy.orm import relationship
@@ -44,7 +44,11 @@ class IncentiveMetric(TimestampMixin, Base):
 
 class EmployeeScore(TimestampMixin, Base):
     __tablename__ = "employee_scores"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_employee_scores_program_id", "program_id"),
+        Index("ix_employee_scores_employee_id", "employee_id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     program_id = Column(Integer, ForeignKey("incentive_programs.id"), nullable=False)
@@ -1,7 +1,7 @@
 """Warranty & Callback Tracker models."""
 
 from sqlalchemy import (
-    Column, Date, ForeignKey, Integer, Numeric, String, Text,
+    Column, Date, ForeignKey, Index, Integer, Numeric, String, Text,
 )
 
 from backend.core.database import Base
@@ -10,7 +10,12 @@ from backend.models.core import TimestampMixin
 
 class WarrantyItem(TimestampMixin, Base):
     __tablename__ = "warranty_items"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_warranty_items_project_id_reported_date", "project_id", "reported_date"),
+        Index("ix_warranty_items_status", "status"),
+        Index("ix_warranty_items_reported_date", "reported_date"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
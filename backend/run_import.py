@@ -10,6 +10,10 @@ Usage:
         --proposals /data/LeadProposals__9_.xlsx \\
         --jobs /data/Open_Jobs_Next_Steps_Quotes.xlsx
 
+    # Re-run a failed full import, skipping steps/tabs it already finished
+    python -m backend.run_import --all --resume full_import_20260219_101500 \\
+        --masterfile /data/SECG_Ultimate_Masterfile.xlsx --budgets /data/budgets/
+
     # Single source import
     python -m backend.run_import --source leads --file /data/Leads__1_.xlsx
 
@@ -48,6 +52,15 @@ def main():
     # Options
     parser.add_argument("--no-schedule", action="store_true",
                          help="Skip schedule import")
+    parser.add_argument("--workers", type=int, default=None,
+                         help="Parallel masterfile tab / budget file workers (default: CPU count)")
+    parser.add_argument("--full", action="store_true",
+                         help="Re-apply masterfile rows even if unchanged since last import")
+    parser.add_argument("--tenant", type=int, default=None,
+                         help="Tenant id of imported masterfile cost events (default: 1)")
+    parser.add_argument("--resume", type=str, metavar="BATCH_ID",
+                         help="With --all: resume a batch, skipping completed work "
+                              "whose source file is unchanged")
     parser.add_argument("--verbose", "-v", action="store_true",
                          help="Enable debug logging")
 
@@ -70,17 +83,25 @@ def main():
             proposals_path=args.proposals,
             jobs_path=args.jobs,
             include_schedule=not args.no_schedule,
+            workers=args.workers,
+            full=args.full,
+            resume=args.resume,
+            tenant_id=args.tenant,
         )
         # Exit with error code if any import had errors
         total_errors = sum(len(r.errors) for r in results.values())
         sys.exit(1 if total_errors > 0 else 0)
 
     elif args.source:
+        if args.resume:
+            parser.error("--resume only applies to --all")
         if not args.file and args.source != "schedule":
             parser.error("--file is required when using --source")
 
         from backend.importers.orchestrator import run_single_import
-        result = run_single_import(args.source, args.file or "")
+        result = run_single_import(args.source, args.file or "",
+                                   workers=args.workers, full=args.full,
+                                   tenant_id=args.tenant)
         sys.exit(1 if result.errors else 0)
 
 
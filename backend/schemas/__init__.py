@@ -4,11 +4,12 @@ All schemas use orm_mode (from_attributes) so they can be built directly
 from SQLAlchemy model instances.
 """
 
+import datetime as dt
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 # ── Base Config ──────────────────────────────────────────────────────────
@@ -237,11 +238,12 @@ class InvoiceOut(OrmBase):
 
 class CostEventOut(OrmBase):
     id: int
-    date: Optional[date] = None
+    # cost_events stores these as event_date / source_type
+    date: Annotated[Optional[dt.date], Field(validation_alias=AliasChoices("date", "event_date"))] = None
     amount: Decimal = Decimal("0")
     description: Optional[str] = None
     reference_number: Optional[str] = None
-    source: Optional[str] = None
+    source: Annotated[Optional[str], Field(validation_alias=AliasChoices("source", "source_type"))] = None
     vendor_id: Optional[int] = None
     project_id: Optional[int] = None
     notes: Optional[str] = None
@@ -336,9 +338,11 @@ class CrewAllocationOut(OrmBase):
 
 class PaginatedResponse(BaseModel):
     total: int
+    total_estimated: bool = False
     page: int
     per_page: int
     pages: int
+    next_cursor: Optional[str] = None
     items: list
 
 
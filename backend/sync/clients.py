@@ -0,0 +1,64 @@
+"""HTTP clients implementing ``incremental.SyncClient``.
+
+- ``HttpSyncClient``: a plain paged JSON feed,
+  ``GET {base_url}/{entity}?since=&page_token=&page_size=`` answering
+  ``{"records": [...], "next_page": ..., "high_water": ...}``. This is the
+  protocol of ``backend.sync.fake_provider`` and of thin provider adapters.
+- ``QuickBooksClient``: the QuickBooks Online query API, paged with
+  STARTPOSITION/MAXRESULTS and filtered on ``MetaData.LastUpdatedTime``.
+
+Both use the standard library only; neither refreshes OAuth tokens.
+"""
+
+import json
+import urllib.parse
+import urllib.request
+from typing import Optional
+
+from backend.sync.incremental import Page
+
+
+class HttpSyncClient:
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _get(self, url: str) -> dict:
+        request = urllib.request.Request(url, headers={"Accept": "application/json"})
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def fetch(self, entity: str, since: Optional[str], page_token: Optional[str],
+              page_size: int) -> Page:
+        params = {"page_size": page_size}
+        if since:
+            params["since"] = since
+        if page_token:
+            params["page_token"] = page_token
+        body = self._get(f"{self.base_url}/{entity}?{urllib.parse.urlencode(params)}")
+        return Page(body.get("records", []), body.get("next_page"), body.get("high_water"))
+
+
+class QuickBooksClient(HttpSyncClient):
+    BASE_URL = "https://quickbooks.api.intuit.com"
+    MINOR_VERSION = "70"
+
+    def __init__(self, realm_id: str, access_token: str, base_url: str = BASE_URL,
+                 timeout: float = 30.0):
+        super().__init__(base_url, access_token, timeout)
+        self.realm_id = realm_id
+
+    def fetch(self, entity: str, since: Optional[str], page_token: Optional[str],
+              page_size: int) -> Page:
+        start = int(page_token or 1)
+        where = f" WHERE MetaData.LastUpdatedTime >= '{since}'" if since else ""
+        query = (f"SELECT * FROM {entity}{where} ORDERBY MetaData.LastUpdatedTime "
+                 f"STARTPOSITION {start} MAXRESULTS {page_size}")
+        params = urllib.parse.urlencode({"query": query, "minorversion": self.MINOR_VERSION})
+        body = self._get(f"{self.base_url}/v3/company/{self.realm_id}/query?{params}")
+        records = body.get("QueryResponse", {}).get(entity, [])
+        next_page = str(start + len(records)) if len(records) == page_size else None
+        return Page(records, next_page)
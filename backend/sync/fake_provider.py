@@ -0,0 +1,149 @@
+"""Local stand-in for an integration provider, for tests and benchmarks.
+
+Serves QuickBooks-shaped records (Vendor, Bill, BillPayment) over the
+``HttpSyncClient`` protocol from memory:
+
+    GET /{entity}?since=&page_token=&page_size=
+
+In the default mode ``since`` is a ``MetaData.LastUpdatedTime`` and the
+answer holds every record modified at or after it, ordered by that time.
+With ``tokens=True`` the provider instead behaves like a change feed:
+``since`` is the token from the previous page's ``high_water``, and only
+records changed after it come back.
+
+``served`` counts the records handed out per entity, so a test can assert
+that a steady-state sync moved only the deltas.
+
+    python -m backend.sync.fake_provider --port 8765 --vendors 200 --bills 2000
+"""
+
+import argparse
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+
+_TZ = timezone(timedelta(hours=-5))
+
+
+class FakeProvider:
+    def __init__(self, tokens: bool = False, start: Optional[datetime] = None):
+        self.tokens = tokens
+        self.clock = start or datetime(2026, 1, 5, 8, 0, tzinfo=_TZ)
+        self.version = 0
+        self.entities: dict[str, dict[str, dict]] = {}
+        self.served: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, entity: str, record: dict) -> dict:
+        """Insert or replace ``record`` (by Id), stamping a new modification."""
+        with self._lock:
+            records = self.entities.setdefault(entity, {})
+            record = dict(record)
+            record.setdefault("Id", str(len(records) + 1))
+            self.clock += timedelta(seconds=1)
+            self.version += 1
+            record["MetaData"] = {"LastUpdatedTime": self.clock.isoformat()}
+            record["SyncToken"] = str(self.version)
+            records[record["Id"]] = record
+            return record
+
+    def update(self, entity: str, record_id: str, **changes) -> dict:
+        return self.put(entity, {**self.entities[entity][record_id], **changes})
+
+    def seed_qbo(self, vendors: int, bills: int, payments: int,
+                 projects: dict[str, list[str]]) -> None:
+        """``projects``: QBO class id → cost code item names."""
+        classes = sorted(projects)
+        for i in range(1, vendors + 1):
+            self.put("Vendor", {"Id": str(i), "DisplayName": f"Vendor {i:05d}",
+                                "PrimaryEmailAddr": {"Address": f"ap{i}@vendor.test"},
+                                "BillAddr": {"City": "Nashville", "CountrySubDivisionCode": "TN"}})
+        for i in range(1, bills + 1):
+            class_id = classes[i % len(classes)]
+            codes = projects[class_id]
+            self.put("Bill", {
+                "Id": str(i), "DocNumber": f"B-{i:06d}", "TxnDate": "2026-01-05",
+                "TotalAmt": round(100 + i * 1.37, 2), "VendorRef": {"value": str(1 + i % vendors)},
+                "Line": [{"Id": "1", "Amount": round(100 + i * 1.37, 2),
+                          "ItemBasedExpenseLineDetail": {"ClassRef": {"value": class_id},
+                                                         "ItemRef": {"name": codes[i % len(codes)]}}}],
+            })
+        for i in range(1, payments + 1):
+            self.put("BillPayment", {"Id": str(i), "TxnDate": "2026-01-06", "PayType": "Check",
+                                     "DocNumber": str(5000 + i), "TotalAmt": round(50 + i * 0.5, 2),
+                                     "VendorRef": {"value": str(1 + i % vendors)}})
+
+    def page(self, entity: str, since: Optional[str], page_token: Optional[str],
+             page_size: int) -> dict:
+        with self._lock:
+            records = list(self.entities.get(entity, {}).values())
+            if self.tokens:
+                after = int(since or 0)
+                records = sorted((r for r in records if int(r["SyncToken"]) > after),
+                                 key=lambda r: int(r["SyncToken"]))
+            else:
+                if since:
+                    floor = datetime.fromisoformat(since)
+                    records = [r for r in records
+                               if datetime.fromisoformat(r["MetaData"]["LastUpdatedTime"]) >= floor]
+                records.sort(key=lambda r: (r["MetaData"]["LastUpdatedTime"], int(r["Id"])))
+            start = int(page_token or 0)
+            chunk = records[start:start + page_size]
+            self.served[entity] = self.served.get(entity, 0) + len(chunk)
+        body = {"records": chunk,
+                "next_page": str(start + page_size) if start + page_size < len(records) else None}
+        if self.tokens:
+            body["high_water"] = chunk[-1]["SyncToken"] if chunk else since
+        return body
+
+
+def serve(provider: FakeProvider, port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Serve ``provider`` on a background thread; returns (server, base URL)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            body = provider.page(url.path.strip("/"), params.get("since"),
+                                 params.get("page_token"), int(params.get("page_size", 500)))
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):   # keep test output quiet
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve a fake QuickBooks-shaped provider")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vendors", type=int, default=200)
+    parser.add_argument("--bills", type=int, default=2000)
+    parser.add_argument("--payments", type=int, default=500)
+    parser.add_argument("--tokens", action="store_true", help="change-token mode")
+    args = parser.parse_args()
+
+    provider = FakeProvider(tokens=args.tokens)
+    provider.seed_qbo(args.vendors, args.bills, args.payments, {"100": ["01-100", "02-200"]})
+    server, url = serve(provider, args.port)
+    print(f"Fake provider on {url} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
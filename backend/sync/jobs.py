@@ -1,9 +1,15 @@
+import logging
 from datetime import datetime, timezone
 from typing import Callable
 
 from sqlalchemy.orm import Session
 
-from backend.models.extended import ExceptionItem, SystemEvent
+from backend.core import events, rollups
+from backend.core.database import SessionLocal
+from backend.models.extended import ExceptionItem, Integration, SyncLog, SystemEvent
+
+
+logger = logging.getLogger("secg.sync")
 
 
 def sync_with_error_handling(
@@ -13,30 +19,40 @@ def sync_with_error_handling(
     integration_id: int | None,
     sync_name: str,
     sync_function: Callable[[], int],
+    publish_events: bool = True,
 ) -> dict:
     """Run a sync function and normalize failure handling.
 
-    sync_function should return number of processed records.
+    sync_function should return number of processed records. With an
+    integration_id the run is recorded in sync_logs (duration and
+    records/sec derive from its timestamps) and on the integration.
+    publish_events=False skips the integration.sync_* system events (for
+    internal jobs that no outbox handler needs to hear about).
     """
     started_at = datetime.now(tz=timezone.utc)
     try:
         records_processed = sync_function()
-        db.add(
-            SystemEvent(
-                tenant_id=tenant_id,
-                event_type="integration.sync_succeeded",
-                source_type="integration",
-                source_id=integration_id or 0,
-                payload=(
-                    f'{{"sync_name":"{sync_name}","records_processed":{records_processed},'
-                    f'"started_at":"{started_at.isoformat()}"}}'
-                ),
-                processed=False,
+        _record_run(db, integration_id, sync_name, started_at, "success",
+                    records_processed=records_processed)
+        if publish_events:
+            db.add(
+                SystemEvent(
+                    tenant_id=tenant_id,
+                    event_type="integration.sync_succeeded",
+                    source_type="integration",
+                    source_id=integration_id or 0,
+                    payload={
+                        "sync_name": sync_name,
+                        "records_processed": records_processed,
+                        "started_at": started_at.isoformat(),
+                    },
+                    processed=False,
+                )
             )
-        )
         db.commit()
         return {"status": "success", "records_processed": records_processed}
     except Exception as exc:  # noqa: BLE001 - centralized failure handling path
+        _record_run(db, integration_id, sync_name, started_at, "failed", error=str(exc))
         db.add(
             ExceptionItem(
                 tenant_id=tenant_id,
@@ -48,15 +64,77 @@ def sync_with_error_handling(
                 status="open",
             )
         )
-        db.add(
-            SystemEvent(
-                tenant_id=tenant_id,
-                event_type="integration.sync_failed",
-                source_type="integration",
-                source_id=integration_id or 0,
-                payload=f'{{"sync_name":"{sync_name}","error":"{str(exc)}"}}',
-                processed=False,
+        if publish_events:
+            db.add(
+                SystemEvent(
+                    tenant_id=tenant_id,
+                    event_type="integration.sync_failed",
+                    source_type="integration",
+                    source_id=integration_id or 0,
+                    payload={"sync_name": sync_name, "error": str(exc)},
+                    processed=False,
+                )
             )
-        )
         db.commit()
         return {"status": "failed", "error": str(exc)}
+
+
+def _record_run(
+    db: Session,
+    integration_id: int | None,
+    sync_name: str,
+    started_at: datetime,
+    status: str,
+    *,
+    records_processed: int | None = None,
+    error: str | None = None,
+) -> None:
+    if integration_id is None:
+        return
+    completed_at = datetime.now(tz=timezone.utc)
+    db.add(
+        SyncLog(
+            integration_id=integration_id,
+            direction="inbound",
+            entity_type=sync_name,
+            records_processed=records_processed or 0,
+            records_failed=0 if status == "success" else None,
+            started_at=started_at.replace(tzinfo=None),
+            completed_at=completed_at.replace(tzinfo=None),
+            status=status,
+            error_details=error,
+        )
+    )
+    integration = db.get(Integration, integration_id)
+    if integration is not None:
+        integration.last_sync_at = completed_at.replace(tzinfo=None)
+        integration.last_sync_status = status
+        integration.error_message = error
+
+
+def check_kpi_rollups() -> dict:
+    """Compare every tenant's KPI rollups with a full recompute, repair any
+    drift (seeding metrics never rolled up) and prune expired days."""
+    db = SessionLocal()
+    try:
+        report = {}
+        for tenant_id in rollups.tenants(db):
+            for metric, problems in rollups.check(db, tenant_id, repair=True).items():
+                if problems:
+                    logger.warning("KPI rollup %s of tenant %s drifted (%d rows), repaired: %s",
+                                   metric, tenant_id, len(problems), "; ".join(problems[:5]))
+                report[(tenant_id, metric)] = problems
+        rollups.prune(db)
+        db.commit()
+        return report
+    finally:
+        db.close()
+
+
+def prune_system_events() -> int:
+    """Delete processed system events past EVENT_RETENTION_DAYS."""
+    db = SessionLocal()
+    try:
+        return events.prune(db)
+    finally:
+        db.close()
@@ -0,0 +1,96 @@
+"""QuickBooks Online entities pulled by the incremental sync.
+
+- Vendor → ``vendors`` on ``qb_vendor_id``.
+- Bill → one ``cost_events`` row per bill on ``qb_sync_id = "bill:{Id}"``.
+  The project comes from the first line whose ClassRef matches a
+  project's ``qb_class_id`` (classes track jobs), and the cost code from
+  that line's ItemRef name within the project.
+- BillPayment → ``payments`` on ``qb_txn_id = "billpayment:{Id}"``.
+
+``ENTITIES`` is in dependency order: vendors before what references them.
+"""
+
+from typing import Optional
+
+from backend.importers.coerce import to_currency, to_date, to_string
+from backend.models.core import CostCode, Payment, PaymentMethod, Project, Vendor
+from backend.models.extended import CostEvent
+from backend.sync.incremental import EntitySpec, Refs
+
+
+DEFAULT_TENANT = 1
+
+_PAY_TYPES = {"Check": PaymentMethod.check, "CreditCard": PaymentMethod.credit_card}
+
+
+def _modified(record: dict) -> str:
+    return record["MetaData"]["LastUpdatedTime"]
+
+
+def _ref(record: dict, name: str) -> Optional[str]:
+    return (record.get(name) or {}).get("value")
+
+
+def _vendor(r: dict, refs: Refs) -> dict:
+    address = r.get("BillAddr") or {}
+    return {
+        "name": to_string(r.get("DisplayName"), 200),
+        "contact_name": to_string(" ".join(filter(None, (r.get("GivenName"), r.get("FamilyName")))), 200),
+        "email": to_string((r.get("PrimaryEmailAddr") or {}).get("Address"), 200),
+        "phone": to_string((r.get("PrimaryPhone") or {}).get("FreeFormNumber"), 50),
+        "address": to_string(address.get("Line1"), 1000),
+        "city": to_string(address.get("City"), 100),
+        "state": to_string(address.get("CountrySubDivisionCode"), 2),
+        "zip_code": to_string(address.get("PostalCode"), 10),
+    }
+
+
+def _line_detail(line: dict) -> dict:
+    return (line.get("AccountBasedExpenseLineDetail")
+            or line.get("ItemBasedExpenseLineDetail") or {})
+
+
+def _bill(r: dict, refs: Refs) -> Optional[dict]:
+    for line in r.get("Line", []):
+        detail = _line_detail(line)
+        project_id = refs.get(Project.qb_class_id, _ref(detail, "ClassRef"))
+        if project_id is None:
+            continue
+        item = (detail.get("ItemRef") or {}).get("name")
+        cost_code_id = refs.get((CostCode.project_id, CostCode.code), (project_id, item))
+        if cost_code_id is None:
+            continue
+        return {
+            "tenant_id": DEFAULT_TENANT,
+            "project_id": project_id,
+            "cost_code_id": cost_code_id,
+            "vendor_id": refs.get(Vendor.qb_vendor_id, _ref(r, "VendorRef")),
+            "event_type": "bill",
+            "event_date": to_date(r.get("TxnDate")),
+            "amount": to_currency(r.get("TotalAmt")),
+            "description": to_string(r.get("PrivateNote") or r.get("DocNumber"), 500),
+            "source_type": "quickbooks",
+            "qb_synced": True,
+        }
+    return None
+
+
+def _payment(r: dict, refs: Refs) -> dict:
+    return {
+        "vendor_id": refs.get(Vendor.qb_vendor_id, _ref(r, "VendorRef")),
+        "date": to_date(r.get("TxnDate")),
+        "amount": to_currency(r.get("TotalAmt")),
+        "method": _PAY_TYPES.get(r.get("PayType"), PaymentMethod.other),
+        "reference_number": to_string(r.get("DocNumber"), 100),
+    }
+
+
+VENDORS = EntitySpec("qbo_vendors", "Vendor", Vendor, "qb_vendor_id",
+                     key=lambda r: str(r["Id"]), values=_vendor, modified=_modified)
+BILLS = EntitySpec("qbo_bills", "Bill", CostEvent, "qb_sync_id",
+                   key=lambda r: f"bill:{r['Id']}", values=_bill, modified=_modified)
+BILL_PAYMENTS = EntitySpec("qbo_payments", "BillPayment", Payment, "qb_txn_id",
+                           key=lambda r: f"billpayment:{r['Id']}", values=_payment,
+                           modified=_modified)
+
+ENTITIES = {spec.name: spec for spec in (VENDORS, BILLS, BILL_PAYMENTS)}
@@ -1,31 +1,175 @@
+"""Recurring sync jobs and the APScheduler instance that runs them.
+
+The scheduler runs only in the sync worker (``python -m backend.sync.worker``),
+never in the API processes, and only in the worker holding the leader lease.
+
+Each job type gets its own bounded thread pool (``POOLS``), so a slow QBO
+pull can't starve Plaid or the nightly snapshot. Every job runs at most
+one instance at a time: a run that comes due while the previous one is
+still going is skipped, runs missed while the worker was down are
+coalesced into one, and a run later than ``SCHEDULER_MISFIRE_GRACE``
+seconds is dropped until its next slot.
+
+Runs go through ``sync_with_error_handling`` and are recorded in
+``sync_logs`` against the provider's ``integrations`` row. A scheduler
+started with a ``guard`` calls it before every run and skips the run if
+it returns False (the worker checks it still holds the leader lease).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Optional
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models.extended import Integration
+from backend.sync.jobs import check_kpi_rollups, prune_system_events, sync_with_error_handling
 
-scheduler = BackgroundScheduler(timezone="UTC")
 
+logger = logging.getLogger("secg.sync")
 
-def register_sync_jobs() -> None:
-    """Register recurring integration sync jobs.
+DEFAULT_TENANT = 1
+INTERNAL = "internal"   # provider of jobs that don't talk to an outside system
 
-    Concrete sync functions are wired in follow-up slices.
-    """
-    scheduler.add_job(lambda: None, "interval", hours=4, id="qbo_vendors")
-    scheduler.add_job(lambda: None, "interval", hours=2, id="qbo_bills")
-    scheduler.add_job(lambda: None, "interval", hours=2, id="qbo_invoices")
-    scheduler.add_job(lambda: None, "interval", hours=2, id="qbo_payments")
+# Job type (executor) → worker threads
+POOLS = {
+    "qbo": 2,
+    "gusto": 1,
+    "plaid": 2,
+    "weather": 1,
+    "snapshots": 1,
+    "maintenance": 1,
+}
+
+
+@dataclass(frozen=True)
+class SyncJob:
+    """``fn`` returns the number of records processed; None = not wired yet."""
+
+    id: str
+    pool: str
+    provider: str
+    trigger: str
+    schedule: dict = field(default_factory=dict)
+    fn: Optional[Callable[[], int]] = None
+
+
+JOBS = (
+    SyncJob("qbo_vendors", "qbo", "qbo", "interval", {"hours": 4}),
+    SyncJob("qbo_bills", "qbo", "qbo", "interval", {"hours": 2}),
+    SyncJob("qbo_invoices", "qbo", "qbo", "interval", {"hours": 2}),
+    SyncJob("qbo_payments", "qbo", "qbo", "interval", {"hours": 2}),
+
+    SyncJob("gusto_employees", "gusto", "gusto", "cron", {"hour": 0}),
+    SyncJob("gusto_payroll", "gusto", "gusto", "cron", {"hour": 6}),
+
+    SyncJob("plaid_transactions", "plaid", "plaid", "interval", {"hours": 6}),
+    SyncJob("plaid_balance", "plaid", "plaid", "interval", {"hours": 2}),
+
+    SyncJob("weather", "weather", "weather", "cron", {"hour": 5}),
+    SyncJob("daily_snapshot", "snapshots", INTERNAL, "cron", {"hour": 23, "minute": 59}),
+    SyncJob("weekly_snapshot", "snapshots", INTERNAL, "cron", {"day_of_week": "fri", "hour": 18}),
+    SyncJob("kpi_rollup_check", "maintenance", INTERNAL, "cron", {"hour": 1},
+            fn=lambda: len(check_kpi_rollups())),
+    SyncJob("prune_system_events", "maintenance", INTERNAL, "cron", {"hour": 2},
+            fn=prune_system_events),
+)
 
-    scheduler.add_job(lambda: None, "cron", hour=0, id="gusto_employees")
-    scheduler.add_job(lambda: None, "cron", hour=6, id="gusto_payroll")
 
-    scheduler.add_job(lambda: None, "interval", hours=6, id="plaid_transactions")
-    scheduler.add_job(lambda: None, "interval", hours=2, id="plaid_balance")
+# Ids of the jobs running in this process
+_running: set = set()
+_running_lock = Lock()
 
-    scheduler.add_job(lambda: None, "cron", hour=5, id="weather")
-    scheduler.add_job(lambda: None, "cron", hour=23, minute=59, id="daily_snapshot")
-    scheduler.add_job(lambda: None, "cron", day_of_week="fri", hour=18, id="weekly_snapshot")
+
+def running_jobs() -> set:
+    with _running_lock:
+        return set(_running)
+
+
+def _integration_id(db, provider: str) -> int:
+    integration = (
+        db.query(Integration)
+        .filter(Integration.tenant_id == DEFAULT_TENANT, Integration.provider == provider)
+        .first()
+    )
+    if integration is None:
+        integration = Integration(tenant_id=DEFAULT_TENANT, provider=provider,
+                                  status="active" if provider == INTERNAL else "disconnected")
+        db.add(integration)
+        db.commit()   # before the job runs: some jobs write on their own session
+    return integration.id
+
+
+def run_job(job: SyncJob, guard: Optional[Callable[[], bool]] = None) -> dict:
+    """Run ``job`` once and record it in sync_logs, unless ``guard()`` is False."""
+    if job.fn is None:
+        logger.debug("Sync job %s is not wired yet", job.id)
+        return {"status": "skipped"}
+    with _running_lock:
+        _running.add(job.id)
+    db = SessionLocal()
+    try:
+        if guard is not None and not guard():
+            logger.warning("Sync job %s skipped: this worker is no longer the leader", job.id)
+            return {"status": "skipped"}
+        result = sync_with_error_handling(
+            db,
+            tenant_id=DEFAULT_TENANT,
+            integration_id=_integration_id(db, job.provider),
+            sync_name=job.id,
+            sync_function=job.fn,
+            publish_events=job.provider != INTERNAL,
+        )
+        logger.info("Sync job %s: %s", job.id, result)
+        return result
+    finally:
+        db.close()
+        with _running_lock:
+            _running.discard(job.id)
+
+
+def _on_skipped(event) -> None:
+    if event.code == EVENT_JOB_MAX_INSTANCES:
+        logger.warning("Sync job %s still running; skipped the run due %s",
+                       event.job_id, event.scheduled_run_times[-1])
+    else:
+        logger.warning("Sync job %s missed its %s run by more than the grace time",
+                       event.job_id, event.scheduled_run_time)
+
+
+def build_scheduler() -> BackgroundScheduler:
+    scheduler = BackgroundScheduler(
+        executors={name: ThreadPoolExecutor(size) for name, size in POOLS.items()},
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": settings.scheduler_misfire_grace,
+        },
+        timezone="UTC",
+    )
+    scheduler.add_listener(_on_skipped, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+    return scheduler
+
+
+def register_sync_jobs(scheduler: BackgroundScheduler,
+                       guard: Optional[Callable[[], bool]] = None) -> None:
+    """Register recurring integration sync jobs.
+
+    Concrete sync functions are wired in follow-up slices.
+    """
+    for job in JOBS:
+        scheduler.add_job(run_job, job.trigger, args=(job, guard), id=job.id, executor=job.pool,
+                          replace_existing=True, **job.schedule)
 
 
-def start_scheduler() -> None:
-    if not scheduler.running:
-        register_sync_jobs()
-        scheduler.start()
+def start_scheduler(guard: Optional[Callable[[], bool]] = None) -> BackgroundScheduler:
+    """A new scheduler with every job registered, started."""
+    scheduler = build_scheduler()
+    register_sync_jobs(scheduler, guard)
+    scheduler.start()
+    return scheduler
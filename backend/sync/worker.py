@@ -0,0 +1,160 @@
+"""Sync worker process: ``python -m backend.sync.worker``.
+
+Runs the recurring jobs of ``backend.sync.scheduler`` outside the API, so
+they aren't repeated in every uvicorn worker. Any number of sync workers
+may be started; they elect a leader through the ``scheduler_leases`` row:
+
+- The leader holds the lease for ``SCHEDULER_LEASE_TTL`` seconds and renews
+  it every third of that. Only the leader runs a scheduler.
+- A standby retries on the same cadence and takes over once the lease
+  expires (the leader stopped or lost the database), so at most one
+  scheduler runs provided host clocks agree to within the TTL.
+- Before every run the job checks that this worker still holds the lease,
+  so a scheduler left running after a takeover starts nothing.
+- A leader that fails to renew stops its scheduler without waiting for
+  running jobs and goes back to standby. On SIGTERM/SIGINT it stops
+  scheduling, keeps renewing the lease while running jobs finish, then
+  releases it.
+"""
+
+import logging
+import os
+import signal
+import socket
+import time
+from datetime import datetime, timedelta
+from threading import Event
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models.extended import SchedulerLease
+from backend.sync.scheduler import running_jobs, start_scheduler
+
+
+logger = logging.getLogger("secg.sync")
+
+LEASE = "sync-scheduler"
+
+
+def acquire(holder: str, ttl: float, name: str = LEASE) -> bool:
+    """Take or renew the ``name`` lease for ``holder``; False if another
+    holder's lease is still live."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    db = SessionLocal()
+    try:
+        taken = db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name,
+                   or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+            .values(holder=holder, expires_at=expires_at)
+        ).rowcount
+        if not taken:
+            if db.query(SchedulerLease.id).filter(SchedulerLease.name == name).first():
+                db.rollback()
+                return False
+            db.add(SchedulerLease(name=name, holder=holder, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:   # another worker created the row first
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def holds(holder: str, name: str = LEASE) -> bool:
+    """Whether ``holder`` has a live ``name`` lease."""
+    db = SessionLocal()
+    try:
+        return db.query(SchedulerLease.id).filter(
+            SchedulerLease.name == name, SchedulerLease.holder == holder,
+            SchedulerLease.expires_at > datetime.utcnow(),
+        ).first() is not None
+    finally:
+        db.close()
+
+
+def _drain(holder: str, ttl: float, interval: float) -> bool:
+    """Renew the lease until this process's running jobs finish; False if it was lost."""
+    renewed = time.monotonic()
+    while running_jobs():
+        if time.monotonic() - renewed >= interval:
+            if not acquire(holder, ttl):
+                return False
+            renewed = time.monotonic()
+        time.sleep(1)
+    return True
+
+
+def release(holder: str, name: str = LEASE) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            .values(expires_at=datetime.utcnow())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(stop: Event, holder: str) -> None:
+    """Alternate between standby and leading until ``stop`` is set."""
+    ttl = settings.scheduler_lease_ttl
+    interval = ttl / 3
+    while not stop.is_set():
+        try:
+            leader = acquire(holder, ttl)
+        except Exception:
+            logger.exception("Leader lease check failed")
+            leader = False
+        if not leader:
+            stop.wait(interval)
+            continue
+
+        logger.info("%s is the sync leader; starting scheduler", holder)
+        scheduler = start_scheduler(guard=lambda: holds(holder))
+        lost = False
+        try:
+            while not stop.wait(interval):
+                try:
+                    if acquire(holder, ttl):
+                        continue
+                    logger.warning("%s lost the sync leader lease", holder)
+                except Exception:
+                    logger.exception("Leader lease renewal failed")
+                lost = True
+                break
+        finally:
+            # Don't wait for running jobs: the lease may expire meanwhile
+            scheduler.shutdown(wait=False)
+            try:
+                if not lost and not _drain(holder, ttl, interval):
+                    logger.warning("%s lost the sync leader lease while jobs finished", holder)
+                release(holder)
+            except Exception:
+                logger.exception("Leader lease release failed")
+        logger.info("%s stopped its scheduler", holder)
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    import backend.main  # noqa: F401 — registers every model
+    from backend.core.database import Base, engine
+    Base.metadata.create_all(bind=engine)
+
+    stop = Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    run(stop, f"{socket.gethostname()}:{os.getpid()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -504,9 +504,34 @@ export default function Layout() {
     api.myNotifications({ limit: 20 })
       .then(data => { if (data?.length) setNotifications(data); else setNotifications(demoNotifs); })
       .catch(() => setNotifications(demoNotifs));
-    api.unreadCount()
-      .then(r => setUnreadCount(r?.count ?? 0))
-      .catch(() => setUnreadCount(3));
+  }, []);
+
+  // Live notifications: the server pushes new items and unread-count changes
+  useEffect(() => {
+    const source = api.notificationStream();
+    const count = (data) => { if (data.unread_count != null) setUnreadCount(data.unread_count); };
+    source.addEventListener('unread', (e) => count(JSON.parse(e.data)));
+    source.addEventListener('notification', (e) => {
+      const n = JSON.parse(e.data);
+      setNotifications(prev => [{ ...n, link: n.action_url }, ...prev.filter(x => x.id !== n.id)].slice(0, 20));
+      count(n);
+    });
+    source.addEventListener('read', (e) => {
+      const data = JSON.parse(e.data);
+      setNotifications(prev => prev.map(x => data.ids.includes(x.id) ? { ...x, is_read: true } : x));
+      count(data);
+    });
+    source.addEventListener('read_all', (e) => {
+      setNotifications(prev => prev.map(x => ({ ...x, is_read: true })));
+      count(JSON.parse(e.data));
+    });
+    // Events were dropped; reload the list (the stream reconnects with a fresh count)
+    source.addEventListener('resync', () => {
+      api.myNotifications({ limit: 20 })
+        .then(data => { if (data?.length) setNotifications(data); })
+        .catch(() => {});
+    });
+    return () => source.close();
   }, []);
 
   // Click outside for notif
@@ -270,13 +270,15 @@ export const api = {
   morningBriefing: () => request('/briefing/today'),
 
   // Notifications (Phase 0 — real bell icon)
-  unreadCount: (userId) => request(`/notifications/unread-count${userId ? `?user_id=${userId}` : ''}`),
+  unreadCount: (recipientId) => request(`/notifications/unread-count${recipientId ? `?recipient_id=${recipientId}` : ''}`),
+  // Server-sent events: unread, notification, read, read_all, resync (see backend/core/realtime.py)
+  notificationStream: (recipientId) => new EventSource(`${BASE}/notifications/stream${recipientId ? `?recipient_id=${recipientId}` : ''}`),
   myNotifications: (params = {}) => {
     const q = new URLSearchParams(params).toString();
     return request(`/notifications${q ? '?' + q : ''}`);
   },
   markNotificationRead: (id) => request(`/notifications/${id}/read`, { method: 'POST' }),
-  markAllRead: (userId) => request(`/notifications/read-all${userId ? `?user_id=${encodeURIComponent(userId)}` : ''}`, { method: 'POST' }),
+  markAllRead: (recipientId) => request(`/notifications/read-all${recipientId ? `?recipient_id=${recipientId}` : ''}`, { method: 'POST' }),
 
   // Exception Queue (Phase 0)
   exceptions: (params = {}) => {
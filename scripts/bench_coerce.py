@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for importer cell coercion.
+
+Compares cells/sec of three ways to convert a TXN LOG-shaped tab:
+- legacy:  the original clean_* implementations (kept here as reference)
+- helpers: BaseImporter.clean_* (now backed by backend.importers.coerce)
+- coercer: a RowCoercer compiled from the first chunk
+
+Every strategy must produce identical values; a mismatch fails the run.
+
+Usage:
+    python scripts/bench_coerce.py                      # synthetic rows
+    python scripts/bench_coerce.py --rows 50000 --strings
+    python scripts/bench_coerce.py --xlsx Masterfile.xlsx --tab "TXN LOG"
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend.importers.coerce import RowCoercer
+
+# TXN LOG columns as the importer reads them
+COLUMNS = {0: "date", 6: "currency", 8: "string", 4: "string", 1: "string",
+           5: ("string", 500), 10: "string", 14: "string", 9: "string"}
+
+
+# ── Reference implementations (pre-coerce BaseImporter.clean_*) ─────────
+
+def legacy_currency(value):
+    if value is None or value == "":
+        return Decimal("0")
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, Decimal):
+        return value
+    s = str(value).strip().replace("$", "").replace(",", "").replace(" ", "")
+    if s == "" or s == "-":
+        return Decimal("0")
+    try:
+        return Decimal(s)
+    except InvalidOperation:
+        return Decimal("0")
+
+
+def legacy_string(value, max_length=300):
+    if value is None:
+        return None
+    s = str(value).strip()
+    if s == "" or s.lower() == "none":
+        return None
+    return s[:max_length]
+
+
+def legacy_date(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date() if hasattr(value, "date") else value
+    s = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _val(row, idx):
+    if row is None or idx >= len(row) or idx < 0:
+        return None
+    v = row[idx]
+    if isinstance(v, str) and v.startswith("="):
+        return None
+    return v
+
+
+def _convert(row, funcs):
+    out = []
+    for idx, kind in COLUMNS.items():
+        if isinstance(kind, tuple):
+            out.append(funcs["string"](_val(row, idx), kind[1]))
+        else:
+            out.append(funcs[kind](_val(row, idx)))
+    return out
+
+
+# ── Inputs ───────────────────────────────────────────────────────────────
+
+def synthetic_rows(n: int, strings: bool) -> list[tuple]:
+    """TXN LOG-like rows; ``strings`` makes dates/amounts text (CSV-style)."""
+    rnd = random.Random(42)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(n):
+        d = start + timedelta(days=rnd.randrange(400))
+        amt = round(rnd.uniform(-5000, 5000), 2)
+        rows.append((
+            d.strftime("%m/%d/%Y") if strings else d,
+            rnd.choice(["Ramp", "QBO", "Lowes", "Manual"]), "Expense", "Checking",
+            f"Vendor {rnd.randrange(300)}", f"Memo for txn {i}",
+            f"${amt:,.2f}" if strings else amt,
+            "Construction", f"Project {rnd.randrange(40)}", "Materials",
+            f"REF-{i}", "Card", None, None, f"PO{i}" if i % 3 else None,
+            "=IF(A2>0,1,0)",
+        ))
+    return rows
+
+
+def workbook_rows(path: str, tab: str, start: int = 1) -> list[tuple]:
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(islice(wb[tab].iter_rows(values_only=True), start, None))
+    finally:
+        wb.close()
+
+
+# ── Runner ───────────────────────────────────────────────────────────────
+
+def bench(name, fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(row) for row in rows]
+        best = min(best, time.perf_counter() - t0)
+    cells = len(rows) * len(COLUMNS)
+    print(f"  {name:8s} {cells / best:>14,.0f} cells/s  ({best * 1000:.1f} ms)")
+    return out, cells / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--strings", action="store_true",
+                        help="synthetic dates/amounts as text instead of native values")
+    parser.add_argument("--xlsx", help="benchmark a real workbook tab instead")
+    parser.add_argument("--tab", default="TXN LOG")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from backend.importers.base import BaseImporter
+    rows = workbook_rows(args.xlsx, args.tab) if args.xlsx else \
+        synthetic_rows(args.rows, args.strings)
+    print(f"{len(rows)} rows x {len(COLUMNS)} columns")
+
+    legacy = {"currency": legacy_currency, "string": legacy_string, "date": legacy_date}
+    helpers = {"currency": BaseImporter.clean_currency, "string": BaseImporter.clean_string,
+               "date": BaseImporter.clean_date}
+    coerce = RowCoercer(COLUMNS, rows[:1000])
+
+    base, base_rate = bench("legacy", lambda r: _convert(r, legacy), rows, args.repeat)
+    results = [
+        ("helpers",) + bench("helpers", lambda r: _convert(r, helpers), rows, args.repeat),
+        ("coercer",) + bench("coercer", coerce, rows, args.repeat),
+    ]
+
+    ok = True
+    for name, out, rate in results:
+        same = out == base
+        ok = ok and same
+        print(f"  {name}: {rate / base_rate:.2f}x legacy, "
+              f"{'identical output' if same else 'OUTPUT MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
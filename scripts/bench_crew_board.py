@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark for the calendar crew board.
+
+Seeds a throwaway SQLite database with active employees and a week of
+events (each with a few attendees), then times:
+- legacy: the original per-employee × per-day scan over every event, with
+  attendees lazy-loaded per event (kept here as reference)
+- crew_board: backend.api.calendar.crew_board (one joined query, one pass)
+
+Both must return identical boards; a mismatch fails the run.
+
+Usage:
+    python scripts/bench_crew_board.py                      # 100 × 2,000
+    python scripts/bench_crew_board.py --employees 250 --events 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+WEEK = date(2026, 3, 2)   # a Monday
+
+
+def seed(session, employees: int, events: int, attendees: int) -> None:
+    from backend.models.calendar import CalendarAttendee, CalendarEvent
+    from backend.models.core import Employee
+
+    rnd = random.Random(5)
+    session.add_all(
+        Employee(first_name=f"Emp{i:04d}", last_name="Crew", role="Carpenter", is_active=True)
+        for i in range(employees)
+    )
+    session.flush()
+    ids = [e.id for e in session.query(Employee.id)]
+    for i in range(events):
+        start = datetime.combine(WEEK + timedelta(days=rnd.randrange(7)), datetime.min.time())
+        event = CalendarEvent(
+            title=f"Event {i}", event_type=rnd.choice(["site_visit", "inspection", "meeting"]),
+            start_datetime=start + timedelta(hours=rnd.randrange(6, 18)),
+            created_by=rnd.choice(ids), color="#336699",
+        )
+        event.attendees = [CalendarAttendee(employee_id=e) for e in rnd.sample(ids, attendees)]
+        session.add(event)
+    session.commit()
+
+
+def legacy_board(db, week_start: date) -> list:
+    """The pre-batching crew_board body."""
+    from backend.models.calendar import CalendarEvent
+    from backend.models.core import Employee
+
+    week_end = week_start + timedelta(days=6)
+    employees = db.query(Employee).filter(Employee.is_active == True).order_by(Employee.first_name).all()  # noqa: E712
+    events = (
+        db.query(CalendarEvent)
+        .filter(
+            CalendarEvent.start_datetime >= datetime.combine(week_start, datetime.min.time()),
+            CalendarEvent.start_datetime <= datetime.combine(week_end, datetime.max.time()),
+        )
+        .all()
+    )
+    result = []
+    for emp in employees:
+        days = {}
+        for i in range(7):
+            day = week_start + timedelta(days=i)
+            days[day.isoformat()] = [
+                {"id": e.id, "title": e.title, "event_type": e.event_type,
+                 "project_id": e.project_id, "color": e.color}
+                for e in events
+                if e.start_datetime.date() == day
+                and (e.created_by == emp.id or any(a.employee_id == emp.id for a in e.attendees))
+            ]
+        result.append({"employee_id": emp.id, "name": f"{emp.first_name} {emp.last_name}",
+                       "role": emp.role, "days": days})
+    return result
+
+
+def normalized(board: list) -> list:
+    """Boards with each day's events in id order (legacy order is unspecified)."""
+    return [
+        {**row, "days": {d: sorted(evs, key=lambda e: e["id"]) for d, evs in row["days"].items()}}
+        for row in board
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--attendees", type=int, default=3, help="attendees per event")
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}"
+    try:
+        from sqlalchemy import event
+
+        import backend.main  # noqa: F401 — registers every model
+        from backend.api.calendar import crew_board
+        from backend.core.database import Base, SessionLocal, engine
+
+        Base.metadata.create_all(bind=engine)
+        session = SessionLocal()
+        seed(session, args.employees, args.events, args.attendees)
+        print(f"{args.employees} employees, {args.events} events × {args.attendees} attendees")
+
+        queries = [0]
+        event.listen(engine, "before_cursor_execute", lambda *a: queries.__setitem__(0, queries[0] + 1))
+        results = {}
+        for name, fn in (("legacy", lambda: legacy_board(session, WEEK)),
+                         ("crew_board", lambda: crew_board(week=WEEK.isoformat(), weeks=1, db=session))):
+            session.expunge_all()   # cold identity map, as in a fresh request
+            queries[0] = 0
+            t0 = time.perf_counter()
+            results[name] = fn()
+            elapsed = time.perf_counter() - t0
+            print(f"  {name:10s} {elapsed * 1000:>9.1f} ms  {queries[0]:>6} queries")
+
+        same = normalized(results["legacy"]) == normalized(results["crew_board"])
+        print(f"  identical boards: {'yes' if same else 'NO'}")
+        session.close()
+        engine.dispose()
+        return 0 if same else 1
+    finally:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
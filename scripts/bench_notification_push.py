@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Benchmark / check for pushed notifications (GET /api/notifications/stream).
+
+Serves the API with uvicorn on a throwaway SQLite database, opens many idle
+server-sent-event streams spread over a set of recipients, then:
+
+- publishes document events and drains the outbox, which creates one
+  notification per event for every recipient (one active rule);
+- marks one recipient's notifications read.
+
+Reports connect time, memory per idle stream, and how long until every
+stream has seen every notification. Fails if any stream misses an event or
+ends with the wrong unread_count, or if polling /unread-count runs more
+than one COUNT per recipient.
+
+Usage:
+    python scripts/bench_notification_push.py
+    python scripts/bench_notification_push.py --connections 5000 --recipients 200 --events 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def seed(recipients: int) -> list[int]:
+    from backend.core.database import Base, SessionLocal, engine
+    from backend.models.core import Employee
+    from backend.models.extended import NotificationRule, Tenant
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    session.add(Tenant(id=1, name="SECG", slug="secg"))
+    employees = [Employee(first_name="PM", last_name=str(i), role="pm", is_active=True)
+                 for i in range(recipients)]
+    session.add_all(employees)
+    session.add(NotificationRule(tenant_id=1, name="Documents", event_type="document.*",
+                                 channels="in_app", recipient_roles="pm",
+                                 message_template="{event_type} #{source_id}"))
+    session.commit()
+    ids = [e.id for e in employees]
+    session.close()
+    return ids
+
+
+def publish(events: int) -> None:
+    from backend.core.database import SessionLocal
+    from backend.core.outbox import dispatcher
+    from backend.models.extended import SystemEvent
+
+    session = SessionLocal()
+    session.add_all(SystemEvent(tenant_id=1, event_type="document.created", source_type="document",
+                                source_id=i, payload={}, processed=False) for i in range(events))
+    session.commit()
+    session.close()
+    dispatcher.drain()
+
+
+class Stream:
+    def __init__(self, recipient_id: int):
+        self.recipient_id = recipient_id
+        self.ready = asyncio.Event()
+        self.notifications = 0
+        self.unread_count = None
+        self.last_at = 0.0
+
+
+async def listen(client, base: str, stream: Stream) -> None:
+    url = f"{base}/api/notifications/stream?recipient_id={stream.recipient_id}"
+    async with client.stream("GET", url) as response:
+        name = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                name = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                stream.unread_count = data.get("unread_count", stream.unread_count)
+                stream.notifications += name == "notification"
+                stream.last_at = time.perf_counter()
+                stream.ready.set()
+
+
+async def scenario(args, base: str, recipients: list[int]) -> bool:
+    import httpx
+
+    from backend.core import realtime
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        before = rss_mb()
+        streams = [Stream(recipients[i % len(recipients)]) for i in range(args.connections)]
+        t0 = time.perf_counter()
+        tasks = [asyncio.create_task(listen(client, base, s)) for s in streams]
+        await asyncio.gather(*(s.ready.wait() for s in streams))
+        connect = time.perf_counter() - t0
+        idle = rss_mb() - before
+        print(f"  {args.connections} streams over {len(recipients)} recipients: "
+              f"connected in {connect:.2f} s, {idle * 1024 / args.connections:.1f} KB each "
+              f"(server and client)")
+
+        await asyncio.sleep(args.idle)
+        t0 = time.perf_counter()
+        await asyncio.to_thread(publish, args.events)
+        expected = args.events * args.connections
+        while sum(s.notifications for s in streams) < expected and time.perf_counter() - t0 < 30:
+            await asyncio.sleep(0.05)
+        fanout = max(s.last_at for s in streams) - t0
+        got = sum(s.notifications for s in streams)
+        print(f"  {args.events} events → {got}/{expected} pushes in {fanout:.2f} s "
+              f"(outbox drain included)")
+        ok = got == expected and all(s.unread_count == args.events for s in streams)
+
+        target = recipients[0]
+        await client.post(f"{base}/api/notifications/read-all?recipient_id={target}")
+        await asyncio.sleep(0.5)
+        ok = ok and all(s.unread_count == (0 if s.recipient_id == target else args.events)
+                        for s in streams)
+
+        loads = realtime.unread.loads
+        for rid in recipients[:20] * 5:
+            r = await client.get(f"{base}/api/notifications/unread-count?recipient_id={rid}")
+            ok = ok and r.json()["count"] == (0 if rid == target else args.events)
+        polled = realtime.unread.loads - loads
+        print(f"  100 unread-count polls: {polled} COUNT queries")
+        ok = ok and polled == 0
+        print(f"  server: {realtime.stats()}")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    print(f"  every stream saw every change: {'yes' if ok else 'NO'}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--recipients", type=int, default=100)
+    parser.add_argument("--events", type=int, default=5)
+    parser.add_argument("--idle", type=float, default=1.0, help="seconds to idle before publishing")
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}"
+    os.environ["OUTBOX_ENABLED"] = "false"   # drained explicitly
+    try:
+        import uvicorn
+
+        from backend.core.database import engine
+        from backend.main import app
+
+        recipients = seed(args.recipients)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning",
+                                               backlog=args.connections))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        try:
+            ok = asyncio.run(scenario(args, f"http://127.0.0.1:{port}", recipients))
+        finally:
+            server.should_exit = True
+        engine.dispose()
+        return 0 if ok else 1
+    finally:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Latency benchmark for global search.
+
+By default builds the in-process TrigramIndex (the non-PostgreSQL path) over
+synthetic entries and replays type-ahead sequences — "s", "sm", "smi", ... —
+for a sample of names, reporting p50/p95/max per keystroke.
+
+With --url the same queries run through backend.core.search.search() against
+that database (its search_entries must already be populated, e.g. with
+``python -m backend.core.search --rebuild``); add --concurrent to time the
+per-entity fan-out (search_concurrent) the endpoints use.
+
+Usage:
+    python scripts/bench_search.py                  # 100k synthetic entries
+    python scripts/bench_search.py --rows 250000
+    python scripts/bench_search.py --url postgresql://.../secg_erp
+    python scripts/bench_search.py --url postgresql://.../secg_erp --concurrent
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+FIRST = ["james", "maria", "robert", "linda", "michael", "susan", "david", "karen",
+         "joseph", "nancy", "thomas", "lisa", "charles", "betty", "daniel", "sandra"]
+LAST = ["smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis",
+        "rodriguez", "martinez", "hernandez", "lopez", "gonzalez", "wilson", "anderson"]
+TRADES = ["framing", "drywall", "electrical", "plumbing", "hvac", "roofing", "concrete",
+          "painting", "flooring", "landscaping", "masonry", "insulation"]
+STREETS = ["oak", "maple", "cedar", "pine", "elm", "birch", "willow", "spruce", "ash"]
+TYPES = ["projects", "vendors", "employees", "invoices", "documents"]
+
+
+def synthetic_entries(n: int) -> list[tuple]:
+    from backend.core.search import normalize
+    rnd = random.Random(7)
+    entries = []
+    for i in range(n):
+        kind = TYPES[i % len(TYPES)]
+        if kind == "projects":
+            title = f"{rnd.choice(STREETS).title()} {rnd.choice(['Ridge', 'Crossing', 'Park'])} Lot {i}"
+            text = f"{title} P{i:05d} {rnd.randrange(9999)} {rnd.choice(STREETS)} st"
+        elif kind == "vendors":
+            title = f"{rnd.choice(LAST).title()} {rnd.choice(TRADES).title()} {i}"
+            text = f"{title} {rnd.choice(TRADES)}"
+        elif kind == "employees":
+            title = f"{rnd.choice(FIRST).title()} {rnd.choice(LAST).title()}"
+            text = f"{title} {rnd.choice(TRADES)} {title.replace(' ', '.').lower()}{i}@secg.com"
+        elif kind == "invoices":
+            title = f"INV-{i:06d}"
+            text = title
+        else:
+            title = f"{rnd.choice(['COI', 'Lien Waiver', 'Contract', 'Permit'])} {rnd.choice(LAST).title()} {i}"
+            text = f"{title} {rnd.choice(['coi', 'contract', 'permit'])}"
+        entries.append((kind, i, title, None, None, normalize(text)))
+    return entries
+
+
+def keystrokes(rnd: random.Random, count: int) -> list[str]:
+    """Type-ahead sequences for names users would look up."""
+    terms = []
+    for _ in range(count):
+        word = rnd.choice([rnd.choice(LAST), rnd.choice(FIRST), rnd.choice(TRADES),
+                           f"{rnd.choice(FIRST)} {rnd.choice(LAST)}", f"inv-{rnd.randrange(99999):05d}"])
+        terms.extend(word[:k] for k in range(1, len(word) + 1))
+    return terms
+
+
+def report(label: str, timings: list[float]) -> float:
+    timings.sort()
+    p = lambda q: timings[min(int(len(timings) * q), len(timings) - 1)] * 1000  # noqa: E731
+    print(f"  {label}: {len(timings)} queries  p50 {p(0.50):.2f} ms  "
+          f"p95 {p(0.95):.2f} ms  max {timings[-1] * 1000:.2f} ms")
+    return p(0.95)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sequences", type=int, default=200)
+    parser.add_argument("--url", help="benchmark search() against this database")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="with --url, use search_concurrent() (one query per entity type)")
+    parser.add_argument("--target-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    terms = keystrokes(random.Random(11), args.sequences)
+
+    if args.url:
+        os.environ["DATABASE_URL"] = args.url
+        import backend.main  # noqa: F401 — registers every model
+        from backend.core.database import SessionLocal
+        from backend.core.search import search, search_concurrent
+        session = SessionLocal()
+        try:
+            search(session, "warmup")
+            timings = []
+            timed_out = 0
+            for term in terms:
+                t0 = time.perf_counter()
+                if args.concurrent:
+                    timed_out += bool(asyncio.run(search_concurrent(term))[1])
+                else:
+                    search(session, term)
+                timings.append(time.perf_counter() - t0)
+            if args.concurrent:
+                print(f"  {timed_out} queries had a timed-out entity type")
+        finally:
+            session.close()
+    else:
+        from backend.core.search import ENTITIES, TrigramIndex
+        entries = synthetic_entries(args.rows)
+        t0 = time.perf_counter()
+        index = TrigramIndex(entries)
+        print(f"{len(entries)} entries indexed in {time.perf_counter() - t0:.2f}s")
+        timings = []
+        for term in terms:
+            t0 = time.perf_counter()
+            index.search(term, set(ENTITIES), 5)
+            timings.append(time.perf_counter() - t0)
+
+    p95 = report("type-ahead", timings)
+    print(f"  target p95 < {args.target_ms:.0f} ms: {'met' if p95 < args.target_ms else 'MISSED'}")
+    return 0 if p95 < args.target_ms else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Index advisor: replay the API's read queries through EXPLAIN.
+
+Calls every GET endpoint under /api once (path parameters set to 1,
+required query parameters to a placeholder), records the SELECTs each one
+issues, and EXPLAINs every distinct statement against the target database:
+
+- PostgreSQL: ``EXPLAIN (FORMAT JSON)`` with ``enable_seqscan`` off, so a
+  remaining Seq Scan means no index can serve that filter or sort.
+- SQLite: ``EXPLAIN QUERY PLAN``; a ``SCAN`` of a table without an index
+  is flagged with the columns the statement uses from it.
+
+Scans of a whole table with no WHERE clause (plain "list everything"
+endpoints) are reported separately and do not fail the run.
+
+Usage:
+    python scripts/index_advisor.py                           # DATABASE_URL
+    python scripts/index_advisor.py --url postgresql://.../secg_erp
+    python scripts/index_advisor.py --prefix /api/projects --show-sql
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SKIP_SUFFIXES = ("/events", "/stream")   # server-sent event streams never finish
+
+
+def placeholder(field) -> str:
+    annotation = getattr(field.field_info, "annotation", None)
+    text = str(annotation)
+    if "int" in text or "float" in text:
+        return "1"
+    if "date" in text:
+        return date.today().isoformat()
+    if "bool" in text:
+        return "false"
+    return "x"
+
+
+async def call(app, path: str, query: str) -> int:
+    """GET ``path`` on the ASGI app and return the status code."""
+    status = 0
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query.encode(), "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("advisor", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def replay(app, engine, prefix: str) -> dict[str, dict]:
+    """Statement → {"params", "routes"} for every SELECT the GET routes issue."""
+    from fastapi.routing import APIRoute
+    from sqlalchemy import event
+
+    statements: dict[str, dict] = {}
+    current = {"route": None}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if current["route"] and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            entry = statements.setdefault(statement, {"params": parameters, "routes": set()})
+            entry["routes"].add(current["route"])
+
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        if not route.path.startswith(prefix) or route.path.endswith(SKIP_SUFFIXES):
+            continue
+        path = re.sub(r"\{[^}]+\}", "1", route.path)
+        query = "&".join(f"{f.alias}={placeholder(f)}"
+                         for f in route.dependant.query_params if f.required)
+        current["route"] = f"GET {route.path}"
+        try:
+            status = asyncio.run(call(app, path, query))
+        except Exception as exc:   # an endpoint bug shouldn't stop the survey
+            status = f"error: {type(exc).__name__}"
+        finally:
+            current["route"] = None
+        if status != 200:
+            print(f"  {route.path}: {status}", file=sys.stderr)
+
+    event.remove(engine, "before_cursor_execute", _record)
+    return statements
+
+
+def _pg_scans(plan: dict):
+    if plan.get("Node Type") == "Seq Scan":
+        condition = plan.get("Filter")
+        yield plan["Relation Name"], f"filter: {condition}" if condition else None
+    for child in plan.get("Plans", []):
+        yield from _pg_scans(child)
+
+
+def _sqlite_columns(statement: str, alias: str, table) -> list[str]:
+    """Non-key columns of ``alias`` used after FROM (joins, filters, ordering)."""
+    tail = statement[re.search(r"\bFROM\b", statement, re.I).start():]
+    used = set(re.findall(rf"\b{re.escape(alias)}\.(\w+)", tail))
+    return sorted(used - {c.name for c in table.primary_key})   # rowid order is free
+
+
+def explain(conn, statement: str, params, tables: dict) -> list[tuple[str, str | None]]:
+    """(table, filter or None) for each sequential scan in the plan."""
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params).scalar()
+        return list(_pg_scans(plan[0]["Plan"]))
+    scans = []
+    for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params):
+        detail = row[-1]
+        match = re.match(r"SCAN (\w+)", detail)
+        if not match or "INDEX" in detail:
+            continue
+        alias = match.group(1)
+        table = alias if alias in tables else re.sub(r"_\d+$", "", alias)
+        if table not in tables:   # a subquery or CTE, not a stored table
+            continue
+        columns = _sqlite_columns(statement, alias, tables[table])
+        scans.append((table, f"columns: {', '.join(columns)}" if columns else None))
+    return scans
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="database to analyse (default: DATABASE_URL)")
+    parser.add_argument("--prefix", default="/api", help="only replay routes under this path")
+    parser.add_argument("--show-sql", action="store_true", help="print each flagged statement")
+    args = parser.parse_args()
+    if args.url:
+        os.environ["DATABASE_URL"] = args.url
+
+    from backend.core.database import Base, engine
+    from backend.core.schema import create_missing_indexes
+    from backend.main import app
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes()   # the deploy step: python -m backend.core.schema
+    tables = dict(Base.metadata.tables)
+
+    statements = replay(app, engine, args.prefix)
+    flagged: dict[str, list] = defaultdict(list)
+    unfiltered: dict[str, set] = defaultdict(set)
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, info in statements.items():
+            try:
+                scans = explain(conn, statement, info["params"], tables)
+            except Exception as exc:
+                print(f"  EXPLAIN failed ({type(exc).__name__}): {statement[:80]}", file=sys.stderr)
+                conn.rollback()
+                continue
+            for table, condition in scans:
+                if condition:
+                    flagged[table].append((condition, info["routes"], statement))
+                else:
+                    unfiltered[table].update(info["routes"])
+
+    print(f"{len(statements)} distinct SELECTs explained on {engine.dialect.name}\n")
+    if flagged:
+        print("Sequential scans serving a filter, join or sort (index candidates):")
+        for table in sorted(flagged):
+            print(f"  {table}")
+            for condition, routes, statement in flagged[table]:
+                print(f"    {' '.join(condition.split())[:160]}")
+                print(f"    from:   {', '.join(sorted(routes))}")
+                if args.show_sql:
+                    print(f"    sql:    {' '.join(statement.split())}")
+    else:
+        print("No sequential scans serving a filter, join or sort.")
+    if unfiltered:
+        print("\nFull-table reads without a filter (informational):")
+        for table in sorted(unfiltered):
+            print(f"  {table}: {', '.join(sorted(unfiltered[table]))}")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())